@@ -23,6 +23,14 @@ uv run src/manage.py migrate
 if [ -f "$TEST_DATA_FILE" ]; then
     echo "Loading test data from $TEST_DATA_FILE..."
     uv run src/manage.py loaddata $TEST_DATA_FILE
+    # Fixtures bypass Lesson.save, so rebuild the lesson character index
+    uv run src/manage.py rebuild_lesson_characters
+    # Fixtures bypass the StudyLog signals, so rebuild the stored FSRS card states
+    # and the per-word progress summaries
+    uv run src/manage.py rebuild_card_states
+    uv run src/manage.py rebuild_word_progress
+    # Fixtures bypass WordEntry.save, so rebuild the word entry character index
+    uv run src/manage.py rebuild_word_entry_characters
 else
     echo "Test data file not found. Skipping data loading."
 fi
@@ -176,3 +176,11 @@ LOGGING = {
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Full FSRS replays over at least this many study logs are sharded across worker processes
+# (see studies.logic.fsrs.replay_history). Run `manage.py benchmark_replay` to find the crossover.
+FSRS_PARALLEL_REPLAY_THRESHOLD = int(os.environ.get('FSRS_PARALLEL_REPLAY_THRESHOLD', '100000'))
+
+# Log a per-step timing and query report for the character selections of generated exams
+# (see studies.logic.selection.Selection.explain).
+SELECTION_PROFILE = os.environ.get('SELECTION_PROFILE') == '1'
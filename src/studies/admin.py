@@ -23,7 +23,7 @@ class LessonAdmin(admin.ModelAdmin):
         from studies.logic import word_population
         count = 0
         for lesson in queryset:
-            chars = [c.strip() for c in lesson.characters.split(',')]
+            chars = list(lesson.lesson_characters.values_list('word__hanzi', flat=True))
             word_population.seed_words_for_lesson(chars)
             count += 1
         self.message_user(request, f"Started population for {count} lessons.")
@@ -51,6 +51,7 @@ def update_study_date(modeladmin, request, queryset):
         form = UpdateStudyDateForm(request.POST)
         if form.is_valid():
             study_date = form.cleaned_data['study_date']
+            # The study_logs_updated signal replays the affected FSRS cards
             queryset.update(study_date=study_date)
             modeladmin.message_user(request, f"Changed study date to {study_date.strftime('%Y-%m-%d')} for {queryset.count()} records.")
             return HttpResponseRedirect(request.get_full_path())
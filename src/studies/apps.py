@@ -9,6 +9,8 @@ class StudiesConfig(AppConfig):
     name = 'studies'
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         try:
             from .logic.ai import initialize
             initialize()
@@ -0,0 +1,323 @@
+"""
+Module for the persisted FSRS card state of each character.
+
+CardState rows hold the serialized fsrs.Card of every (word, card type) pair. They are
+kept current by folding each new StudyLog into the stored card, so readers load the
+schedule in O(cards) instead of replaying the whole StudyLog history.
+
+CardCheckpoint rows snapshot each card periodically. When history is rewritten, a card is
+replayed from its newest checkpoint before the change rather than from its first log.
+"""
+import logging
+import math
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import F, FloatField, Max, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Power
+
+from studies.models import CardCheckpoint, CardState, StudyLog, Word
+from . import fsrs, scheduler_parameters, study_history
+
+logger = logging.getLogger(__name__)
+
+CARD_TYPES = ("read", "write")
+
+# Snapshot a card every this many reviews
+CHECKPOINT_INTERVAL = 20
+
+# CardState column holding the crossing time of each retrievability threshold
+THRESHOLD_FIELDS = {0.9: 'r90_until', 0.8: 'r80_until', 0.6: 'r60_until'}
+
+
+def data_version():
+    """
+    Return a version identifying the current card data, from two index lookups: the
+    StudyLog high-water mark and the latest CardState write.
+
+    Deleted or re-dated logs rebuild the affected card states and new scheduler weights
+    rebuild all of them, so both move the latest write, including in other processes.
+    Deleting every log of a word only drops its states; the deleting process clears its own
+    cache in the post_delete receiver.
+    """
+    logs = StudyLog.objects.aggregate(last_id=Max('id'))
+    states = CardState.objects.aggregate(updated_at=Max('updated_at'))
+    return (logs['last_id'], states['updated_at'])
+
+
+def card_fields(card, card_type):
+    """
+    Return the columns of a CardState holding the serialized `card` that are derived from it:
+    the memory state used to compute retrievability in SQL and the threshold-crossing times.
+    """
+    card = fsrs.Card.from_dict(card)
+    crossings = fsrs.threshold_crossings(card.stability, card.last_review, card_type, tuple(THRESHOLD_FIELDS))
+    fields = {field: crossings[threshold] for threshold, field in THRESHOLD_FIELDS.items()}
+    fields["stability"] = card.stability if card.last_review else None
+    fields["due"] = card.due
+    fields["last_review_day"] = _epoch_day(card.last_review) if card.last_review else None
+    return fields
+
+
+def _epoch_day(when):
+    return math.floor(when.timestamp() / fsrs.SECONDS_PER_DAY)
+
+
+def retrievability_expression(card_type, now=None):
+    """
+    Database expression for the retrievability of a CardState at `now`, 0 if never reviewed.
+    SQL equivalent of fsrs.batch_retrievability: reviews fall on whole UTC days, so the
+    elapsed days are the difference of the epoch days.
+    """
+    now = now or datetime.now(timezone.utc)
+    scheduler = fsrs.get_scheduler(card_type)
+    decay = -scheduler.parameters[20]
+    factor = 0.9 ** (1 / decay) - 1
+
+    elapsed_days = Greatest(Value(_epoch_day(now)) - F('last_review_day'), Value(0))
+    retrievability = Power(
+        Value(1.0) + Value(factor) * elapsed_days / F('stability'),
+        Value(decay),
+        output_field=FloatField(),
+    )
+    return Coalesce(retrievability, Value(0.0), output_field=FloatField())
+
+
+def known_characters(card_type, threshold=0.9, when=None, characters=None):
+    """
+    Return the characters whose retrievability is at least `threshold` at `when`.
+
+    Answered from the indexed crossing columns of CardState, without loading any card.
+
+    Args:
+        card_type: "read" or "write"
+        threshold: One of THRESHOLD_FIELDS
+        when: Timezone-aware datetime, defaults to now
+        characters: Optional iterable of characters to restrict the result to
+    """
+    if threshold not in THRESHOLD_FIELDS:
+        raise ValueError(f"No crossing index for threshold {threshold}")
+    when = when or datetime.now(timezone.utc)
+    states = CardState.objects.filter(card_type=card_type, **{f"{THRESHOLD_FIELDS[threshold]}__gt": when})
+    if characters is not None:
+        states = states.filter(word__hanzi__in=characters)
+    return set(states.values_list('word__hanzi', flat=True))
+
+
+def _load_all_cards():
+    return _load_cards()
+
+
+def _load_cards(characters=None):
+    states = CardState.objects.all()
+    if characters is not None:
+        states = states.filter(word__hanzi__in=characters)
+    return fsrs.CardStore(states.values_list('word__hanzi', 'card_type', 'card'))
+
+
+def load_cards(characters=None, reviewed_only=False):
+    """
+    Load the stored FSRS cards.
+
+    The full card store is shared through fsrs.card_cache and filtered per call. When it is
+    not cached and only some characters are requested, just their rows are read instead.
+
+    Args:
+        characters: Optional iterable of characters to restrict the result to
+        reviewed_only: If True, only include characters that have at least one read/write review
+
+    Returns:
+        fsrs.CardStore mapping (character, type) tuples to card views
+    """
+    version = data_version()
+    cards = fsrs.card_cache.peek(version, "all")
+    if cards is None:
+        # Changed card data may have been built with new scheduler weights
+        scheduler_parameters.sync()
+        if characters is not None:
+            return _load_cards(set(characters)).subset(reviewed_only=reviewed_only)
+        cards = fsrs.card_cache.get(version, "all", _load_all_cards)
+    # Every write review implies a read review, so a reviewed character always has a reviewed read card
+    return cards.subset(characters=characters, reviewed_only=reviewed_only)
+
+
+def _build_history_engine(characters=None):
+    logs = None
+    if characters is not None:
+        logs = StudyLog.objects.filter(word__hanzi__in=characters)
+    return fsrs.ReplayEngine(study_history.iter_log_rows(logs, types=CARD_TYPES))
+
+
+def cards_as_of(when, characters=None):
+    """
+    Return the FSRS cards as they were at a point in time.
+
+    The full history is replayed once per data version into a ReplayEngine shared through
+    fsrs.card_cache, so repeated historical queries only cost a lookup per card. When it is
+    not cached and only some characters are requested, only their logs are replayed.
+
+    Args:
+        when: Timezone-aware datetime; reviews after it are ignored
+        characters: Optional iterable of characters to restrict the result to
+
+    Returns:
+        fsrs.CardStore mapping (character, type) tuples to card views, blank for characters
+        not reviewed by then
+    """
+    version = data_version()
+    engine = fsrs.card_cache.peek(version, "history")
+    if engine is None:
+        scheduler_parameters.sync()
+        if characters is not None:
+            characters = set(characters)
+            engine = _build_history_engine(characters)
+        else:
+            engine = fsrs.card_cache.get(version, "history", _build_history_engine)
+    return fsrs.CardStore.from_cards(engine.cards(as_of=when, characters=characters))
+
+
+def apply_log(log):
+    """
+    Fold a newly created StudyLog into the stored card states of its word.
+
+    Only the new review is applied. A log dated before a review that was already folded
+    into the card cannot be appended, so the word is replayed from its newest checkpoint
+    before that date instead.
+    """
+    scheduler_parameters.sync()
+    study_date = study_history.as_date(log.study_date)
+    reviews = fsrs.implied_reviews(log.type, log.score)
+
+    with transaction.atomic():
+        states = {
+            state.card_type: state
+            for state in CardState.objects.select_for_update().filter(word_id=log.word_id)
+        }
+        if len(states) < len(CARD_TYPES):
+            # First log for this word: replaying its history also creates the rows
+            rebuild_card_states(word_ids=[log.word_id])
+            return
+
+        for card_type, _ in reviews:
+            state = states[card_type]
+            if state.last_log_date is not None and study_date < state.last_log_date:
+                logger.info(f"Out-of-order StudyLog {log.id} for word {log.word_id}, replaying its history")
+                rebuild_card_states(word_ids=[log.word_id], since=study_date)
+                return
+
+        engine = fsrs.ReplayEngine()
+        for card_type, state in states.items():
+            engine.start(log.word_id, card_type, fsrs.Card.from_dict(state.card))
+
+        for card_type, card in engine.add(log.word_id, log.type, log.score, study_date):
+            state = states[card_type]
+            state.card = card.to_dict()
+            for field, value in card_fields(state.card, card_type).items():
+                setattr(state, field, value)
+            state.last_log_id = log.id
+            state.last_log_date = study_date
+            state.review_count += 1
+            state.save()
+
+            if state.review_count % CHECKPOINT_INTERVAL == 0:
+                CardCheckpoint.objects.create(
+                    word_id=log.word_id,
+                    card_type=card_type,
+                    card=state.card,
+                    last_log_id=log.id,
+                    last_log_date=study_date,
+                    review_count=state.review_count,
+                )
+
+
+def rebuild_card_states(word_ids=None, since=None):
+    """
+    Replay the StudyLog history of the given words into their card states.
+    Used when history is rewritten (deleted or re-dated logs) and to backfill after bulk loads.
+
+    With `since`, history before that date is known to be unchanged: each card resumes from
+    its newest checkpoint taken before `since` and only the logs after it are replayed.
+    Checkpoints at or after `since` are invalidated. Without `since`, or when a card has no
+    such checkpoint, the card is replayed from its first log.
+
+    Args:
+        word_ids: IDs of the words to rebuild, or None to rebuild every card
+        since: Earliest date whose logs may have changed, or None for a full replay
+
+    Returns:
+        int: Number of card states written
+    """
+    scheduler_parameters.sync()
+    words = Word.objects.filter(study_logs__isnull=False).distinct()
+    checkpoints = CardCheckpoint.objects.all()
+    if word_ids is not None:
+        words = words.filter(id__in=word_ids)
+        checkpoints = checkpoints.filter(word_id__in=word_ids)
+    words = list(words)
+
+    # Newest valid checkpoint of each card
+    resume_from = {}
+    if since is not None:
+        for checkpoint in checkpoints.filter(last_log_date__lt=since).order_by('last_log_date', 'last_log_id'):
+            resume_from[(checkpoint.word_id, checkpoint.card_type)] = checkpoint
+
+    # Only fetch the logs that are not folded into a checkpoint yet
+    logs = StudyLog.objects.filter(type__in=CARD_TYPES)
+    if word_ids is not None:
+        logs = logs.filter(word_id__in=word_ids)
+    checkpointed_words = {
+        word.id for word in words
+        if all((word.id, card_type) in resume_from for card_type in CARD_TYPES)
+    }
+    if checkpointed_words:
+        oldest_checkpoint = min(checkpoint.last_log_date for checkpoint in resume_from.values())
+        logs = logs.filter(~Q(word_id__in=checkpointed_words) | Q(study_date__gte=oldest_checkpoint))
+
+    # Replay keyed by word id, resuming each card from its checkpoint.
+    # Full rebuilds of long histories are sharded across processes by fsrs.replay_history.
+    start = {
+        key: {
+            "card": checkpoint.card,
+            "review_count": checkpoint.review_count,
+            "last_log_id": checkpoint.last_log_id,
+            "last_log_date": checkpoint.last_log_date,
+        }
+        for key, checkpoint in resume_from.items()
+    }
+    rows = study_history.iter_log_rows(logs, fields=('word_id', 'type', 'score', 'study_date', 'id'))
+    results = fsrs.replay_history(rows, start=start, snapshot_interval=CHECKPOINT_INTERVAL)
+
+    new_states = []
+    new_checkpoints = []
+    for word in words:
+        for card_type in CARD_TYPES:
+            result = results.get((word.id, card_type))
+            if result is None:
+                card = fsrs.new_card().to_dict()
+                new_states.append(CardState(word=word, card_type=card_type, card=card, **card_fields(card, card_type)))
+                continue
+
+            new_states.append(CardState(
+                word=word,
+                card_type=card_type,
+                card=result["card"],
+                last_log_id=result["last_log_id"],
+                last_log_date=result["last_log_date"],
+                review_count=result["review_count"],
+                **card_fields(result["card"], card_type),
+            ))
+            for snapshot in result["snapshots"]:
+                new_checkpoints.append(CardCheckpoint(word=word, card_type=card_type, **snapshot))
+
+    with transaction.atomic():
+        stale_states = CardState.objects.all()
+        if word_ids is not None:
+            stale_states = stale_states.filter(word_id__in=word_ids)
+        stale_states.delete()
+        if since is not None:
+            checkpoints = checkpoints.filter(last_log_date__gte=since)
+        checkpoints.delete()
+        CardState.objects.bulk_create(new_states)
+        CardCheckpoint.objects.bulk_create(new_checkpoints)
+
+    return len(new_states)
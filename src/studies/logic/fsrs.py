@@ -1,8 +1,23 @@
+import bisect
 import datetime
-from fsrs import Scheduler, Card, Rating
+import itertools
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-read_scheduler = Scheduler(desired_retention=0.9)
-write_scheduler = Scheduler(desired_retention=0.6)
+import django
+import numpy as np
+from fsrs import Scheduler, Card, Rating, State
+from fsrs.scheduler import DEFAULT_PARAMETERS, STABILITY_MIN
+
+CARD_TYPES = ("read", "write")
+
+DESIRED_RETENTION = {"read": 0.9, "write": 0.6}
+
+read_scheduler = Scheduler(desired_retention=DESIRED_RETENTION["read"])
+write_scheduler = Scheduler(desired_retention=DESIRED_RETENTION["write"])
 
 
 RATING_TO_COLOR = {
@@ -24,6 +39,766 @@ def score_to_rating(score):
         return Rating.Easy
 
 
+_card_ids = itertools.count(1)
+
+
+def new_card():
+    """
+    Create a blank Card.
+
+    fsrs.Card() derives its id from the clock and sleeps 1ms to keep ids unique, which
+    dominates replay time once thousands of cards are built. Card ids are never stored
+    or compared in this app, so a process-local counter is enough.
+    """
+    return Card(card_id=next(_card_ids))
+
+
+def get_scheduler(card_type):
+    return read_scheduler if card_type == "read" else write_scheduler
+
+
+def set_parameters(card_type, parameters=None):
+    """
+    Replace the scheduler of a card type with one using the given weights.
+    Cached cards built with the previous weights are dropped.
+
+    Args:
+        card_type: 'read' or 'write'
+        parameters: Sequence of the 21 FSRS weights, or None for the defaults
+
+    Returns:
+        bool: True if the weights changed
+    """
+    global read_scheduler, write_scheduler
+
+    parameters = tuple(float(weight) for weight in parameters) if parameters else DEFAULT_PARAMETERS
+    if tuple(get_scheduler(card_type).parameters) == parameters:
+        return False
+
+    scheduler = Scheduler(parameters=parameters, desired_retention=DESIRED_RETENTION[card_type])
+    if card_type == "read":
+        read_scheduler = scheduler
+    else:
+        write_scheduler = scheduler
+    card_cache.invalidate()
+    return True
+
+
+def scheduler_parameters():
+    """Return the weights of each card type's scheduler."""
+    return {card_type: list(get_scheduler(card_type).parameters) for card_type in CARD_TYPES}
+
+
+def review_datetime(study_date):
+    """Convert a StudyLog date into the UTC datetime used for FSRS reviews."""
+    return datetime.datetime.combine(
+        study_date,
+        datetime.datetime.min.time()
+    ).replace(tzinfo=datetime.timezone.utc)
+
+
+def implied_reviews(record_type, score):
+    """
+    Return the (card_type, score) reviews contributed by a single study log.
+    A write record also counts as an implied read review with a bonus score.
+    """
+    if record_type == "write":
+        return [("write", score), ("read", min(score + 3, 10))]  # Limit to 10
+    if record_type == "read":
+        return [("read", score)]
+    return []
+
+
+class CardCache:
+    """
+    Per-process LRU cache of built FSRS cards.
+
+    Entries are keyed by a data version (see card_state.data_version), so a result built
+    from older data is never returned once the history changes. Callers share the cached
+    objects and must not modify them.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build):
+        """
+        Return the cached value for (version, key), calling build() to create it on a miss.
+        """
+        cache_key = (version, key)
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return self._entries[cache_key]
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            self._entries[cache_key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def peek(self, version, key):
+        """Return the cached value for (version, key), or None without building it."""
+        cache_key = (version, key)
+        with self._lock:
+            if cache_key not in self._entries:
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return self._entries[cache_key]
+
+    def invalidate(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+card_cache = CardCache()
+
+
+SECONDS_PER_DAY = 86400
+
+
+def batch_retrievability(stabilities, last_reviews, now, card_type):
+    """
+    Calculate the retrievability of many cards at one point in time.
+    Vectorized equivalent of Scheduler.get_card_retrievability.
+
+    Args:
+        stabilities: Array of card stabilities, NaN for cards that were never reviewed
+        last_reviews: Array of last review times as POSIX timestamps, NaN for cards that were never reviewed
+        now: Timezone-aware datetime to calculate the retrievability at
+        card_type: 'read' or 'write', selects the scheduler parameters
+
+    Returns:
+        np.ndarray of retrievabilities, 0 for cards that were never reviewed
+    """
+    return _forgetting_curve(stabilities, last_reviews, now.timestamp(), card_type)
+
+
+def _forgetting_curve(stabilities, last_reviews, timestamps, card_type):
+    """Retrievability at POSIX `timestamps`, broadcast against the card arrays."""
+    scheduler = get_scheduler(card_type)
+    decay = -scheduler.parameters[20]
+    factor = 0.9 ** (1 / decay) - 1
+
+    stabilities = np.asarray(stabilities, dtype=float)
+    last_reviews = np.asarray(last_reviews, dtype=float)
+
+    # Whole days since the last review, like timedelta.days
+    elapsed_days = np.maximum(0, np.floor((timestamps - last_reviews) / SECONDS_PER_DAY))
+    retrievability = (1 + factor * elapsed_days / stabilities) ** decay
+    return np.nan_to_num(retrievability, nan=0.0)
+
+
+# Retrievability thresholds whose crossing times are stored on CardState
+RETRIEVABILITY_THRESHOLDS = (0.9, 0.8, 0.6)
+
+# Crossings further away are capped to stay within datetime range
+MAX_CROSSING_DAYS = 365 * 1000
+
+
+def threshold_crossings(stability, last_review, card_type, thresholds=RETRIEVABILITY_THRESHOLDS):
+    """
+    Calculate when a card's retrievability first drops below each threshold.
+
+    Retrievability only depends on the whole days since the last review, so it stays at or
+    above `threshold` while elapsed_days <= S / FACTOR * (threshold ** (1 / DECAY) - 1).
+
+    Returns:
+        Dictionary mapping threshold to a datetime, or to None if the card was never reviewed
+    """
+    if stability is None or last_review is None:
+        return {threshold: None for threshold in thresholds}
+
+    scheduler = get_scheduler(card_type)
+    decay = -scheduler.parameters[20]
+    factor = 0.9 ** (1 / decay) - 1
+    crossings = {}
+    for threshold in thresholds:
+        days = math.floor(stability / factor * (threshold ** (1 / decay) - 1)) + 1
+        crossings[threshold] = last_review + datetime.timedelta(days=min(days, MAX_CROSSING_DAYS))
+    return crossings
+
+
+def card_arrays(cards):
+    """
+    Extract the (stabilities, last_reviews) arrays of a sequence of Cards for batch_retrievability.
+    """
+    stabilities = np.array(
+        [card.stability if card.last_review is not None and card.stability is not None else np.nan for card in cards],
+        dtype=float,
+    )
+    last_reviews = np.array(
+        [card.last_review.timestamp() if card.last_review is not None else np.nan for card in cards],
+        dtype=float,
+    )
+    return stabilities, last_reviews
+
+
+def retrievability_by_character(fsrs_cards, card_type, now):
+    """
+    Calculate the retrievability of every card of one type in a single batch.
+
+    Args:
+        fsrs_cards: Dictionary mapping (character, type) tuples to Card objects
+        card_type: 'read' or 'write'
+        now: Timezone-aware datetime to calculate the retrievability at
+
+    Returns:
+        Dictionary mapping character to retrievability
+    """
+    if isinstance(fsrs_cards, CardStore):
+        return fsrs_cards.retrievability_by_character(card_type, now)
+    characters = [char for char, key_type in fsrs_cards if key_type == card_type]
+    stabilities, last_reviews = card_arrays([fsrs_cards[(char, card_type)] for char in characters])
+    values = batch_retrievability(stabilities, last_reviews, now, card_type)
+    return dict(zip(characters, values.tolist(), strict=True))
+
+
+# One row per card. Times are POSIX timestamps and missing values are NaN (step: -1).
+CARD_DTYPE = np.dtype([
+    ("stability", "f8"),
+    ("difficulty", "f8"),
+    ("state", "i1"),
+    ("step", "i2"),
+    ("last_review", "f8"),
+    ("due", "f8"),
+])
+
+
+def _timestamp(value):
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def _datetime(timestamp):
+    if np.isnan(timestamp):
+        return None
+    return datetime.datetime.fromtimestamp(float(timestamp), tz=datetime.timezone.utc)
+
+
+def _optional(value):
+    return np.nan if value is None else value
+
+
+class CardView:
+    """Read-only, card-like access to one row of a CardStore."""
+
+    __slots__ = ("_row", "character", "card_type")
+
+    def __init__(self, row, character, card_type):
+        self._row = row
+        self.character = character
+        self.card_type = card_type
+
+    @property
+    def stability(self):
+        value = float(self._row["stability"])
+        return None if np.isnan(value) else value
+
+    @property
+    def difficulty(self):
+        value = float(self._row["difficulty"])
+        return None if np.isnan(value) else value
+
+    @property
+    def state(self):
+        return State(int(self._row["state"]))
+
+    @property
+    def step(self):
+        value = int(self._row["step"])
+        return None if value < 0 else value
+
+    @property
+    def last_review(self):
+        return _datetime(self._row["last_review"])
+
+    @property
+    def due(self):
+        return _datetime(self._row["due"])
+
+    def to_card(self):
+        """Return a full fsrs.Card, e.g. to review it."""
+        return Card(
+            card_id=next(_card_ids),
+            state=self.state,
+            step=self.step,
+            stability=self.stability,
+            difficulty=self.difficulty,
+            due=self.due,
+            last_review=self.last_review,
+        )
+
+
+class CardStore:
+    """
+    Compact store of FSRS cards: one NumPy structured array (CARD_DTYPE) per card type
+    and a character -> row index.
+
+    It can be read like the dict of (character, type) -> Card it replaces: items() and
+    lookups return CardView objects. Filters over all cards of a type, such as due_before
+    and retrievability_between, are array operations.
+    """
+
+    def __init__(self, records=()):
+        """
+        Args:
+            records: Iterable of (character, card_type, card) where card is an fsrs.Card or a Card dict
+        """
+        rows = {card_type: [] for card_type in CARD_TYPES}
+        self._characters = {card_type: [] for card_type in CARD_TYPES}
+        self._keys = []
+        for character, card_type, card in records:
+            if isinstance(card, dict):
+                row = (
+                    _optional(card["stability"]),
+                    _optional(card["difficulty"]),
+                    card["state"],
+                    -1 if card["step"] is None else card["step"],
+                    _timestamp(card["last_review"]),
+                    _timestamp(card["due"]),
+                )
+            else:
+                row = (
+                    _optional(card.stability),
+                    _optional(card.difficulty),
+                    int(card.state),
+                    -1 if card.step is None else card.step,
+                    _timestamp(card.last_review),
+                    _timestamp(card.due),
+                )
+            rows[card_type].append(row)
+            self._characters[card_type].append(character)
+            self._keys.append((character, card_type))
+
+        self._arrays = {card_type: np.array(rows[card_type], dtype=CARD_DTYPE) for card_type in CARD_TYPES}
+        self._index = {
+            card_type: {character: row for row, character in enumerate(characters)}
+            for card_type, characters in self._characters.items()
+        }
+
+    @classmethod
+    def from_cards(cls, fsrs_cards):
+        """Build a store from a dict of (character, type) -> Card."""
+        return cls((character, card_type, card) for (character, card_type), card in fsrs_cards.items())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        character, card_type = key
+        return character in self._index.get(card_type, {})
+
+    def __getitem__(self, key):
+        character, card_type = key
+        row = self._index[card_type][character]
+        return CardView(self._arrays[card_type][row], character, card_type)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return list(self._keys)
+
+    def items(self):
+        return [(key, self[key]) for key in self._keys]
+
+    def characters(self, card_type):
+        """Characters of the cards of one type, in row order."""
+        return list(self._characters[card_type])
+
+    def array(self, card_type):
+        """The structured array of one card type, aligned with characters(card_type)."""
+        return self._arrays[card_type]
+
+    def subset(self, characters=None, reviewed_only=False):
+        """
+        Return a store with only some of the cards.
+
+        Args:
+            characters: Optional iterable of characters to keep
+            reviewed_only: If True, only keep characters whose read card has been reviewed
+        """
+        keep = None if characters is None else set(characters)
+        if reviewed_only:
+            read = self._arrays["read"]
+            reviewed = {
+                character for character, last_review in zip(self._characters["read"], read["last_review"], strict=True)
+                if not np.isnan(last_review)
+            }
+            keep = reviewed if keep is None else keep & reviewed
+        if keep is None:
+            return self
+
+        subset = CardStore()
+        subset._keys = [key for key in self._keys if key[0] in keep]
+        for card_type in CARD_TYPES:
+            rows = [row for row, character in enumerate(self._characters[card_type]) if character in keep]
+            subset._arrays[card_type] = self._arrays[card_type][rows]
+            subset._characters[card_type] = [self._characters[card_type][row] for row in rows]
+            subset._index[card_type] = {character: row for row, character in enumerate(subset._characters[card_type])}
+        return subset
+
+    def retrievability(self, card_type, now):
+        """Retrievability of every card of one type at `now`, aligned with characters(card_type)."""
+        array = self._arrays[card_type]
+        return batch_retrievability(array["stability"], array["last_review"], now, card_type)
+
+    def retrievability_by_character(self, card_type, now):
+        return dict(zip(self._characters[card_type], self.retrievability(card_type, now).tolist(), strict=True))
+
+    def due_before(self, card_type, when):
+        """Characters whose card of this type is due at or before `when`."""
+        rows = np.flatnonzero(self._arrays[card_type]["due"] <= when.timestamp())
+        return [self._characters[card_type][row] for row in rows]
+
+    def retrievability_between(self, card_type, now, low, high):
+        """Characters whose card of this type has a retrievability in [low, high] at `now`."""
+        retrievability = self.retrievability(card_type, now)
+        rows = np.flatnonzero((retrievability >= low) & (retrievability <= high))
+        return [self._characters[card_type][row] for row in rows]
+
+
+def initial_memory_state(w, rating):
+    """
+    Vectorized Scheduler stability and difficulty after the first review of a card.
+    Each w[i] must broadcast against `rating`.
+    """
+    stability = np.maximum(np.choose(rating - 1, [w[0], w[1], w[2], w[3]]), STABILITY_MIN)
+    difficulty = np.clip(w[4] - np.exp(w[5] * (rating - 1)) + 1, 1.0, 10.0)
+    return stability, difficulty
+
+
+def next_memory_state(w, stability, difficulty, retrievability, rating, elapsed_days):
+    """
+    Vectorized Scheduler update of the stability and difficulty of reviewed cards.
+    Mirrors Scheduler.review_card, including the short-term stability of same-day reviews.
+
+    Args:
+        w: The 21 FSRS weights; each w[i] must broadcast against the card arrays
+        stability, difficulty: Current memory state
+        retrievability: Retrievability at the time of the review
+        rating: Rating values (1 = Again ... 4 = Easy)
+        elapsed_days: Whole days since the last review
+
+    Returns:
+        (stability, difficulty) arrays
+    """
+    hard_penalty = np.where(rating == Rating.Hard, w[15], 1.0)
+    easy_bonus = np.where(rating == Rating.Easy, w[16], 1.0)
+    recall_stability = stability * (
+        1 + np.exp(w[8]) * (11 - difficulty) * stability ** -w[9]
+        * (np.exp((1 - retrievability) * w[10]) - 1) * hard_penalty * easy_bonus
+    )
+    forget_stability = np.minimum(
+        w[11] * difficulty ** -w[12] * ((stability + 1) ** w[13] - 1) * np.exp((1 - retrievability) * w[14]),
+        stability / np.exp(w[17] * w[18]),
+    )
+    short_term_increase = np.exp(w[17] * (rating - 3 + w[18])) * stability ** -w[19]
+    short_term_increase = np.where(rating > Rating.Again, np.maximum(short_term_increase, 1.0), short_term_increase)
+
+    next_stability = np.where(
+        elapsed_days < 1,
+        stability * short_term_increase,
+        np.where(rating == Rating.Again, forget_stability, recall_stability),
+    )
+    next_stability = np.maximum(next_stability, STABILITY_MIN)
+
+    easy_initial_difficulty = w[4] - np.exp(w[5] * 3) + 1
+    damped_difficulty = difficulty + (10 - difficulty) * -w[6] * (rating - 3) / 9
+    next_difficulty = np.clip(w[7] * easy_initial_difficulty + (1 - w[7]) * damped_difficulty, 1.0, 10.0)
+
+    return next_stability, next_difficulty
+
+
+def forecast(cards, start, days):
+    """
+    Forecast the review workload of the coming days, assuming no further reviews.
+    Computed in one vectorized pass per card type over the due and stability columns.
+
+    Args:
+        cards: CardStore; cards that were never reviewed are ignored
+        start: Timezone-aware datetime at the start of the first day
+        days: Number of days to forecast
+
+    Returns:
+        Dictionary mapping card type to a dict with:
+            "cards": number of reviewed cards
+            "due": number of cards coming due on each day (overdue cards count on the first day)
+            "retrievability": mean retrievability of the cards at the start of each day
+    """
+    start_timestamp = start.timestamp()
+    day_starts = start_timestamp + SECONDS_PER_DAY * np.arange(days)
+
+    result = {}
+    for card_type in CARD_TYPES:
+        array = cards.array(card_type)
+        array = array[~np.isnan(array["last_review"])]
+
+        due_days = np.maximum(0, np.floor((array["due"] - start_timestamp) / SECONDS_PER_DAY)).astype(int)
+        due = np.bincount(due_days[due_days < days], minlength=days)
+
+        if len(array):
+            # Days x cards
+            retrievability = _forgetting_curve(
+                array["stability"][np.newaxis, :], array["last_review"][np.newaxis, :], day_starts[:, np.newaxis], card_type
+            ).mean(axis=1)
+        else:
+            retrievability = np.zeros(days)
+
+        result[card_type] = {
+            "cards": len(array),
+            "due": due.tolist(),
+            "retrievability": retrievability.tolist(),
+        }
+    return result
+
+
+def replay_card(card, card_type, reviews):
+    """
+    Apply reviews to a card in the given order.
+
+    Args:
+        card: Card to start from
+        card_type: 'read' or 'write', selects the scheduler
+        reviews: Iterable of (score, study_date) tuples
+
+    Returns:
+        The reviewed Card
+    """
+    scheduler = get_scheduler(card_type)
+    for score, study_date in reviews:
+        card, _ = scheduler.review_card(card, score_to_rating(score), review_datetime(study_date))
+    return card
+
+
+class ReplayEngine:
+    """
+    Replays study history into FSRS cards, keeping the timeline of every card.
+
+    History is added as compact (character, type, score, study_date) rows in date order.
+    The implied-read rule is applied here, once per row. Each card keeps the time and
+    resulting state of every review, so its state as of any time is a bisect away.
+
+    Characters are only used as keys, so any hashable value (such as a word id) works.
+    """
+
+    def __init__(self, rows=()):
+        self._characters = {}  # Insertion-ordered set
+        self._times = {}
+        self._cards = {}
+        self.extend(rows)
+
+    @property
+    def characters(self):
+        return list(self._characters)
+
+    def start(self, character, card_type, card):
+        """
+        Resume a card from a known state, such as a checkpoint.
+        The timeline begins at the card's last review, so earlier as-of queries return a blank card.
+        """
+        key = (character, card_type)
+        self._characters.setdefault(character)
+        start_time = card.last_review or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+        self._times[key] = [start_time]
+        self._cards[key] = [card]
+
+    def add(self, character, record_type, score, study_date, card_types=CARD_TYPES):
+        """
+        Apply one study log, including its implied reviews.
+
+        Args:
+            card_types: Only review the cards of these types
+
+        Returns:
+            List of (card_type, Card) pairs for the cards that were reviewed
+        """
+        self._characters.setdefault(character)
+        review_time = review_datetime(study_date)
+        reviewed = []
+        for card_type, review_score in implied_reviews(record_type, score):
+            if card_type not in card_types:
+                continue
+            key = (character, card_type)
+            times = self._times.setdefault(key, [])
+            cards = self._cards.setdefault(key, [])
+            if times and review_time < times[-1]:
+                raise ValueError(f"Review of {key} on {study_date} is older than its last review")
+            card = replay_card(cards[-1] if cards else new_card(), card_type, [(review_score, study_date)])
+            times.append(review_time)
+            cards.append(card)
+            reviewed.append((card_type, card))
+        return reviewed
+
+    def extend(self, rows):
+        for character, record_type, score, study_date in rows:
+            self.add(character, record_type, score, study_date)
+
+    def card(self, character, card_type, as_of=None):
+        """
+        Return the state of a card after its last review at or before `as_of` (default: latest).
+        A card without reviews by then is blank.
+        """
+        key = (character, card_type)
+        cards = self._cards.get(key)
+        if not cards:
+            return new_card()
+        if as_of is None:
+            return cards[-1]
+        index = bisect.bisect_right(self._times[key], as_of)
+        return cards[index - 1] if index else new_card()
+
+    def cards(self, as_of=None, characters=None):
+        """
+        Return the state of every card as of a point in time.
+
+        Args:
+            as_of: Timezone-aware datetime, or None for the latest state
+            characters: Optional iterable of characters to restrict the result to
+
+        Returns:
+            Dictionary mapping (character, type) tuples to Card objects, including blank
+            cards for characters that were seen but not reviewed
+        """
+        characters = self._characters if characters is None else characters
+        return {
+            (character, card_type): self.card(character, card_type, as_of)
+            for character in characters
+            for card_type in CARD_TYPES
+        }
+
+
+# Default for settings.FSRS_PARALLEL_REPLAY_THRESHOLD
+PARALLEL_REPLAY_THRESHOLD = 100_000
+
+
+def _replay_shard(rows, start, snapshot_interval, parameters=None):
+    """
+    Replay one shard of history. Runs in a worker process for parallel replays, so inputs
+    and outputs are plain tuples and dicts with serialized cards.
+    """
+    for card_type, weights in (parameters or {}).items():
+        set_parameters(card_type, weights)
+
+    engine = ReplayEngine()
+    results = {}
+    for (character, card_type), position in start.items():
+        engine.start(character, card_type, Card.from_dict(position["card"]))
+        results[(character, card_type)] = dict(position, snapshots=[])
+
+    for character, record_type, score, study_date, log_id in rows:
+        # Skip the reviews already folded into the starting position
+        card_types = []
+        for card_type in CARD_TYPES:
+            position = start.get((character, card_type))
+            if not position or (study_date, log_id) > (position["last_log_date"], position["last_log_id"]):
+                card_types.append(card_type)
+
+        for card_type, card in engine.add(character, record_type, score, study_date, card_types):
+            result = results.setdefault((character, card_type), {"review_count": 0, "snapshots": []})
+            result["card"] = card
+            result["review_count"] += 1
+            result["last_log_id"] = log_id
+            result["last_log_date"] = study_date
+            if snapshot_interval and result["review_count"] % snapshot_interval == 0:
+                result["snapshots"].append({
+                    "card": card.to_dict(),
+                    "review_count": result["review_count"],
+                    "last_log_id": log_id,
+                    "last_log_date": study_date,
+                })
+
+    for result in results.values():
+        if isinstance(result["card"], Card):
+            result["card"] = result["card"].to_dict()
+    return results
+
+
+def replay_history(rows, start=None, snapshot_interval=None, workers=None, threshold=None):
+    """
+    Replay study history into the latest state of every card.
+
+    Each card only depends on its own logs, so above `threshold` rows the characters are
+    sharded across a ProcessPoolExecutor. Below it, the same replay runs in-process, where
+    process startup and serialization would cost more than they save.
+
+    Args:
+        rows: Iterable of (character, type, score, study_date, log_id) tuples in (study_date, log_id) order
+        start: Optional dict mapping (character, card_type) to a position dict ("card" as a dict,
+            "review_count", "last_log_id", "last_log_date") to resume from. Reviews at or before
+            the position are skipped.
+        snapshot_interval: If set, also snapshot each card every this many reviews
+        workers: Number of worker processes, defaults to the CPU count
+        threshold: Minimum number of rows for a parallel replay,
+            defaults to settings.FSRS_PARALLEL_REPLAY_THRESHOLD
+
+    Returns:
+        Dictionary mapping (character, card_type) to a dict with the serialized "card",
+        "review_count", "last_log_id", "last_log_date" and the new "snapshots" of that card.
+        Cards without reviews or a starting position are omitted.
+    """
+    from django.conf import settings
+
+    rows = list(rows)
+    start = start or {}
+    workers = workers or os.cpu_count() or 1
+    if threshold is None:
+        threshold = getattr(settings, 'FSRS_PARALLEL_REPLAY_THRESHOLD', PARALLEL_REPLAY_THRESHOLD)
+
+    if workers <= 1 or len(rows) < threshold:
+        return _replay_shard(rows, start, snapshot_interval)
+
+    # A few shards per worker evens out characters with very long histories
+    shard_count = workers * 4
+    shard_of = {}
+    shard_rows = [[] for _ in range(shard_count)]
+    shard_start = [{} for _ in range(shard_count)]
+    for row in rows:
+        shard = shard_of.setdefault(row[0], len(shard_of) % shard_count)
+        shard_rows[shard].append(row)
+    for key, position in start.items():
+        shard = shard_of.setdefault(key[0], len(shard_of) % shard_count)
+        shard_start[shard][key] = position
+
+    # Unpickling _replay_shard imports studies.logic, whose package imports the models. Under the
+    # spawn and forkserver start methods (the defaults on macOS and, from Python 3.14, on Linux)
+    # a worker starts without a configured Django, so set it up before the first task.
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        for shard_results in executor.map(
+            _replay_shard, shard_rows, shard_start, itertools.repeat(snapshot_interval),
+            itertools.repeat(scheduler_parameters()),
+        ):
+            results.update(shard_results)
+    return results
+
+
 def build_cards_from_logs(all_study_logs):
     """
     Build FSRS cards from study logs in a single-user system.
@@ -35,62 +810,12 @@ def build_cards_from_logs(all_study_logs):
     Returns:
         Dictionary mapping (character, type) tuples to Card objects
     """
-    # Get unique characters from the study logs
-    unique_characters = sorted(list(set(log.word.hanzi for log in all_study_logs)))
-    
-    # Group study logs by card (character, type), adding implied read records
-    records_by_card = {}
-    for log in all_study_logs:
-        char = log.word.hanzi
-        record_type = log.type
-        score = log.score
-
-        # Add the original record
-        key = (char, record_type)
-        if key not in records_by_card:
-            records_by_card[key] = []
-        records_by_card[key].append({
-            'character': char,
-            'type': record_type,
-            'score': score,
-            'date': log.study_date
-        })
-
-        # If it's a write record, add an implied read record
-        if record_type == "write":
-            read_key = (char, "read")
-            if read_key not in records_by_card:
-                records_by_card[read_key] = []
-
-            implied_read_record = {
-                "character": char,
-                "type": "read",
-                "score": min(score + 3, 10),  # Limit to 10
-                "date": log.study_date,
-            }
-            records_by_card[read_key].append(implied_read_record)
+    logs = sorted(all_study_logs, key=lambda log: log.study_date)
+    results = replay_history((log.word.hanzi, log.type, log.score, log.study_date, log.id) for log in logs)
 
     built_cards = {}
-    # Build cards
-    for char in unique_characters:
-        for card_type in ["read", "write"]:
-            card_key = (char, card_type)
-            card_records = records_by_card.get(card_key, [])
-
-            # Sort records by date before replaying
-            card_records.sort(key=lambda r: r["date"])
-
-            scheduler = read_scheduler if card_type == "read" else write_scheduler
-
-            card = Card()
-            if card_records:
-                for record in card_records:
-                    rating = score_to_rating(record["score"])
-                    review_time = datetime.datetime.combine(
-                        record["date"], 
-                        datetime.datetime.min.time()
-                    ).replace(tzinfo=datetime.timezone.utc)
-                    card, _ = scheduler.review_card(card, rating, review_time)
-
-            built_cards[card_key] = card
+    for char in sorted(set(log.word.hanzi for log in logs)):
+        for card_type in CARD_TYPES:
+            result = results.get((char, card_type))
+            built_cards[(char, card_type)] = Card.from_dict(result["card"]) if result else new_card()
     return built_cards
@@ -0,0 +1,101 @@
+"""
+Module for reproducible study and exam generation.
+
+Every generated Study and Exam stores the seed that its random choices were drawn from. A
+request with the same seed, inputs and data version as an earlier one reuses that row's
+content instead of generating it again, which also skips the AI calls.
+"""
+import hashlib
+import json
+import logging
+import random
+from datetime import date
+
+from django.db.models import Count, Max
+
+from studies.models import Lesson, LessonCharacter, WordEntry
+from . import card_state, scheduler_parameters
+
+logger = logging.getLogger(__name__)
+
+# Range of the drawn seeds
+SEED_RANGE = 2 ** 31
+# Largest seed that fits in the BigIntegerField of Study and Exam
+MAX_SEED = 2 ** 63 - 1
+
+
+def resolve_seed(value=None):
+    """
+    Return the seed given with a request, or draw a new one so the result can be reproduced later.
+    A value that is not an integer between 0 and MAX_SEED is ignored and a new seed is drawn.
+    """
+    if value is not None and value != '':
+        try:
+            seed = int(value)
+        except (TypeError, ValueError):
+            seed = None
+        if seed is not None and 0 <= seed <= MAX_SEED:
+            return seed
+        logger.warning(f"Ignoring invalid seed {value!r}")
+    return random.randrange(SEED_RANGE)
+
+
+def data_version():
+    """
+    Return a version identifying the data that generation reads: the card data
+    (card_state.data_version) and scheduler weights, the learned lessons and their
+    characters, the word list, and the day, since retrievability changes over time.
+
+    The weights are loaded here if they changed, as selections compute retrievability with them.
+
+    Edited word entries are caught by their latest update, deleted ones by the count.
+    """
+    weights = scheduler_parameters.sync()
+    learned_lessons = tuple(Lesson.objects.filter(is_learned=True).order_by('id').values_list('id', flat=True))
+    characters = LessonCharacter.objects.aggregate(last_id=Max('id'), count=Count('id'))
+    entries = WordEntry.objects.aggregate(last_id=Max('id'), count=Count('id'), updated_at=Max('updated_at'))
+    return (
+        card_state.data_version(),
+        weights,
+        learned_lessons,
+        characters['last_id'], characters['count'],
+        entries['last_id'], entries['count'], entries['updated_at'],
+        date.today(),
+    )
+
+
+def cache_key(kind, seed, inputs):
+    """
+    Return the cache key of a generation.
+
+    Args:
+        kind: Type of the generated Study or Exam
+        seed: Seed of the random choices
+        inputs: JSON-serializable dict of the other generation parameters
+    """
+    payload = json.dumps([kind, seed, inputs, data_version()], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def create_generated(model, kind, seed, inputs, generate):
+    """
+    Create a Study or Exam row holding generated content.
+
+    The content of an earlier row with the same cache key is copied when there is one,
+    otherwise generate() is called. A new row is always created so that marking it done
+    or recorded does not affect the earlier one.
+
+    Args:
+        model: Study or Exam
+        kind: Type of the row
+        seed: Seed that generate() draws its random choices from
+        inputs: JSON-serializable dict of the other generation parameters
+        generate: Callable returning the content
+
+    Returns:
+        The created row
+    """
+    key = cache_key(kind, seed, inputs)
+    cached = model.objects.filter(cache_key=key).only('content').first()
+    content = cached.content if cached is not None else generate()
+    return model.objects.create(type=kind, content=content, seed=seed, cache_key=key)
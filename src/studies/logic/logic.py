@@ -1,6 +1,9 @@
 """
 This module orchestrates the full "select -> generate -> return JSON content" pipeline for both studies and exams.
 It imports from the new modules that contain the specific logic for each step.
+
+Every creator accepts a `seed`. Selection and the content generators draw their random choices
+from one random.Random(seed), so the same seed and data produce the same sheet.
 """
 
 import random
@@ -24,15 +27,17 @@ def create_study_chars_sheet(
     book_id=None,
     lesson_id=None,
     lesson_ids=None,
+    seed=None,
 ):
     """
     Orchestrates the creation of character study sheets as JSON content.
     """
+    rng = random.Random(seed)
     # Select
     if character_list is not None:
         selected_chars = character_list
     else:
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
 
         if study_source == "review":
             # Review logic: lowest write retrievability
@@ -44,6 +49,7 @@ def create_study_chars_sheet(
                 s = s.remove_any_recent_records(days_filter)
             
             selected_chars = s.take(num_chars)
+            s.log_explain('chars study')
         else:
             # Basic logic (default)
             s = s.from_learned_lessons(book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids)
@@ -53,9 +59,10 @@ def create_study_chars_sheet(
                 s = s.remove_any_recent_records(days_filter)
 
             selected_chars = s.random(num_chars)
+            s.log_explain('chars study')
 
     # Generate
-    content = study_char_word.generate_content(selected_chars)
+    content = study_char_word.generate_content(selected_chars, rng=rng)
 
     # Return the content as a JSON-serializable structure
     result = {
@@ -77,27 +84,26 @@ def create_ch_en_matching_study(
     book_id=None,
     lesson_id=None,
     lesson_ids=None,
+    seed=None,
 ):
     """
     Create a Chinese-English matching study as JSON content.
     """
+    rng = random.Random(seed)
     # Character selection logic (similar to cloze and find_words)
     if study_source == "review":
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
         s.from_fsrs("read", due_only=False, book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids).retrievability(
             min_val=-1, max_val=1
-        ).lowest_retrievability()
+        )
         if days_filter is not None:
             s.remove_recent_records_by_type(days_filter, ["readstudy"])
 
-        all_sorted_chars = s.get_all()
-        pool_size = min(len(all_sorted_chars), num_chars * 3)
-        character_pool = all_sorted_chars[:pool_size]
-        selected_chars = random.sample(
-            character_pool, min(len(character_pool), num_chars)
-        )
+        # Draw from the num_chars * 3 lowest retrievability characters to introduce randomness
+        selected_chars = s.pool(num_chars * 3, sample=num_chars)
+        s.log_explain('ch_en_matching study')
     else:
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
         s = s.from_learned_lessons(book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids)
         if score_filter is not None:
             s = s.remove_score_greater("read", score_filter)
@@ -105,9 +111,10 @@ def create_ch_en_matching_study(
             s = s.remove_any_recent_records(days_filter)
 
         selected_chars = s.random(num_chars)
+        s.log_explain('ch_en_matching study')
 
     # Generate
-    content = study_ch_en_matching.generate_content(selected_chars)
+    content = study_ch_en_matching.generate_content(selected_chars, rng=rng)
 
     # Return the content as a JSON-serializable structure
     result = {
@@ -125,12 +132,14 @@ def create_failed_study_sheet(
     header_text=None,
     threshold=None,
     recency_days=None,
+    seed=None,
 ):
     """
     Orchestrates the creation of failed character study sheets as JSON content.
     This implementation uses the Django ORM to replicate the logic from the legacy app
     and corrects the truncation algorithm.
     """
+    rng = random.Random(seed)
     # 1. Set default values
     threshold = threshold if threshold is not None else 5
     recency_days = recency_days if recency_days is not None else 8
@@ -139,23 +148,22 @@ def create_failed_study_sheet(
     # Calculate cutoff_date
     cutoff_date = (date.today() - timedelta(days=recency_days)).isoformat()
 
-    # 2. Get failed characters using the Selection class
-    s = selection.Selection()
-    failed_read_chars = s.from_failed_records("read", cutoff_date, threshold).get_all()
-    failed_write_chars = s.from_failed_records("write", cutoff_date, threshold).get_all()
+    # 2. Get failed read and write characters in a single query
+    failed = selection.classify_failed_characters(cutoff_date, threshold)
 
     # 3. Combine and truncate the character lists with corrected logic
-    read_set = set(failed_read_chars)
-    write_set = set(failed_write_chars)
+    read_set = {char for char, kind in failed.items() if kind in ('read', 'both')}
+    write_set = {char for char, kind in failed.items() if kind in ('write', 'both')}
     
     # Characters that failed both read and write are prioritized
-    failed_both = list(read_set.intersection(write_set))
-    failed_read_only = list(read_set - write_set)
-    failed_write_only = list(write_set - read_set)
+    # Sorted so that the shuffles below only depend on the seed
+    failed_both = sorted(read_set.intersection(write_set))
+    failed_read_only = sorted(read_set - write_set)
+    failed_write_only = sorted(write_set - read_set)
 
     # Shuffle to avoid always selecting the same characters if truncation occurs
-    random.shuffle(failed_read_only)
-    random.shuffle(failed_write_only)
+    rng.shuffle(failed_read_only)
+    rng.shuffle(failed_write_only)
 
     # Combine in order of priority
     combined_chars = failed_both + failed_read_only + failed_write_only
@@ -174,7 +182,7 @@ def create_failed_study_sheet(
     # Since we are reusing study_chars.html, we merge them into a single content list.
     # The distinction between read/write failures is implicitly handled by the fact that
     # they are all "failed characters" being reviewed.
-    content = study_char_word.generate_content(final_chars)
+    content = study_char_word.generate_content(final_chars, rng=rng)
 
     # 5. Return the content as a JSON-serializable structure
     result = {
@@ -188,31 +196,27 @@ def create_failed_study_sheet(
 
 
 def create_study_review_sheet(
-    num_chars, days_filter=None, header_text=None
+    num_chars, days_filter=None, header_text=None, seed=None
 ):
     """
     Orchestrates the creation of review study sheets based on FSRS retrievability as JSON content.
     """
+    rng = random.Random(seed)
     # Select
-    s = selection.Selection()
+    s = selection.Selection(rng=rng)
     s.from_fsrs("write", due_only=False).retrievability(
         min_val=-1, max_val=1
-    ).lowest_retrievability()
+    )
     if days_filter is not None:
         # Remove characters that have been recently studied
         s.remove_recent_records_by_type(days_filter, ["readstudy", "writestudy"])
 
-    # Get all characters sorted by lowest retrievability
-    all_sorted_chars = s.get_all()
-
-    # Take a larger pool of characters, e.g., 3 times the number needed, to introduce randomness
-    pool_size = min(len(all_sorted_chars), num_chars * 3)
-    character_pool = all_sorted_chars[:pool_size]
-
-    selected_chars = random.sample(character_pool, min(len(character_pool), num_chars))
+    # Take a larger pool of the lowest retrievability characters, 3 times the number needed, to introduce randomness
+    selected_chars = s.pool(num_chars * 3, sample=num_chars)
+    s.log_explain('review study')
 
     # Generate
-    content = study_char_word.generate_content(selected_chars)
+    content = study_char_word.generate_content(selected_chars, rng=rng)
 
     # Return the content as a JSON-serializable structure
     result = {
@@ -234,26 +238,25 @@ def create_cloze_test(
     book_id=None,
     lesson_id=None,
     lesson_ids=None,
+    seed=None,
 ):
     """
     Create a cloze test as JSON content.
     """
+    rng = random.Random(seed)
     if study_source == "review":
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
         s.from_fsrs("read", due_only=False, book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids).retrievability(
             min_val=-1, max_val=1
-        ).lowest_retrievability()
+        )
         if days_filter is not None:
             s.remove_recent_records_by_type(days_filter, ["readstudy"])
 
-        all_sorted_chars = s.get_all()
-        pool_size = min(len(all_sorted_chars), num_chars * 3)
-        character_pool = all_sorted_chars[:pool_size]
-        selected_chars = random.sample(
-            character_pool, min(len(character_pool), num_chars)
-        )
+        # Draw from the num_chars * 3 lowest retrievability characters to introduce randomness
+        selected_chars = s.pool(num_chars * 3, sample=num_chars)
+        s.log_explain('cloze study')
     else:
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
 
         s = s.from_learned_lessons(book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids)
         if score_filter is not None:
@@ -262,15 +265,16 @@ def create_cloze_test(
             s = s.remove_any_recent_records(days_filter)
 
         selected_chars = s.random(num_chars)
+        s.log_explain('cloze study')
 
     # Generate
-    content = study_cloze.generate_content(selected_chars)
+    content = study_cloze.generate_content(selected_chars, rng=rng)
 
     # Prepare data for the template
     words = [item['word'] for item in content]
     shuffled_sentences = [item['cloze_sentence'] for item in content]
-    random.shuffle(words)
-    random.shuffle(shuffled_sentences)
+    rng.shuffle(words)
+    rng.shuffle(shuffled_sentences)
 
     # Return the content as a JSON-serializable structure
     result = {
@@ -293,27 +297,26 @@ def create_find_words_puzzle(
     book_id=None,
     lesson_id=None,
     lesson_ids=None,
+    seed=None,
 ):
     """
     Orchestrates the creation of find-words puzzles as JSON content.
     """
+    rng = random.Random(seed)
     # Select
     if study_source == "review":
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
         s.from_fsrs("read", due_only=False, book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids).retrievability(
             min_val=-1, max_val=1
-        ).lowest_retrievability()
+        )
         if days_filter is not None:
             s.remove_recent_records_by_type(days_filter, ["readstudy"])
 
-        all_sorted_chars = s.get_all()
-        pool_size = min(len(all_sorted_chars), num_chars * 3)
-        character_pool = all_sorted_chars[:pool_size]
-        selected_chars = random.sample(
-            character_pool, min(len(character_pool), num_chars)
-        )
+        # Draw from the num_chars * 3 lowest retrievability characters to introduce randomness
+        selected_chars = s.pool(num_chars * 3, sample=num_chars)
+        s.log_explain('words study')
     else:
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
 
         s = s.from_learned_lessons(book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids)
         if score_filter is not None:
@@ -322,9 +325,10 @@ def create_find_words_puzzle(
             s = s.remove_any_recent_records(days_filter)
 
         selected_chars = s.random(num_chars)
+        s.log_explain('words study')
 
     # Generate
-    content = study_find_words.generate_content(selected_chars)
+    content = study_find_words.generate_content(selected_chars, rng=rng)
 
     # Return the content as a JSON-serializable structure
     result = {
@@ -345,16 +349,19 @@ def create_read_exam(
     book_id=None,
     lesson_id=None,
     lesson_ids=None,
+    seed=None,
 ):
     """
     Orchestrates the creation of read exams as JSON content.
     """
+    rng = random.Random(seed)
     # Select
     if character_list is not None:
         selected_chars = character_list
     else:
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
         selected_chars = s.from_learned_lessons(book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids).random(num_chars)
+        s.log_explain('read exam')
 
     # Return the content as a JSON-serializable structure
     final_title = title if title is not None else "Reading Test"
@@ -389,29 +396,33 @@ def create_write_exam(
     book_id=None,
     lesson_id=None,
     lesson_ids=None,
+    seed=None,
 ):
     """
     Orchestrates the creation of write exams as JSON content.
     This implementation replicates the greedy algorithm from the original Flask app,
     selecting words to maximize character coverage without overlap.
     """
+    rng = random.Random(seed)
     # 1. Select initial characters
     if character_list is not None:
         selected_chars = character_list
     else:
-        s = selection.Selection()
+        s = selection.Selection(rng=rng)
         selected_chars = s.from_learned_lessons(book_id=book_id, lesson_id=lesson_id, lesson_ids=lesson_ids).random(num_chars)
+        s.log_explain('write exam')
 
     # 2. Generate word list using the greedy coverage algorithm
     remaining_chars = set(selected_chars)
     final_word_list = []
+    entries_by_char = WordEntry.objects.by_character(selected_chars)
 
     for char in selected_chars:
         if char not in remaining_chars:
             continue
 
         # Get all candidate words containing the current character
-        candidate_words = WordEntry.objects.filter(word__contains=char)
+        candidate_words = entries_by_char[char]
 
         best_word = char
         best_word_score = -1.0
@@ -439,7 +450,7 @@ def create_write_exam(
         final_word_list.append(best_word)
         remaining_chars -= set(best_word)
 
-    random.shuffle(final_word_list)
+    rng.shuffle(final_word_list)
 
     # 3. Return the content as a JSON-serializable structure
     final_title = title if title is not None else "Writing Test"
@@ -462,7 +473,7 @@ def create_write_exam(
 
 
 
-def create_review_exam(exam_type, num_chars, character_list=None):
+def create_review_exam(exam_type, num_chars, character_list=None, seed=None):
     """
     Orchestrates the creation of a review exam (read or write) based on FSRS due cards as JSON content.
     This implementation replicates the legacy app's logic of selecting due cards and then
@@ -475,13 +486,15 @@ def create_review_exam(exam_type, num_chars, character_list=None):
         s = selection.Selection()
         # Note: The Django 'selection' implementation needs to handle FSRS logic.
         # We assume it has been updated to do so.
-        due_chars = s.from_fsrs(exam_type, due_only=True).get_all()
+        # Only the num_chars due cards with the lowest retrievability are fetched
+        due_chars = s.from_fsrs(exam_type, due_only=True).lowest_k(num_chars)
+        s.log_explain('review exam')
 
     if not due_chars:
         return None  # No due characters, so no exam to generate
 
     # 2. Limit the number of characters for the review exam
-    # The legacy app sorted by due date implicitly. Here we'll just take the first `num_chars`.
+    # A given character_list is used in its own order.
     if len(due_chars) > num_chars:
         due_chars = due_chars[:num_chars]
 
@@ -495,6 +508,7 @@ def create_review_exam(exam_type, num_chars, character_list=None):
             character_list=due_chars,
             title=title,
             header_text=header_text,
+            seed=seed,
         )
     elif exam_type == "write":
         title = "Writing Review"
@@ -505,6 +519,7 @@ def create_review_exam(exam_type, num_chars, character_list=None):
             character_list=due_chars,
             title=title,
             header_text=header_text,
+            seed=seed,
         )
     else:
         raise ValueError(f"Invalid exam type for review: {exam_type}")
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Module for the FSRS scheduler weights fitted from the StudyLog history.
+
+Fitting runs offline (`manage.py fit_fsrs_parameters`) and stores the weights in
+SchedulerParameters. Every process loads them into fsrs.read_scheduler and
+fsrs.write_scheduler through sync(), which is called before cards are loaded or replayed,
+so new weights are picked up at startup and after each fit. Fitting never runs on the
+request path.
+"""
+import logging
+import threading
+from collections import defaultdict
+
+import numpy as np
+from fsrs.scheduler import LOWER_BOUNDS_PARAMETERS, UPPER_BOUNDS_PARAMETERS
+
+from studies.models import SchedulerParameters
+from . import fsrs, study_history
+
+logger = logging.getLogger(__name__)
+
+LOWER_BOUNDS = np.array(LOWER_BOUNDS_PARAMETERS)
+UPPER_BOUNDS = np.array(UPPER_BOUNDS_PARAMETERS)
+
+# Fewer scored reviews than this are not enough to fit 21 weights
+MIN_REVIEWS = 200
+
+_loaded_version = None
+_lock = threading.Lock()
+
+
+def sync():
+    """
+    Load the stored weights into the schedulers if they changed since this process last loaded them.
+    Card types without fitted weights use the defaults.
+
+    Returns:
+        Version of the loaded weights, for cache keys
+    """
+    global _loaded_version
+
+    rows = list(SchedulerParameters.objects.values_list('card_type', 'parameters', 'fitted_at'))
+    version = tuple(sorted((card_type, fitted_at.isoformat()) for card_type, _, fitted_at in rows))
+    with _lock:
+        if version != _loaded_version:
+            fitted = {card_type: parameters for card_type, parameters, _ in rows}
+            for card_type in fsrs.CARD_TYPES:
+                if fsrs.set_parameters(card_type, fitted.get(card_type)):
+                    logger.info(f"Loaded {'fitted' if card_type in fitted else 'default'} {card_type} scheduler weights")
+            _loaded_version = version
+    return version
+
+
+def review_sequences(log_rows):
+    """
+    Group the review history into padded per-card arrays.
+
+    Args:
+        log_rows: Iterable of (word_id, type, score, study_date) tuples in replay order
+
+    Returns:
+        Dictionary mapping card type to (days, ratings) int arrays of shape (cards, longest
+        history), with study dates as ordinals and Rating values, padded with rating 0
+    """
+    sequences = {card_type: defaultdict(list) for card_type in fsrs.CARD_TYPES}
+    for word_id, record_type, score, study_date in log_rows:
+        for card_type, review_score in fsrs.implied_reviews(record_type, score):
+            sequences[card_type][word_id].append((study_date.toordinal(), int(fsrs.score_to_rating(review_score))))
+
+    result = {}
+    for card_type, by_word in sequences.items():
+        length = max((len(reviews) for reviews in by_word.values()), default=0)
+        days = np.zeros((len(by_word), length), dtype=int)
+        ratings = np.zeros((len(by_word), length), dtype=int)
+        for row, reviews in enumerate(by_word.values()):
+            days[row, :len(reviews)] = [day for day, _ in reviews]
+            ratings[row, :len(reviews)] = [rating for _, rating in reviews]
+        result[card_type] = (days, ratings)
+    return result
+
+
+def scored_review_count(days, ratings):
+    """Number of reviews the log loss is computed on: those at least a day after the previous review."""
+    elapsed = np.diff(days, axis=1)
+    return int(np.count_nonzero((ratings[:, 1:] > 0) & (elapsed >= 1)))
+
+
+def log_loss(parameter_sets, days, ratings):
+    """
+    Mean log loss of predicting recall (rating above Again) from the retrievability, for many
+    weight vectors at once. All cards and weight vectors are replayed together, one review
+    position at a time.
+
+    Args:
+        parameter_sets: Array of shape (sets, 21)
+        days, ratings: Padded review sequences from review_sequences
+
+    Returns:
+        Array of shape (sets,)
+    """
+    parameter_sets = np.atleast_2d(np.asarray(parameter_sets, dtype=float))
+    w = parameter_sets.T[:, :, np.newaxis]  # Each w[i] has shape (sets, 1)
+    decay = -w[20]
+    factor = 0.9 ** (1 / decay) - 1
+
+    card_count = ratings.shape[0]
+    stability = np.ones((len(parameter_sets), card_count))
+    difficulty = np.ones((len(parameter_sets), card_count))
+    last_day = np.zeros(card_count, dtype=int)
+    started = np.zeros(card_count, dtype=bool)
+    total = np.zeros(len(parameter_sets))
+    count = 0
+
+    for position in range(ratings.shape[1]):
+        rating = ratings[:, position]
+        day = days[:, position]
+        valid = rating > 0
+        first = valid & ~started
+        reviewed = valid & started
+
+        elapsed_days = np.where(reviewed, day - last_day, 0)
+        retrievability = (1 + factor * elapsed_days / stability) ** decay
+
+        # Same-day reviews say nothing about forgetting
+        scored = reviewed & (elapsed_days >= 1)
+        if scored.any():
+            predicted = np.clip(retrievability[:, scored], 1e-6, 1 - 1e-6)
+            recalled = rating[scored] > fsrs.Rating.Again
+            total -= np.where(recalled, np.log(predicted), np.log(1 - predicted)).sum(axis=1)
+            count += int(scored.sum())
+
+        rating = np.maximum(rating, 1)
+        initial_stability, initial_difficulty = fsrs.initial_memory_state(w, rating)
+        next_stability, next_difficulty = fsrs.next_memory_state(
+            w, stability, difficulty, retrievability, rating, elapsed_days
+        )
+        stability = np.where(first, initial_stability, np.where(reviewed, next_stability, stability))
+        difficulty = np.where(first, initial_difficulty, np.where(reviewed, next_difficulty, difficulty))
+        last_day = np.where(valid, day, last_day)
+        started |= valid
+
+    return total / max(count, 1)
+
+
+def fit(days, ratings, initial, iterations=200, learning_rate=0.01, step=1e-4):
+    """
+    Fit the weights to review sequences by minimizing log_loss.
+
+    Uses Adam on the weights scaled to their bounds. The finite-difference gradient of each
+    iteration comes from a single batched log_loss call over the current weights and one
+    perturbation per weight.
+
+    Returns:
+        (parameters, loss) of the best weights seen, never worse than `initial`
+    """
+    span = UPPER_BOUNDS - LOWER_BOUNDS
+    x = np.clip((np.asarray(initial, dtype=float) - LOWER_BOUNDS) / span, 0, 1)
+    first_moment = np.zeros_like(x)
+    second_moment = np.zeros_like(x)
+    best_x, best_loss = x, None
+
+    for iteration in range(1, iterations + 1):
+        batch = np.clip(np.vstack([x, x + np.eye(len(x)) * step]), 0, 1)
+        losses = log_loss(LOWER_BOUNDS + batch * span, days, ratings)
+        if best_loss is None or losses[0] < best_loss:
+            best_x, best_loss = x, losses[0]
+
+        steps = np.diag(batch[1:]) - x
+        gradient = np.divide(losses[1:] - losses[0], steps, out=np.zeros_like(x), where=steps > 0)
+
+        first_moment = 0.9 * first_moment + 0.1 * gradient
+        second_moment = 0.999 * second_moment + 0.001 * gradient ** 2
+        corrected_first = first_moment / (1 - 0.9 ** iteration)
+        corrected_second = second_moment / (1 - 0.999 ** iteration)
+        x = np.clip(x - learning_rate * corrected_first / (np.sqrt(corrected_second) + 1e-8), 0, 1)
+
+    final_loss = log_loss(LOWER_BOUNDS + x * span, days, ratings)[0]
+    if final_loss < best_loss:
+        best_x, best_loss = x, final_loss
+    return (LOWER_BOUNDS + best_x * span).tolist(), float(best_loss)
+
+
+def fit_all(card_types=fsrs.CARD_TYPES, iterations=200, min_reviews=MIN_REVIEWS):
+    """
+    Fit the weights of each card type to the full StudyLog history and store them.
+    The caller must rebuild the card states afterwards, since they depend on the weights.
+
+    Returns:
+        Dictionary mapping card type to the saved SchedulerParameters, or None when there
+        were fewer than `min_reviews` scored reviews
+    """
+    sync()
+    sequences = review_sequences(
+        study_history.iter_log_rows(types=fsrs.CARD_TYPES, fields=('word_id', 'type', 'score', 'study_date'))
+    )
+
+    results = {}
+    for card_type in card_types:
+        days, ratings = sequences[card_type]
+        review_count = scored_review_count(days, ratings)
+        if review_count < min_reviews:
+            logger.info(f"Not fitting {card_type} weights: {review_count} reviews < {min_reviews}")
+            results[card_type] = None
+            continue
+
+        initial = fsrs.get_scheduler(card_type).parameters
+        parameters, loss = fit(days, ratings, initial, iterations=iterations)
+        logger.info(
+            f"Fitted {card_type} weights on {review_count} reviews: "
+            f"log loss {log_loss(initial, days, ratings)[0]:.4f} -> {loss:.4f}"
+        )
+        results[card_type], _ = SchedulerParameters.objects.update_or_create(
+            card_type=card_type,
+            defaults={'parameters': parameters, 'review_count': review_count, 'log_loss': loss},
+        )
+    return results
@@ -6,15 +6,138 @@ using a fluent (chainable) API. It supports various sources (lessons, FSRS cards
 filtering operations adapted to work with Django models.
 """
 
+import functools
+import logging
 import random
 import sys
+import time
+from dataclasses import dataclass
 from datetime import date, timedelta, datetime, timezone
 from typing import List, Optional
 
-from studies.models import Word, StudyLog, Lesson
-from . import fsrs
-from django.db.models import Window, F
-from django.db.models.functions import RowNumber
+from studies.models import CardState, Word, StudyLog, Lesson, LessonCharacter, WordProgress
+from . import card_state, word_progress
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, FirstValue, RowNumber
+
+logger = logging.getLogger(__name__)
+
+
+def learned_lesson_words(book_id: Optional[int] = None, lesson_id: Optional[int] = None, lesson_ids: Optional[List[int]] = None):
+    """
+    Return the words of lessons marked as learned, as a lazy Word QuerySet.
+    Optionally filter by book_id, lesson_id, or a list of lesson_ids.
+    """
+    lessons = Lesson.objects.filter(is_learned=True)
+
+    if book_id:
+        lessons = lessons.filter(book_id=book_id)
+    if lesson_id:
+        lessons = lessons.filter(id=lesson_id)
+    if lesson_ids:
+        lessons = lessons.filter(id__in=lesson_ids)
+
+    lesson_words = LessonCharacter.objects.filter(lesson__in=lessons).values('word_id')
+    return Word.objects.filter(id__in=lesson_words)
+
+
+def latest_failed_logs(cutoff_date: str, threshold: int, types: List[str]):
+    """
+    Return the latest StudyLog of each (word, type) since cutoff_date whose score is below
+    threshold, as a lazy QuerySet. Logs are ranked newest first per (word, type) with
+    ROW_NUMBER(), so this is a single window-function query.
+    """
+    partition = [F('word_id'), F('type')]
+    newest_first = [F('study_date').desc(), F('id').desc()]
+    return StudyLog.objects.filter(
+        study_date__gte=cutoff_date,
+        type__in=types
+    ).annotate(
+        row_number=Window(RowNumber(), partition_by=partition, order_by=newest_first),
+        latest_score=Window(FirstValue('score'), partition_by=partition, order_by=newest_first),
+    ).filter(row_number=1, latest_score__lt=threshold).order_by()
+
+
+def classify_failed_characters(cutoff_date: str, threshold: int) -> dict:
+    """
+    Return the characters whose latest read or write score since cutoff_date is below threshold.
+
+    Returns:
+        dict: Mapping of character to 'read', 'write' or 'both'
+    """
+    failed = {}
+    for char, record_type in latest_failed_logs(cutoff_date, threshold, ['read', 'write']).values_list('word__hanzi', 'type'):
+        failed[char] = 'both' if char in failed else record_type
+    return failed
+
+
+@dataclass
+class Candidate:
+    """An FSRS card fetched by a Selection, with the few fields downstream steps need."""
+    char: str
+    word_id: int
+    retrievability: float
+    due: Optional[datetime]
+    card_type: str
+
+
+CANDIDATE_FIELDS = ('word__hanzi', 'word_id', 'retrievability', 'due', 'card_type')
+
+
+@dataclass
+class StepProfile:
+    """Measurements of one step of a profiled Selection."""
+    step: str
+    seconds: float
+    queries: int
+    candidates_in: Optional[int]
+    candidates_out: Optional[int]
+
+
+class _QueryCounter:
+    """connection.execute_wrapper that counts the executed statements."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _profiled(method):
+    """
+    Record a StepProfile for a Selection step when profiling is enabled.
+    Steps called by another profiled step are folded into the outer one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.profile or self._in_step:
+            return method(self, *args, **kwargs)
+
+        self._in_step = True
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                result = method(self, *args, **kwargs)
+                # Steps only extend the query, so count its rows to measure the step
+                candidates_out = len(result) if isinstance(result, list) else self.queryset.count()
+        finally:
+            self._in_step = False
+
+        candidates_in = self.profile_steps[-1].candidates_out if self.profile_steps else None
+        self.profile_steps.append(StepProfile(
+            step=method.__name__,
+            seconds=time.perf_counter() - start,
+            queries=counter.count,
+            candidates_in=None if method.__name__.startswith('from_') else candidates_in,
+            candidates_out=candidates_out,
+        ))
+        return result
+    return wrapper
 
 
 class Selection:
@@ -29,14 +152,71 @@ class Selection:
             .random(10)
     """
 
-    def __init__(self):
+    def __init__(self, profile: Optional[bool] = None, rng: Optional[random.Random] = None):
         """
         Initialize the Selection for a single-user system.
+
+        Sources and filters only build a QuerySet, either of Word rows or of CardState rows
+        annotated with retrievability (FSRS mode). It is compiled into a single SQL statement
+        when the characters are fetched by random(), take() or get_all().
+
+        In FSRS mode the fetched rows are slim Candidate records rather than CardState
+        instances. The records behind the last returned characters are kept in candidates.
+
+        Args:
+            profile (bool, optional): Record the wall time, query count and candidates of each
+                step for explain(). Defaults to settings.SELECTION_PROFILE.
+            rng (random.Random, optional): Generator drawing the random samples, seeded to make
+                the selection reproducible. Defaults to the random module.
+        """
+        self.queryset = Word.objects.none()
+        self.is_fsrs_mode = False
+        self.rng = rng if rng is not None else random
+        self.profile = getattr(settings, 'SELECTION_PROFILE', False) if profile is None else profile
+        self.profile_steps: List[StepProfile] = []
+        self.candidates: List[Candidate] = []
+        self._in_step = False
+
+    def explain(self) -> str:
+        """
+        Return a report of the profiled steps, one line per step.
+
+        While profiling, every step also counts the candidates it leaves, so its wall time and
+        queries include running the query built so far. A jump between consecutive steps
+        points at the expensive one.
+        """
+        if not self.profile:
+            return "Selection profiling is disabled"
+
+        lines = [f"{'step':<32} {'ms':>9} {'queries':>7} {'in':>7} {'out':>7}"]
+        for step in self.profile_steps:
+            candidates_in = '' if step.candidates_in is None else step.candidates_in
+            lines.append(
+                f"{step.step:<32} {step.seconds * 1000:>9.2f} {step.queries:>7} {candidates_in:>7} {step.candidates_out:>7}"
+            )
+        for candidate in self.candidates:
+            due = candidate.due.date() if candidate.due else 'never'
+            lines.append(f"{candidate.char} {candidate.card_type} retrievability {candidate.retrievability:.3f}, due {due}")
+        return "\n".join(lines)
+
+    def log_explain(self, label: str) -> None:
         """
-        self.words: List[Word] = []
-        self.study_logs: List[StudyLog] = []  # List of StudyLog objects
+        Log the explain() report at debug level when profiling is enabled.
+        The report is only formatted when debug logging is on.
+        """
+        if self.profile and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Selection for {label}:\n{self.explain()}")
+
+    def _set_words(self, words) -> "Selection":
+        self.queryset = words
         self.is_fsrs_mode = False
+        return self
+
+    def _word_ref(self):
+        """Reference to the selected word's id, for correlated subqueries."""
+        return OuterRef('word_id' if self.is_fsrs_mode else 'pk')
 
+    @_profiled
     def from_learned_lessons(self, book_id: Optional[int] = None, lesson_id: Optional[int] = None, lesson_ids: Optional[List[int]] = None) -> "Selection":
         """
         Populate the selection with all unique characters from lessons marked as learned.
@@ -50,35 +230,9 @@ class Selection:
         Returns:
             Selection: Self for method chaining
         """
-        self.study_logs = []
-        
-        lessons = Lesson.objects.filter(is_learned=True)
-        
-        if book_id:
-            lessons = lessons.filter(book_id=book_id)
-        if lesson_id:
-            lessons = lessons.filter(id=lesson_id)
-        if lesson_ids:
-            lessons = lessons.filter(id__in=lesson_ids)
-            
-        # Extract characters from all learned lessons
-        # Robustly handle comma-separated or continuous strings
-        all_chars = set()
-        for lesson in lessons:
-            if lesson.characters:
-                # Remove commas and whitespace, treat everything else as potential characters
-                cleaned = lesson.characters.replace(',', '').replace(' ', '').replace('\t', '').replace('\n', '')
-                all_chars.update(list(cleaned))
-        
-        # Query words matching these characters
-        if all_chars:
-            self.words = list(Word.objects.filter(hanzi__in=list(all_chars)))
-        else:
-            self.words = []
-            
-        self.is_fsrs_mode = False
-        return self
+        return self._set_words(learned_lesson_words(book_id, lesson_id, lesson_ids))
 
+    @_profiled
     def from_fsrs(self, card_type: str, due_only: bool = False, book_id: Optional[int] = None, lesson_id: Optional[int] = None, lesson_ids: Optional[List[int]] = None) -> "Selection":
         """
         Populate the selection with FSRS cards of a specific type, filtered by learned lessons.
@@ -95,82 +249,23 @@ class Selection:
         Returns:
             Selection: Self for method chaining
         """
-        self.words = []
-        study_logs_list = []
-
-        # First, get the set of characters from learned lessons
-        lessons = Lesson.objects.filter(is_learned=True)
-        
-        if book_id:
-            lessons = lessons.filter(book_id=book_id)
-        if lesson_id:
-            lessons = lessons.filter(id=lesson_id)
-        if lesson_ids:
-            lessons = lessons.filter(id__in=lesson_ids)
-            
-        # Extract characters from all learned lessons
-        all_chars = set()
-        for lesson in lessons:
-            if lesson.characters:
-                # Remove commas and whitespace, treat everything else as potential characters
-                cleaned = lesson.characters.replace(',', '').replace(' ', '').replace('\t', '').replace('\n', '')
-                all_chars.update(list(cleaned))
-
-        learned_chars = all_chars
-
-        # Get all study logs for characters in learned lessons
-        all_study_logs = StudyLog.objects.filter(word__hanzi__in=learned_chars).select_related('word')
-        
-        # Build FSRS cards from the filtered logs to calculate retrievability
-        fsrs_cards = fsrs.build_cards_from_logs(list(all_study_logs))
-        
-        # Iterate through all fsrs_cards and filter by card_type
+        # Stored FSRS cards of the words of learned lessons, with retrievability computed by
+        # the database. Every word with a card state has study logs.
         today = datetime.now(timezone.utc)
-        
-        for (char, card_card_type), card in fsrs_cards.items():
-            # Only consider cards of the specified type
-            if card_card_type == card_type:
-                # Check if the card is due if due_only is True
-                is_due = False
-                if due_only:
-                    # Card is due if the due date is today or earlier
-                    if hasattr(card, 'due') and card.due and card.due <= today:
-                        is_due = True
-                else:
-                    is_due = True  # If not checking due only, include all cards of this type
-
-                if is_due:
-                    # Find a representative study log for this character to use in the data structure
-                    representative_log = next(
-                        (log for log in all_study_logs if log.word.hanzi == char), 
-                        None
-                    )
-                    
-                    if representative_log:
-                        # Calculate retrievability for display purposes
-                        retrievability = None
-                        if card_type == "read":
-                            retrievability = fsrs.read_scheduler.get_card_retrievability(
-                                card, today
-                            )
-                        elif card_type == "write":
-                            retrievability = fsrs.write_scheduler.get_card_retrievability(
-                                card, today
-                            )
-
-                        if retrievability is not None:
-                            study_log_data = {
-                                "study_log": representative_log,
-                                "retrievability": float(retrievability),
-                                "word": representative_log.word,
-                            }
-                            study_logs_list.append(study_log_data)
-                        # If retrievability is None, skip this card to match old behavior
-
-        self.study_logs = study_logs_list
+        learned_words = learned_lesson_words(book_id, lesson_id, lesson_ids)
+        states = CardState.objects.filter(card_type=card_type, word__in=learned_words)
+
+        # Only consider cards of the specified type, and if due_only, those due today or earlier
+        if due_only:
+            states = states.filter(due__lte=today)
+
+        self.queryset = states.annotate(
+            retrievability=card_state.retrievability_expression(card_type, today)
+        ).order_by('id')
         self.is_fsrs_mode = True
         return self
 
+    @_profiled
     def from_failed_records(
         self, record_type: str, cutoff_date: str, threshold: int
     ) -> "Selection":
@@ -187,28 +282,10 @@ class Selection:
         Returns:
             Selection: Self for method chaining
         """
-        self.study_logs = []
-        
-        # Get the most recent score for each word that is below the threshold
-        # This requires finding the latest StudyLog for each word
-        from django.db.models import Max
-        
-        # Filter study logs by cutoff date and type
-        study_logs_queryset = StudyLog.objects.filter(
-            study_date__gte=cutoff_date,
-            type=record_type  # Filter by the specified record type
-        ).values('word').annotate(latest_id=Max('id')).values_list('latest_id', flat=True)
-        
-        # Get the actual study logs
-        latest_study_logs = StudyLog.objects.filter(id__in=study_logs_queryset).filter(score__lt=threshold)
-        
-        # Get the words for these logs
-        failed_words = list(Word.objects.filter(study_logs__in=latest_study_logs).distinct())
-
-        self.words = failed_words
-        self.is_fsrs_mode = False
-        return self
+        failed_logs = latest_failed_logs(cutoff_date, threshold, [record_type])
+        return self._set_words(Word.objects.filter(id__in=failed_logs.values('word_id')))
 
+    @_profiled
     def remove_any_recent_records(self, days: int) -> "Selection":
         """
         Filter out characters that have any record within the last days.
@@ -221,6 +298,7 @@ class Selection:
         """
         return self._remove_records(days)
 
+    @_profiled
     def remove_recent_records_by_type(self, days: int, types: List[str]) -> "Selection":
         """
         Filter out characters that have a record of the specified types within the last days.
@@ -244,41 +322,25 @@ class Selection:
         """
         Private helper to filter out characters based on recent records.
         """
-        if types is None:
-            types = []
-
         cutoff_date = (date.today() - timedelta(days=days)).isoformat()
 
-        # Get recent words from study logs
+        # NOT EXISTS a progress summary of the selected word studied since the cutoff
+        recent_progress = WordProgress.objects.filter(
+            word_id=self._word_ref(),
+            latest_date__gte=cutoff_date
+        )
         if types:
             # If specific types are provided, filter by those types
-            recent_study_logs = StudyLog.objects.filter(
-                study_date__gte=cutoff_date,
-                type__in=types
-            ).values_list('word__hanzi', flat=True)
-        else:
-            recent_study_logs = StudyLog.objects.filter(
-                study_date__gte=cutoff_date
-            ).values_list('word__hanzi', flat=True)
-
-        recent_chars = set(recent_study_logs)
-
-        if self.is_fsrs_mode:
-            # Filter the FSRS records
-            self.study_logs = [
-                log for log in self.study_logs if log["word"].hanzi not in recent_chars
-            ]
-        else:
-            # Filter the word list
-            self.words = [
-                word for word in self.words if word.hanzi not in recent_chars
-            ]
+            recent_progress = recent_progress.filter(record_type__in=types)
 
+        self.queryset = self.queryset.filter(~Exists(recent_progress))
         return self
 
+    @_profiled
     def remove_score_greater(self, record_type: str, score: float) -> "Selection":
         """
         Filter out characters whose latest score for a given record type is greater than score.
+        Characters without a record of that type count as a score of 0.
 
         Args:
             record_type (str): The record type ('read', 'write', etc.)
@@ -287,21 +349,17 @@ class Selection:
         Returns:
             Selection: Self for method chaining
         """
-        scores = self._get_latest_scores(record_type)
-
-        if self.is_fsrs_mode:
-            # Filter FSRS records based on their character's score
-            self.study_logs = [
-                log for log in self.study_logs if scores.get(log["word"].hanzi, 0) <= score
-            ]
-        else:
-            # Filter word list based on scores
-            self.words = [
-                word for word in self.words if scores.get(word.hanzi, 0) <= score
-            ]
+        latest_score = WordProgress.objects.filter(
+            word_id=self._word_ref(),
+            record_type=record_type
+        ).values('latest_score')
 
+        self.queryset = self.queryset.alias(
+            latest_score=Coalesce(Subquery(latest_score), 0)
+        ).filter(latest_score__lte=score)
         return self
 
+    @_profiled
     def lowest_retrievability(self) -> "Selection":
         """
         Sort the FSRS records by their retrievability score in ascending order (lowest first).
@@ -315,10 +373,11 @@ class Selection:
                 "lowest_retrievability() can only be called after from_fsrs()"
             )
 
-        # Sort the records by retrievability score (ascending)
-        self.study_logs.sort(key=lambda x: x["retrievability"])
+        # Sort the records by retrievability score (ascending), ties in card order
+        self.queryset = self.queryset.order_by('retrievability', 'id')
         return self
 
+    @_profiled
     def retrievability(self, min_val: float = -1, max_val: float = 1) -> "Selection":
         """
         Filter the FSRS records by their retrievability score within the given range [min_val, max_val].
@@ -335,33 +394,28 @@ class Selection:
             raise ValueError("retrievability() can only be called after from_fsrs()")
 
         # Filter the records by retrievability score within the specified range
-        self.study_logs = [
-            log
-            for log in self.study_logs
-            if min_val <= log["retrievability"] <= max_val
-        ]
+        self.queryset = self.queryset.filter(
+            retrievability__gte=min_val, retrievability__lte=max_val
+        )
         return self
 
+    @_profiled
     def random(self, n: int) -> List[str]:
         """
         Return a list of n random characters from the current selection.
 
+        The candidates are fetched in a stable order and sampled with self.rng, so a seeded
+        generator draws the same characters from the same data.
+
         Args:
             n (int): Number of characters to select randomly
 
         Returns:
             list: List of randomly selected characters
         """
-        if self.is_fsrs_mode:
-            chars = [log["word"].hanzi for log in self.study_logs]
-        else:
-            chars = [word.hanzi for word in self.words]
-
-        if len(chars) <= n:
-            return chars
-        else:
-            return random.sample(chars, k=n)
+        return self._sample(self._characters(self.queryset), n)
 
+    @_profiled
     def take(self, n: int) -> List[str]:
         """
         Return a list of the first n characters. This is typically used after a sorting method.
@@ -372,13 +426,42 @@ class Selection:
         Returns:
             list: List of first n characters
         """
-        if self.is_fsrs_mode:
-            chars = [log["word"].hanzi for log in self.study_logs]
-        else:
-            chars = [word.hanzi for word in self.words]
+        # Only the first n rows are fetched
+        return self._characters(self.queryset[:n])
+
+    @_profiled
+    def lowest_k(self, k: int) -> List[str]:
+        """
+        Return the k characters with the lowest retrievability.
+        This method requires from_fsrs() to be called first.
+
+        The database runs ORDER BY ... LIMIT k, which keeps only the k lowest rows while
+        sorting, and only those k characters are fetched.
+
+        Args:
+            k (int): Number of characters to return
+
+        Returns:
+            list: Up to k characters, lowest retrievability first
+        """
+        return self.lowest_retrievability().take(k)
+
+    @_profiled
+    def pool(self, k: int, sample: int) -> List[str]:
+        """
+        Return `sample` random characters from the k with the lowest retrievability.
+        This method requires from_fsrs() to be called first.
+
+        Args:
+            k (int): Size of the candidate pool
+            sample (int): Number of characters to draw from the pool
 
-        return chars[:n]
+        Returns:
+            list: Randomly selected characters
+        """
+        return self._sample(self.lowest_k(k), sample)
 
+    @_profiled
     def get_all(self) -> List[str]:
         """
         Return all characters in the current selection.
@@ -386,14 +469,26 @@ class Selection:
         Returns:
             list: List of all characters in selection
         """
+        return self._characters(self.queryset)
+
+    def _characters(self, queryset) -> List[str]:
+        if not self.is_fsrs_mode:
+            self.candidates = []
+            return list(queryset.values_list('hanzi', flat=True))
+        self.candidates = [Candidate(*row) for row in queryset.values_list(*CANDIDATE_FIELDS)]
+        return [candidate.char for candidate in self.candidates]
+
+    def _sample(self, characters: List[str], n: int) -> List[str]:
+        # Sample positions, so the kept candidates follow the drawn characters
+        rows = self.rng.sample(range(len(characters)), min(len(characters), n))
         if self.is_fsrs_mode:
-            return [log["word"].hanzi for log in self.study_logs]
-        else:
-            return [word.hanzi for word in self.words]
+            self.candidates = [self.candidates[row] for row in rows]
+        return [characters[row] for row in rows]
 
     def get_hard_mode_words(self, record_type: str) -> List[Word]:
         """
         Identify words that are in "Hard Mode" (2 consecutive failures with score <= 1).
+        Read from the WordProgress summaries maintained as logs are written.
         
         Args:
             record_type (str): The record type to check ('read' or 'write')
@@ -401,53 +496,9 @@ class Selection:
         Returns:
             List[Word]: List of Word objects in hard mode
         """
-        # We need to look at the last 2 records for each word
-        # Using a subquery approach to get the recent logs efficiently
-        
-        # 1. Fetch all relevant logs for the type, ordered by date desc
-        logs = StudyLog.objects.filter(type=record_type).order_by('word_id', '-study_date', '-id')
-        
-        # In memory processing (simpler than complex window functions in SQLite/Django)
-        # Assuming database size is manageable. If large, need raw SQL or window functions.
-        # Given personal use app, in-memory is fine.
-        
-        hard_mode_word_ids = set()
-        from collections import defaultdict
-        
-        # We only need the last 2 records per word
-        # Optimization: distinct words first, then fetch last 2
-        # Or just iterate since we're ordering by word
-        
-        current_word_id = None
-        consecutive_fails = 0
-        skip_current_word = False
-        
-        # Iterate through logs. Logs are ordered by word, then date desc.
-        for log in logs:
-            if log.word_id != current_word_id:
-                # New word
-                current_word_id = log.word_id
-                consecutive_fails = 0
-                skip_current_word = False
-                
-            if skip_current_word:
-                continue
-                
-            # Check if this log is a failure
-            if log.score is not None and log.score <= 1:
-                consecutive_fails += 1
-            else:
-                # Sequence broken by a pass (or score > 1)
-                # Since we look at newest first, a pass means the current streak is broken/non-existent.
-                skip_current_word = True
-                continue
-                
-            if consecutive_fails >= 2:
-                hard_mode_word_ids.add(current_word_id)
-                skip_current_word = True # Found status, stop checking this word
-                 
-        return list(Word.objects.filter(id__in=hard_mode_word_ids))
+        return list(Word.objects.filter(id__in=word_progress.hard_mode_word_ids(record_type)))
 
+    @_profiled
     def remove_hard_mode_words(self, record_type: str) -> "Selection":
         """
         Filter out words that are in Hard Mode for the specified record type.
@@ -458,22 +509,16 @@ class Selection:
         Returns:
             Selection: Self for method chaining
         """
-        hard_mode_words = self.get_hard_mode_words(record_type)
-        hard_mode_ids = {w.id for w in hard_mode_words}
-        
+        hard_mode_ids = word_progress.hard_mode_word_ids(record_type)
+
         if self.is_fsrs_mode:
-            self.study_logs = [
-                log for log in self.study_logs 
-                if log["word"].id not in hard_mode_ids
-            ]
+            self.queryset = self.queryset.exclude(word_id__in=hard_mode_ids)
         else:
-            self.words = [
-                word for word in self.words 
-                if word.id not in hard_mode_ids
-            ]
-            
+            self.queryset = self.queryset.exclude(id__in=hard_mode_ids)
+
         return self
 
+    @_profiled
     def from_hard_mode(self, record_type: str) -> "Selection":
         """
         Populate selection with words currently in Hard Mode.
@@ -484,37 +529,4 @@ class Selection:
         Returns:
             Selection: Self for method chaining
         """
-        self.words = self.get_hard_mode_words(record_type)
-        self.study_logs = []
-        self.is_fsrs_mode = False
-        return self
-
-    def _get_latest_scores(self, exam_type):
-        """
-        Get the latest scores for all characters of a specific exam type.
-
-        Args:
-            exam_type (str): The exam type to get scores for
-
-        Returns:
-            dict: Dictionary mapping character to latest score
-        """
-        scores = {}
-        
-        # Get the latest score for each word
-        from django.db.models import Max
-        
-        # Get the IDs of the latest study logs for each word
-        latest_logs = StudyLog.objects.filter(
-            type=exam_type
-        ).values('word').annotate(
-            latest_id=Max('id')
-        ).values_list('latest_id', flat=True)
-        
-        # Get the actual latest study logs
-        latest_study_logs = StudyLog.objects.filter(id__in=latest_logs)
-        
-        for log in latest_study_logs:
-            scores[log.word.hanzi] = log.score
-            
-        return scores
\ No newline at end of file
+        return self._set_words(Word.objects.filter(id__in=word_progress.hard_mode_word_ids(record_type)))
@@ -4,35 +4,31 @@ from datetime import datetime, timezone
 from google import genai
 from pydantic import BaseModel
 
-from . import fsrs
-from studies.models import StudyLog
+from . import fsrs, card_state
 
 class SentencePair(BaseModel):
     word: str
     sentence: str
 
-def calculate_sentence_score(sentence: str, fsrs_cards: dict) -> float:
+def calculate_sentence_score(sentence: str, read_retrievability: dict) -> float:
     """
     Calculate the score for a sentence based on character FSRS retrievability scores.
     For each character in the sentence, get the FSRS retrievability score (type "read").
     Calculate the score as: COUNTIF(character_score > 90%) for each character's score.
     Here 90% is a threshold where a character is considered good enough.
+
+    Args:
+        sentence: The sentence to score
+        read_retrievability: Dictionary mapping character to its read retrievability,
+            see fsrs.retrievability_by_character
     """
     total_score = 0
     sentence_chars = set(sentence)
-    today = datetime.now(timezone.utc)
 
     for char in sentence_chars:
         if char in ['，','。', '？', '！', '：', '“', '”']:
             continue
-        retrievability = None
-        if (char, "read") in fsrs_cards:
-            card = fsrs_cards[(char, "read")]
-            retrievability = fsrs.read_scheduler.get_card_retrievability(
-                card, today
-            )
-
-        char_score = retrievability if retrievability is not None else 0
+        char_score = read_retrievability.get(char, 0)
         if char_score > 0.9:
             total_score += 1
         else:
@@ -54,10 +50,6 @@ def generate_best_sentences(words: List[str], min_score: int = 4) -> Dict[str, s
 
     words_str = ", ".join(words)
 
-    # Build FSRS cards once to pass to the scoring function
-    all_logs = list(StudyLog.objects.filter(type__in=['read', 'write']).select_related('word'))
-    fsrs_cards = fsrs.build_cards_from_logs(all_logs)
-
     client = genai.Client()
     try:
         response = client.models.generate_content(
@@ -80,16 +72,24 @@ def generate_best_sentences(words: List[str], min_score: int = 4) -> Dict[str, s
                 word_to_sentences[word] = []
             word_to_sentences[word].append(sentence)
 
+        # Calculate retrievability once, for only the characters in the sentences
+        sentence_chars = set()
+        for sentences in word_to_sentences.values():
+            for sentence in sentences:
+                sentence_chars.update(sentence)
+        fsrs_cards = card_state.load_cards(characters=sentence_chars)
+        read_retrievability = fsrs.retrievability_by_character(fsrs_cards, "read", datetime.now(timezone.utc))
+
         best_sentences = {}
         for word in words:
             if word in word_to_sentences:
                 sentences = word_to_sentences[word]
                 # Calculate score for each sentence and select the one with the highest score
                 best_sentence = sentences[0]
-                best_score = calculate_sentence_score(sentences[0], fsrs_cards)
+                best_score = calculate_sentence_score(sentences[0], read_retrievability)
 
                 for sentence in sentences[1:]:
-                    score = calculate_sentence_score(sentence, fsrs_cards)
+                    score = calculate_sentence_score(sentence, read_retrievability)
                     if score > best_score:
                         best_score = score
                         best_sentence = sentence
@@ -0,0 +1,99 @@
+"""
+Module for Monte Carlo simulation of the coming review schedule.
+
+Simulates many runs of the next days of review exams over the whole card population at
+once, using the FSRS parameters and desired retention of fsrs.read_scheduler and
+fsrs.write_scheduler. Each day, the due cards with the lowest retrievability are reviewed
+up to a daily limit (like review exams), outcomes are sampled from the current
+retrievability, and the memory states are updated with fsrs.next_memory_state on NumPy
+arrays of shape (runs, cards).
+
+Simplifications: a recalled card is rated Good and a forgotten card Again; a forgotten card is
+due again the next day (relearning steps are shorter than a day); no interval fuzz; write
+reviews do not add implied read reviews.
+"""
+import numpy as np
+
+from . import fsrs
+
+
+def simulate(cards, card_type, start, days=30, daily_limit=None, runs=200, seed=None):
+    """
+    Simulate the next `days` days of reviews of one card type.
+
+    Args:
+        cards: fsrs.CardStore; cards that were never reviewed are ignored
+        card_type: 'read' or 'write', selects the scheduler
+        start: Timezone-aware datetime at the start of the first day
+        days: Number of days to simulate
+        daily_limit: Maximum number of cards reviewed per day, or None for no limit
+        runs: Number of simulated runs
+        seed: Optional seed for the random generator
+
+    Returns:
+        Dictionary with the number of "cards" and, averaged over runs, per day:
+            "reviews": cards reviewed
+            "backlog": due cards left unreviewed at the end of the day
+            "retention": mean retrievability of all cards at the start of the day
+        and "backlog_p90", the 90th percentile of the backlog on each day
+    """
+    scheduler = fsrs.get_scheduler(card_type)
+    parameters = np.asarray(scheduler.parameters, dtype=float)
+    decay = -parameters[20]
+    factor = 0.9 ** (1 / decay) - 1
+    interval_factor = (scheduler.desired_retention ** (1 / decay) - 1) / factor
+
+    array = cards.array(card_type)
+    array = array[~np.isnan(array["last_review"])]
+    count = len(array)
+    start_timestamp = start.timestamp()
+
+    # Times are whole days relative to the start
+    stability = np.tile(array["stability"], (runs, 1))
+    difficulty = np.tile(array["difficulty"], (runs, 1))
+    last_review = np.tile(np.floor((array["last_review"] - start_timestamp) / fsrs.SECONDS_PER_DAY), (runs, 1))
+    due = np.tile(np.maximum(0, np.floor((array["due"] - start_timestamp) / fsrs.SECONDS_PER_DAY)), (runs, 1))
+
+    rng = np.random.default_rng(seed)
+    reviews = np.zeros((runs, days))
+    backlog = np.zeros((runs, days))
+    retention = np.zeros((runs, days))
+
+    for day in range(days):
+        if count == 0:
+            break
+        elapsed_days = np.maximum(0, day - last_review)
+        retrievability = (1 + factor * elapsed_days / stability) ** decay
+        is_due = due <= day
+
+        if daily_limit is None:
+            reviewed = is_due
+        else:
+            # Review exams take the due cards with the lowest retrievability first
+            priority = np.where(is_due, retrievability, np.inf)
+            rank = np.argsort(np.argsort(priority, axis=1, kind="stable"), axis=1)
+            reviewed = is_due & (rank < daily_limit)
+
+        recalled = rng.random((runs, count)) < retrievability
+        rating = np.where(recalled, fsrs.Rating.Good, fsrs.Rating.Again)
+        next_stability, next_difficulty = fsrs.next_memory_state(
+            parameters, stability, difficulty, retrievability, rating, elapsed_days
+        )
+        interval = np.clip(np.round(next_stability * interval_factor), 1, scheduler.maximum_interval)
+
+        stability = np.where(reviewed, next_stability, stability)
+        difficulty = np.where(reviewed, next_difficulty, difficulty)
+        last_review = np.where(reviewed, day, last_review)
+        due = np.where(reviewed, day + np.where(recalled, interval, 1), due)
+
+        reviews[:, day] = reviewed.sum(axis=1)
+        backlog[:, day] = (is_due & ~reviewed).sum(axis=1)
+        retention[:, day] = retrievability.mean(axis=1)
+
+    return {
+        "cards": count,
+        "reviews": reviews.mean(axis=0).tolist(),
+        "backlog": backlog.mean(axis=0).tolist(),
+        "backlog_p90": np.percentile(backlog, 90, axis=0).tolist(),
+        "retention": retention.mean(axis=0).tolist(),
+    }
@@ -1,6 +1,9 @@
 from . import fsrs
 from . import selection
 import logging
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,12 @@ def calculate_character_stats(fsrs_cards, local_now):
     read_hard_words = {w.hanzi for w in s.get_hard_mode_words('read')}
     write_hard_words = {w.hanzi for w in s.get_hard_mode_words('write')}
 
+    # Calculate all retrievabilities in one batch per card type
+    retrievabilities = {
+        card_type: fsrs.retrievability_by_character(fsrs_cards, card_type, local_now)
+        for card_type in ["read", "write"]
+    }
+
     for (char, card_type), card in fsrs_cards.items():
         if char not in stats_data:
             stats_data[char] = {
@@ -31,8 +40,7 @@ def calculate_character_stats(fsrs_cards, local_now):
         stats_data[char][card_type]["is_hard_mode"] = is_hard
 
         try:
-            scheduler = fsrs.read_scheduler if card_type == "read" else fsrs.write_scheduler
-            retrievability_val = scheduler.get_card_retrievability(card, local_now)
+            retrievability_val = retrievabilities[card_type][char]
             
             if retrievability_val is not None:
                 stats_data[char][card_type]["retrievability"] = float(retrievability_val)
@@ -93,45 +101,128 @@ def aggregate_lesson_stats(character_stats, lesson_chars):
     return aggregated
 
 
-def calculate_recent_history(all_study_logs, local_now):
+def calculate_recent_history(log_rows, local_now):
     """
     Calculate recent study history (last 3 reviews) for each character.
+
+    Args:
+        log_rows: Iterable of (character, type, score, study_date) tuples sorted newest first,
+            see study_history.iter_log_rows
+        local_now: Current local datetime
+
     Returns: dict[char][type] -> list of {days_ago, color}
     """
     history_data = {}
-    
-    # Process logs in memory. Assuming all_study_logs is a list or QuerySet.
-    # We need them sorted by date desc for "recent". 
-    # Can't assume input is sorted.
-    
-    # Group by (char, type)
-    from collections import defaultdict
-    logs_by_key = defaultdict(list)
-    
-    for log in all_study_logs:
-        logs_by_key[(log.word.hanzi, log.type)].append(log)
-        
-    for (char, record_type), logs in logs_by_key.items():
+
+    # Rows arrive newest first, so only the first 3 of each (char, type) are kept
+    for char, record_type, score, study_date in log_rows:
         if char not in history_data:
             history_data[char] = {
                 "read": [],
                 "write": []
             }
-        
-        # Sort logs by date descending and take top 3
-        logs.sort(key=lambda x: x.study_date, reverse=True)
-        recent_logs = logs[:3]
-        
-        records_list = []
-        for log in recent_logs:
-            days_ago = (local_now.date() - log.study_date).days
-            rating = fsrs.score_to_rating(log.score if log.score is not None else 0)
-            color = fsrs.RATING_TO_COLOR.get(rating, "")
-            records_list.append({"days_ago": days_ago, "color": color})
-            
-        # User wants chronological order (Oldest -> Newest) for the display
-        # We fetched newest first (to get top 3), so we reverse now.
-        records_list.reverse()
-        history_data[char][record_type] = records_list
-            
+        records_list = history_data[char].setdefault(record_type, [])
+        if len(records_list) >= 3:
+            continue
+
+        days_ago = (local_now.date() - study_date).days
+        rating = fsrs.score_to_rating(score if score is not None else 0)
+        color = fsrs.RATING_TO_COLOR.get(rating, "")
+        records_list.append({"days_ago": days_ago, "color": color})
+
+    # User wants chronological order (Oldest -> Newest) for the display
+    for char_history in history_data.values():
+        for records_list in char_history.values():
+            records_list.reverse()
+
     return history_data
+
+
+def _next_month(month_start):
+    if month_start.month == 12:
+        return date(month_start.year + 1, 1, 1)
+    return date(month_start.year, month_start.month + 1, 1)
+
+
+def calculate_monthly_stats(log_rows):
+    """
+    Calculate the end-of-month progress stats in a single pass over the study history.
+
+    A ReplayEngine advances the cards one review at a time while the logs are walked in date
+    order, and a snapshot is taken each time the sweep crosses a month boundary. Hard-mode
+    streaks are tracked in the same pass, so the cost stays linear in the number of logs.
+
+    Args:
+        log_rows: Iterable of (character, type, score, study_date) tuples sorted by date
+
+    Returns:
+        List of monthly stats dicts, oldest month first
+    """
+    card_types = ["read", "write"]
+    engine = fsrs.ReplayEngine()
+    # Characters in first-seen order, with per-type arrays for batch_retrievability
+    char_index = {}
+    stabilities = {card_type: [] for card_type in card_types}
+    last_reviews = {card_type: [] for card_type in card_types}
+    # Last score of each (character, type) and the characters failing twice in a row (score <= 1)
+    last_scores = {}
+    hard_chars = {card_type: set() for card_type in card_types}
+
+    monthly_stats = []
+    month = None
+    reviews_this_month, studies_this_month = 0, 0
+
+    def snapshot():
+        month_end = _next_month(month) - timedelta(days=1)
+        calculation_time = datetime.combine(month_end, datetime.max.time()).replace(tzinfo=timezone.utc)
+        stats = {
+            'month': month.strftime('%Y-%m'),
+            'total_reviews': reviews_this_month,
+            'total_studies': studies_this_month,
+            'cumulative_unique_chars': len(char_index),
+        }
+        for card_type in card_types:
+            # Characters without reviews of this type have retrievability 0 and count as lapsing
+            r = fsrs.batch_retrievability(stabilities[card_type], last_reviews[card_type], calculation_time, card_type)
+            stats[f'{card_type}_mastered'] = int(np.count_nonzero(r > 0.9))
+            stats[f'{card_type}_learning'] = int(np.count_nonzero((r >= 0.6) & (r <= 0.9)))
+            stats[f'{card_type}_lapsing'] = int(np.count_nonzero(r < 0.6))
+            stats[f'{card_type}_hard'] = len(hard_chars[card_type])
+        monthly_stats.append(stats)
+
+    for char, record_type, score, study_date in log_rows:
+        log_month = date(study_date.year, study_date.month, 1)
+        if month is None:
+            month = log_month
+        while month < log_month:
+            snapshot()
+            month = _next_month(month)
+            reviews_this_month, studies_this_month = 0, 0
+
+        if record_type in card_types:
+            reviews_this_month += 1
+        elif record_type in ['readstudy', 'writestudy']:
+            studies_this_month += 1
+
+        if char not in char_index:
+            char_index[char] = len(char_index)
+            for card_type in card_types:
+                stabilities[card_type].append(np.nan)
+                last_reviews[card_type].append(np.nan)
+        row = char_index[char]
+
+        for card_type, card in engine.add(char, record_type, score, study_date):
+            stabilities[card_type][row] = card.stability
+            last_reviews[card_type][row] = card.last_review.timestamp()
+
+        if record_type in card_types:
+            previous = last_scores.get((char, record_type))
+            last_scores[(char, record_type)] = score
+            if previous is not None and previous <= 1 and score <= 1:
+                hard_chars[record_type].add(char)
+            else:
+                hard_chars[record_type].discard(char)
+
+    if month is not None:
+        snapshot()
+    return monthly_stats
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field
 from typing import List
 import random
 import logging
@@ -33,12 +33,13 @@ class ChEnMatchingEntry:
     chinese_word: str
     correct_translation: str
     options: List[str] = field(default_factory=list)
+    rng: InitVar[random.Random] = random
 
-    def __post_init__(self):
+    def __post_init__(self, rng):
         # Add the correct translation to the options and shuffle them
         if self.correct_translation not in self.options:
             self.options.append(self.correct_translation)
-        random.shuffle(self.options)
+        rng.shuffle(self.options)
 
     def to_dict(self):
         return {
@@ -48,12 +49,13 @@ class ChEnMatchingEntry:
         }
 
 
-def generate_content(characters: List[str]) -> List[dict]:
+def generate_content(characters: List[str], rng=random) -> List[dict]:
     """
     Generate Chinese-English matching entries.
+    The words, distractors and option order are drawn from `rng`, defaulting to the random module.
     """
     words = words_gen.generate_words_max_score(characters)
-    random.shuffle(words)
+    rng.shuffle(words)
     words = words[:8]
 
     words_str = ", ".join(words)
@@ -98,7 +100,7 @@ def generate_content(characters: List[str]) -> List[dict]:
                 correct_translation = translations[word]
 
                 # Select three incorrect options from the other translations
-                distractors = random.sample(
+                distractors = rng.sample(
                     [t for t in all_english_translations if t != correct_translation], 3
                 )
 
@@ -106,6 +108,7 @@ def generate_content(characters: List[str]) -> List[dict]:
                     chinese_word=word,
                     correct_translation=correct_translation,
                     options=distractors,
+                    rng=rng,
                 )
                 entries.append(entry.to_dict())
 
@@ -149,7 +152,8 @@ def generate_content(characters: List[str]) -> List[dict]:
                 entry = ChEnMatchingEntry(
                     chinese_word=item.english_translation,
                     correct_translation=item.original_chinese,
-                    options=item.wrong_options
+                    options=item.wrong_options,
+                    rng=rng,
                 )
                 entries.append(entry.to_dict())
                 
@@ -49,13 +49,14 @@ def _get_pinyin_for_words(words: List[str]) -> dict:
     return pinyin_map
 
 
-def generate_content(characters: List[str]) -> List[dict]:
+def generate_content(characters: List[str], rng=random) -> List[dict]:
     """
     Generate character-word entries with pinyin and words for the given characters,
     replicating the legacy app's logic using the Django ORM.
 
     Args:
         characters: List of Chinese characters to generate content for
+        rng: random.Random drawing the example words, defaults to the random module
 
     Returns:
         List of dictionaries, where each dictionary represents a character study entry.
@@ -78,7 +79,7 @@ def generate_content(characters: List[str]) -> List[dict]:
     for char in characters:
         words_for_char = char_to_words_map.get(char)
         if words_for_char:
-            generated_words.append(random.choice(words_for_char))
+            generated_words.append(rng.choice(words_for_char))
         else:
             generated_words.append("N/A")  # Fallback if no word is found
 
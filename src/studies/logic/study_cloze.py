@@ -15,19 +15,20 @@ class ClozeEntry:
         return {"word": self.word, "cloze_sentence": self.cloze_sentence}
 
 
-def generate_content(characters: List[str]) -> List[dict]:
+def generate_content(characters: List[str], rng=random) -> List[dict]:
     """
     Generate cloze test entries with words and sentences containing blanks.
 
     Args:
         characters: List of Chinese characters to generate content for.
+        rng: random.Random choosing the words, defaults to the random module.
 
     Returns:
         List of dictionaries representing ClozeEntry objects.
     """
     logging.info(f"Generating cloze using: {characters}")
     words = words_gen.generate_words_max_score(characters)
-    random.shuffle(words)
+    rng.shuffle(words)
     words = words[:8]
     logging.info(f"Selected words for cloze: {words}")
 
@@ -6,7 +6,7 @@ from google import genai
 from pydantic import BaseModel
 
 from studies.models import WordEntry
-from . import selection
+from . import card_state, selection
 
 logger = logging.getLogger(__name__)
 
@@ -25,30 +25,27 @@ class FindWordsContent:
 
 
 def get_learned_chars() -> set:
-    """Fetches all unique characters with FSRS retrievability > 0.9."""
-    return set(
-        selection.Selection()
-        .from_fsrs("read", due_only=False)
-        .retrievability(min_val=0.9)
-        .get_all()
-    )
+    """Fetches all characters of learned lessons with read retrievability of at least 0.9."""
+    learned_chars = selection.learned_lesson_words().values_list('hanzi', flat=True)
+    return card_state.known_characters("read", 0.9, characters=learned_chars)
 
 
-def generate_content(characters: List[str]) -> dict:
+def generate_content(characters: List[str], rng=random) -> dict:
     """
     Generate find-words puzzle content with words and a sentence containing those words.
 
     Args:
         characters: List of Chinese characters to generate content for
+        rng: random.Random choosing the words, defaults to the random module
 
     Returns:
         A dictionary representing the FindWordsContent object.
     """
     # Get words from the database
     words_with_scores = []
+    entries_by_char = WordEntry.objects.by_character(characters)
     for char in characters:
-        entries = WordEntry.objects.filter(word__contains=char)
-        for entry in entries:
+        for entry in entries_by_char[char]:
             words_with_scores.append((entry.word, entry.score))
 
     learned_chars = get_learned_chars()
@@ -63,7 +60,7 @@ def generate_content(characters: List[str]) -> dict:
                 two_char_words_filtered.append(w)
                 seen_words.add(w)
 
-    random.shuffle(two_char_words_filtered)
+    rng.shuffle(two_char_words_filtered)
     selected_words = two_char_words_filtered[:8]
 
     logger.info(f"汉字: {characters} 词语: {selected_words}")
@@ -162,7 +159,7 @@ def generate_content(characters: List[str]) -> dict:
 
 
 def generate_grid(
-    sentence: str, words: List[str], filler_chars: List[str]
+    sentence: str, words: List[str], filler_chars: List[str], rng=random
 ) -> tuple[List[List[str]], int]:
     """
     Generate a character grid with the sentence laid out and words placed in it.
@@ -171,13 +168,14 @@ def generate_grid(
         sentence: The sentence to be laid out in the grid
         words: The words to be placed in the grid
         filler_chars: Characters to fill empty spaces
+        rng: random.Random drawing the layout, defaults to the random module
 
     Returns:
         Tuple of (grid, start_row) where grid is the 8x8 character grid and start_row is the row where the sentence starts
     """
     GRID_SIZE = 8
     grid = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    start_row = random.randint(0, GRID_SIZE - 1)
+    start_row = rng.randint(0, GRID_SIZE - 1)
     r, c = start_row, 0
 
     # Lay out the sentence in the grid
@@ -189,13 +187,13 @@ def generate_grid(
             for dc in [-1, 0, 1]:
                 if dr == 0 and dc == 0:
                     continue
-                if dc < 1 and random.random() < 0.4:
+                if dc < 1 and rng.random() < 0.4:
                     continue
                 nr, nc = r + dr, c + dc
                 if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE and grid[nr][nc] is None:
                     possible_moves.append((nr, nc))
         if possible_moves:
-            r, c = random.choice(possible_moves)
+            r, c = rng.choice(possible_moves)
         else:
             break
 
@@ -207,7 +205,7 @@ def generate_grid(
                 empty_cells.append((r_, c_))
 
     # Randomly shuffle empty cells
-    random.shuffle(empty_cells)
+    rng.shuffle(empty_cells)
 
     # Place words in the grid
     for word in words:
@@ -231,6 +229,6 @@ def generate_grid(
     # Fill remaining empty cells with random filler characters
     for r_, c_ in empty_cells:
         if filler_chars:
-            grid[r_][c_] = random.choice(filler_chars)
+            grid[r_][c_] = rng.choice(filler_chars)
 
     return grid, start_row
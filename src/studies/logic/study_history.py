@@ -0,0 +1,44 @@
+"""
+Module for streaming the StudyLog history as compact tuples.
+
+History consumers only need a few columns of each log, so they read them with values_list()
+through a chunked iterator instead of instantiating StudyLog and Word models. Memory and
+query count stay flat as the log table grows.
+"""
+from datetime import date
+
+from studies.models import StudyLog
+
+# Default row layout: (character, type, score, study_date), as taken by fsrs.ReplayEngine
+LOG_ROW_FIELDS = ('word__hanzi', 'type', 'score', 'study_date')
+
+# Rows fetched from the database cursor at a time
+CHUNK_SIZE = 2000
+
+
+def as_date(value):
+    """StudyLog.study_date may still be an ISO string on a freshly created instance."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def iter_log_rows(logs=None, types=None, fields=LOG_ROW_FIELDS, order_by=('study_date', 'id'), chunk_size=CHUNK_SIZE):
+    """
+    Stream StudyLog rows as tuples.
+
+    Args:
+        logs: Optional StudyLog queryset to read from, defaults to every log
+        types: Optional list of log types to include
+        fields: Fields of each tuple, defaults to (character, type, score, study_date)
+        order_by: Row order, defaults to replay order
+        chunk_size: Number of rows fetched per round trip
+
+    Returns:
+        Iterator of tuples
+    """
+    if logs is None:
+        logs = StudyLog.objects.all()
+    if types is not None:
+        logs = logs.filter(type__in=types)
+    return logs.order_by(*order_by).values_list(*fields).iterator(chunk_size=chunk_size)
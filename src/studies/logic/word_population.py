@@ -25,7 +25,7 @@ def seed_words_for_char(char, desired_words=10):
     Generates and seeds words for a single character using Gemini.
     """
     # Check existing words count
-    existing_count = WordEntry.objects.filter(word__contains=char).count()
+    existing_count = WordEntry.objects.filter(characters__char=char).count()
     if existing_count >= desired_words:
         log.info(f"Enough words for {char} ({existing_count} >= {desired_words}). Skipping.")
         return
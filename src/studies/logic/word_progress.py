@@ -0,0 +1,106 @@
+"""
+Module for the per-word progress summaries derived from StudyLog.
+
+A WordProgress row per (word, record type) holds the latest score and study date, the number
+of reviews, the current failure streak and the hard-mode flag. Rows are refreshed in the same
+transaction as each new log, so score, recency and hard-mode filters are indexed lookups
+instead of scans of the whole history.
+"""
+from django.db import transaction
+
+from studies.models import StudyLog, WordProgress
+from . import study_history
+
+# A score at or below this counts as a failure
+FAILURE_SCORE = 1
+
+# A word enters Hard Mode after this many consecutive failures
+HARD_MODE_STREAK = 2
+
+
+def _streak_fields(failure_streak):
+    return {"failure_streak": failure_streak, "is_hard_mode": failure_streak >= HARD_MODE_STREAK}
+
+
+def apply_log(log):
+    """
+    Fold a newly created StudyLog into the progress of its word and record type.
+
+    The failure streak is recounted from the newest logs up to the latest pass, so this
+    also handles a log dated before the existing history.
+    """
+    logs = StudyLog.objects.filter(word_id=log.word_id, type=log.type).order_by('-study_date', '-id')
+    failure_streak = 0
+    for score in logs.values_list('score', flat=True).iterator():
+        if score > FAILURE_SCORE:
+            break
+        failure_streak += 1
+
+    study_date = study_history.as_date(log.study_date)
+    with transaction.atomic():
+        progress, _ = WordProgress.objects.select_for_update().get_or_create(
+            word_id=log.word_id,
+            record_type=log.type,
+        )
+        for field, value in _streak_fields(failure_streak).items():
+            setattr(progress, field, value)
+        if log.id > progress.latest_log_id:
+            progress.latest_score = log.score
+            progress.latest_log_id = log.id
+        if progress.latest_date is None or study_date > progress.latest_date:
+            progress.latest_date = study_date
+        progress.review_count += 1
+        progress.save()
+
+
+def rebuild_word_progress(word_ids=None):
+    """
+    Recompute the progress rows of the given words from their full StudyLog history.
+    Used when history is rewritten and to backfill after bulk loads.
+
+    Args:
+        word_ids: IDs of the words to rebuild, or None to rebuild every word
+
+    Returns:
+        int: Number of progress rows written
+    """
+    logs = StudyLog.objects.all()
+    if word_ids is not None:
+        logs = logs.filter(word_id__in=word_ids)
+    rows = logs.order_by('word_id', 'type', '-study_date', '-id').values_list('word_id', 'type', 'score', 'study_date', 'id')
+
+    # Newest first within each (word, type): the streak ends at the first pass
+    progress = {}
+    broken = set()
+    for word_id, record_type, score, study_date, log_id in rows.iterator():
+        key = (word_id, record_type)
+        if key not in progress:
+            progress[key] = WordProgress(word_id=word_id, record_type=record_type, latest_date=study_date)
+        row = progress[key]
+        row.review_count += 1
+        if log_id > row.latest_log_id:
+            row.latest_score = score
+            row.latest_log_id = log_id
+        if key in broken:
+            continue
+        if score > FAILURE_SCORE:
+            broken.add(key)
+        else:
+            row.failure_streak += 1
+
+    for row in progress.values():
+        row.is_hard_mode = row.failure_streak >= HARD_MODE_STREAK
+
+    with transaction.atomic():
+        stale_rows = WordProgress.objects.all()
+        if word_ids is not None:
+            stale_rows = stale_rows.filter(word_id__in=word_ids)
+        stale_rows.delete()
+        WordProgress.objects.bulk_create(progress.values())
+
+    return len(progress)
+
+
+def hard_mode_word_ids(record_type):
+    """Return the IDs of the words in Hard Mode for a record type, as a lazy QuerySet."""
+    return WordProgress.objects.filter(record_type=record_type, is_hard_mode=True).values('word_id')
@@ -5,8 +5,8 @@ replicating the logic from the legacy webapp.
 from typing import List
 from datetime import datetime, timezone
 
-from studies.models import WordEntry, StudyLog
-from . import fsrs
+from studies.models import WordEntry
+from . import fsrs, card_state
 
 def generate_words_max_score(characters: List[str]) -> List[str]:
     """
@@ -23,31 +23,28 @@ def generate_words_max_score(characters: List[str]) -> List[str]:
     Returns:
         List of words. Each character may have multiple words.
     """
-    # Build FSRS cards once to avoid repeated database queries
-    all_logs = list(StudyLog.objects.filter(type__in=['read', 'write']).select_related('word'))
-    fsrs_cards = fsrs.build_cards_from_logs(all_logs)
+    # Collect the candidate words first, so only the cards of their characters are loaded.
+    # Candidate words with a score >= 0.8 for every character are fetched in one query.
+    entries = WordEntry.objects.filter(score__gte=0.8).by_character(characters)
+    candidates = [(char, [entry.word for entry in entries[char]]) for char in characters]
+
+    candidate_chars = set(characters)
+    for _, candidate_words in candidates:
+        for word in candidate_words:
+            candidate_chars.update(word)
+    fsrs_cards = card_state.load_cards(characters=candidate_chars)
+    read_retrievability = fsrs.retrievability_by_character(fsrs_cards, "read", datetime.now(timezone.utc))
     
     final_word_list = []
 
-    for char in characters:
-        # Get candidate words for this character with a score >= 0.8
-        candidate_words = WordEntry.objects.filter(word__contains=char, score__gte=0.8)
-
-        for entry in candidate_words:
-            word = entry.word
+    for _, candidate_words in candidates:
+        for word in candidate_words:
             total_score = 0
             
             for word_char in set(word):
                 # Get FSRS retrievability score for the character (type "read")
-                retrievability = 0.0  # Default to 0 if no card or score exists
-                card_key = (word_char, "read")
-                
-                if card_key in fsrs_cards:
-                    card = fsrs_cards[card_key]
-                    today = datetime.now(timezone.utc)
-                    r_val = fsrs.read_scheduler.get_card_retrievability(card, today)
-                    if r_val is not None:
-                        retrievability = float(r_val)
+                # Default to 0 if no card exists
+                retrievability = read_retrievability.get(word_char, 0.0)
 
                 if retrievability > 0.8 or word_char in characters:
                     total_score += 1
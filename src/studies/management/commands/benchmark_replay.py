@@ -0,0 +1,58 @@
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from studies.logic import fsrs
+
+
+def synthetic_rows(count, characters, seed):
+    """Generate (character, type, score, study_date, log_id) rows spread over three years, in date order."""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    dates = sorted(start + timedelta(days=rng.randrange(3 * 365)) for _ in range(count))
+    return [
+        (chr(0x4E00 + rng.randrange(characters)), rng.choice(["read", "write"]), rng.randint(0, 10), study_date, log_id)
+        for log_id, study_date in enumerate(dates, start=1)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Times serial vs. process-pool FSRS replay on synthetic histories to find the parallel crossover point.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='1000,10000,50000,100000,200000', help='Comma-separated log counts to time')
+        parser.add_argument('--characters', type=int, default=3000, help='Number of distinct characters')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes for the parallel replay')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        workers = options['workers']
+        self.stdout.write(f"{'logs':>10} {'serial (s)':>12} {'parallel (s)':>13} {'speedup':>8}")
+
+        crossover = None
+        for size in sizes:
+            rows = synthetic_rows(size, options['characters'], options['seed'])
+
+            started = time.perf_counter()
+            fsrs.replay_history(rows, workers=1)
+            serial = time.perf_counter() - started
+
+            started = time.perf_counter()
+            fsrs.replay_history(rows, workers=workers, threshold=0)
+            parallel = time.perf_counter() - started
+
+            self.stdout.write(f"{size:>10} {serial:>12.3f} {parallel:>13.3f} {serial / parallel:>7.2f}x")
+            if crossover is None and parallel < serial:
+                crossover = size
+
+        if crossover is None:
+            note = ' Only one worker was used.' if workers <= 1 else ''
+            self.stdout.write(self.style.WARNING(f'The parallel replay was not faster at any measured size.{note}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Parallel replay wins from {crossover} logs with {workers} workers; '
+                f'set FSRS_PARALLEL_REPLAY_THRESHOLD around that value.'
+            ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from studies.models import SchedulerParameters
+from studies.logic import card_state, scheduler_parameters
+
+
+class Command(BaseCommand):
+    help = 'Fits the FSRS scheduler weights to the full StudyLog history, stores them and rebuilds the card states.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=['read', 'write', 'both'], default='both', help='Card type to fit')
+        parser.add_argument('--iterations', type=int, default=200, help='Optimizer iterations')
+        parser.add_argument('--min-reviews', type=int, default=scheduler_parameters.MIN_REVIEWS,
+                            help='Minimum number of reviews needed to fit a card type')
+        parser.add_argument('--reset', action='store_true', help='Delete the fitted weights and go back to the defaults')
+
+    def handle(self, *args, **options):
+        card_types = ['read', 'write'] if options['type'] == 'both' else [options['type']]
+
+        if options['reset']:
+            SchedulerParameters.objects.filter(card_type__in=card_types).delete()
+            self.stdout.write(f"Deleted the fitted {', '.join(card_types)} weights.")
+        else:
+            results = scheduler_parameters.fit_all(
+                card_types, iterations=options['iterations'], min_reviews=options['min_reviews']
+            )
+            for card_type, fitted in results.items():
+                if fitted is None:
+                    self.stdout.write(self.style.WARNING(f'Not enough {card_type} reviews to fit, keeping the current weights.'))
+                else:
+                    self.stdout.write(
+                        f'Fitted {card_type} weights on {fitted.review_count} reviews (log loss {fitted.log_loss:.4f}).'
+                    )
+
+        # Card states and checkpoints were built with the previous weights
+        scheduler_parameters.sync()
+        count = card_state.rebuild_card_states()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} card states with the new weights.'))
@@ -40,8 +40,8 @@ class Command(BaseCommand):
         # Ensure Book 1 exists
         book, _ = Book.objects.get_or_create(title="Book 1")
 
-        # Import each lesson's characters
-        total_imported = 0
+        # Import each lesson's characters; saving a lesson creates its missing words
+        words_before = Word.objects.count()
         for lesson_num, lesson_content in enumerate(lessons, 1):
             # Update Lesson
             # lesson_content is a string of characters like "你好"
@@ -55,11 +55,7 @@ class Command(BaseCommand):
                 defaults={'characters': chars_str}
             )
 
-            # Ensure Words exist
-            for char in chars_list:
-                word, created = Word.objects.get_or_create(hanzi=char)
-                if created:
-                    total_imported += 1
+        total_imported = Word.objects.count() - words_before
 
         self.stdout.write(
             self.style.SUCCESS(
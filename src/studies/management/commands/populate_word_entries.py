@@ -40,7 +40,7 @@ class Command(BaseCommand):
                 self.stderr.write(self.style.ERROR(f"Lesson {lesson_number} not found."))
                 continue
 
-            chars += [c.strip() for c in lesson.characters.split(',')]
+            chars += lesson.lesson_characters.values_list('word__hanzi', flat=True)
 
         from studies.logic import word_population
         word_population.seed_words_for_lesson(chars)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from studies.logic import card_state
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the stored FSRS card states by replaying the full StudyLog history.'
+
+    def handle(self, *args, **options):
+        count = card_state.rebuild_card_states()
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} card states.'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from studies.models import Lesson
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the LessonCharacter rows of every lesson, e.g. after loading lessons from a fixture.'
+
+    def handle(self, *args, **options):
+        lessons = list(Lesson.objects.all())
+        for lesson in lessons:
+            lesson.sync_characters(lesson.character_list())
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed the characters of {len(lessons)} lessons.'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from studies.models import WordEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the character index of every WordEntry, e.g. after loading word entries from a fixture.'
+
+    def handle(self, *args, **options):
+        count = WordEntry.objects.all().sync_characters()
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed the characters of {count} word entries.'))
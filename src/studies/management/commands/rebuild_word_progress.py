@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from studies.logic import word_progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-word progress summaries (hard mode, failure streaks) from the full StudyLog history.'
+
+    def handle(self, *args, **options):
+        count = word_progress.rebuild_word_progress()
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} word progress rows.'))
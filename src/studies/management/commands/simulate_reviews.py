@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from studies.logic import card_state, simulation
+
+
+class Command(BaseCommand):
+    help = 'Simulates the next days of review exams under different daily limits to help choose the exam size.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=['read', 'write', 'both'], default='both', help='Card type to simulate')
+        parser.add_argument('--days', type=int, default=30, help='Number of days to simulate')
+        parser.add_argument('--limits', type=str, default='10,20,30', help='Comma-separated daily limits; "none" for no limit')
+        parser.add_argument('--runs', type=int, default=200, help='Number of simulated runs')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['runs'] < 1:
+            raise CommandError('--days and --runs must be positive.')
+        try:
+            limits = [None if limit.strip() == 'none' else int(limit) for limit in options['limits'].split(',')]
+        except ValueError as err:
+            raise CommandError(f"Invalid --limits: {options['limits']}") from err
+
+        card_types = ['read', 'write'] if options['type'] == 'both' else [options['type']]
+        cards = card_state.load_cards(reviewed_only=True)
+        start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        for card_type in card_types:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{card_type.capitalize()} cards, {options["days"]} days'))
+            self.stdout.write(f"{'limit':>6} {'reviews/day':>12} {'final backlog':>14} {'p90':>6} {'retention':>16}")
+            for limit in limits:
+                result = simulation.simulate(
+                    cards, card_type, start,
+                    days=options['days'], daily_limit=limit, runs=options['runs'], seed=options['seed'],
+                )
+                if result['cards'] == 0:
+                    self.stdout.write('No reviewed cards.')
+                    break
+                reviews_per_day = sum(result['reviews']) / options['days']
+                retention = f"{result['retention'][0]:.3f} -> {result['retention'][-1]:.3f}"
+                self.stdout.write(
+                    f"{limit if limit is not None else 'none':>6} {reviews_per_day:>12.1f} "
+                    f"{result['backlog'][-1]:>14.1f} {result['backlog_p90'][-1]:>6.0f} {retention:>16}"
+                )
@@ -0,0 +1,91 @@
+# Generated by Django 6.1.2 on 2026-10-16 22:59
+
+import datetime
+import itertools
+
+import django.db.models.deletion
+from django.db import migrations, models
+from fsrs import Card, Rating, Scheduler
+
+
+# Frozen copy of the replay rules in studies.logic.fsrs as of this migration, so the
+# backfill does not change when the live code does. Only the py-fsrs scheduler is shared.
+DESIRED_RETENTION = {'read': 0.9, 'write': 0.6}
+
+
+def score_to_rating(score):
+    if score <= 1:
+        return Rating.Again
+    elif score <= 4:
+        return Rating.Hard
+    elif score <= 8:
+        return Rating.Good
+    else:
+        return Rating.Easy
+
+
+def implied_reviews(record_type, score):
+    # A write record also counts as an implied read review with a bonus score
+    if record_type == 'write':
+        return [('write', score), ('read', min(score + 3, 10))]
+    return [('read', score)]
+
+
+def backfill_card_states(apps, schema_editor):
+    StudyLog = apps.get_model('studies', 'StudyLog')
+    CardState = apps.get_model('studies', 'CardState')
+
+    schedulers = {card_type: Scheduler(desired_retention=retention) for card_type, retention in DESIRED_RETENTION.items()}
+    card_ids = itertools.count(1)
+
+    # Replay each word's logs in date order
+    positions = {}
+    logs = StudyLog.objects.filter(type__in=['read', 'write']).order_by('study_date', 'id')
+    rows = logs.values_list('id', 'word_id', 'type', 'score', 'study_date')
+    for log_id, word_id, record_type, score, study_date in rows.iterator():
+        review_time = datetime.datetime.combine(study_date, datetime.time.min, tzinfo=datetime.timezone.utc)
+        for card_type, review_score in implied_reviews(record_type, score):
+            card, _, _ = positions.get((word_id, card_type)) or (Card(card_id=next(card_ids)), None, None)
+            card, _ = schedulers[card_type].review_card(card, score_to_rating(review_score), review_time)
+            positions[(word_id, card_type)] = (card, log_id, study_date)
+
+    # Every studied word gets both cards, like rebuild_card_states
+    new_states = []
+    for word_id in sorted(set(StudyLog.objects.values_list('word_id', flat=True))):
+        for card_type in DESIRED_RETENTION:
+            card, last_log_id, last_log_date = positions.get((word_id, card_type)) or (Card(card_id=next(card_ids)), 0, None)
+            new_states.append(CardState(
+                word_id=word_id,
+                card_type=card_type,
+                card=card.to_dict(),
+                last_log_id=last_log_id,
+                last_log_date=last_log_date,
+            ))
+    CardState.objects.bulk_create(new_states, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0008_examsettings_include_hard_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('card_type', models.CharField(choices=[('read', 'Read'), ('write', 'Write')], max_length=10)),
+                ('card', models.JSONField(help_text='Serialized fsrs.Card')),
+                ('last_log_id', models.IntegerField(default=0, help_text='ID of the latest StudyLog folded into the card')),
+                ('last_log_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_states', to='studies.word')),
+            ],
+            options={
+                'db_table': 'card_states',
+                'unique_together': {('word', 'card_type')},
+            },
+        ),
+        migrations.RunPython(backfill_card_states, migrations.RunPython.noop),
+    ]
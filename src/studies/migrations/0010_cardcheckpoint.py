@@ -0,0 +1,52 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_review_counts(apps, schema_editor):
+    Word = apps.get_model('studies', 'Word')
+    CardState = apps.get_model('studies', 'CardState')
+
+    # Write reviews also count as implied read reviews
+    counts = Word.objects.annotate(
+        read_count=Count('study_logs', filter=Q(study_logs__type__in=['read', 'write'])),
+        write_count=Count('study_logs', filter=Q(study_logs__type='write')),
+    ).values_list('id', 'read_count', 'write_count')
+    for word_id, read_count, write_count in counts:
+        CardState.objects.filter(word_id=word_id, card_type='read').update(review_count=read_count)
+        CardState.objects.filter(word_id=word_id, card_type='write').update(review_count=write_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0009_cardstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardstate',
+            name='review_count',
+            field=models.IntegerField(default=0, help_text='Number of reviews folded into the card'),
+        ),
+        migrations.CreateModel(
+            name='CardCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('card_type', models.CharField(choices=[('read', 'Read'), ('write', 'Write')], max_length=10)),
+                ('card', models.JSONField(help_text='Serialized fsrs.Card')),
+                ('last_log_id', models.IntegerField(help_text='ID of the latest StudyLog folded into the card')),
+                ('last_log_date', models.DateField()),
+                ('review_count', models.IntegerField(help_text='Number of reviews folded into the card')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_checkpoints', to='studies.word')),
+            ],
+            options={
+                'db_table': 'card_checkpoints',
+                'indexes': [models.Index(fields=['word', 'card_type', 'last_log_date'], name='card_checkp_word_id_c627f7_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_review_counts, migrations.RunPython.noop),
+    ]
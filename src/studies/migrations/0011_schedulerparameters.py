@@ -0,0 +1,27 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0010_cardcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerParameters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('card_type', models.CharField(choices=[('read', 'Read'), ('write', 'Write')], max_length=10, unique=True)),
+                ('parameters', models.JSONField(help_text='The 21 FSRS weights')),
+                ('review_count', models.IntegerField(default=0, help_text='Number of reviews the weights were fitted on')),
+                ('log_loss', models.FloatField(blank=True, help_text='Mean log loss of the fitted weights', null=True)),
+                ('fitted_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'scheduler_parameters',
+            },
+        ),
+    ]
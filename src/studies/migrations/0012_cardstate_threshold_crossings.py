@@ -0,0 +1,72 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:19
+
+import datetime
+import math
+
+from django.db import migrations, models
+
+
+# Frozen copy of the FSRS forgetting curve, so the migration does not depend on the live code
+DEFAULT_DECAY = 0.1542
+MAX_CROSSING_DAYS = 365 * 1000
+
+
+def backfill_crossings(apps, schema_editor):
+    CardState = apps.get_model('studies', 'CardState')
+    SchedulerParameters = apps.get_model('studies', 'SchedulerParameters')
+
+    # The stored cards were replayed with the fitted weights, if any
+    decays = {fitted.card_type: fitted.parameters[20] for fitted in SchedulerParameters.objects.all()}
+
+    fields = {0.9: 'r90_until', 0.8: 'r80_until', 0.6: 'r60_until'}
+    states = list(CardState.objects.all())
+    for state in states:
+        stability = state.card.get('stability')
+        last_review = state.card.get('last_review')
+        if stability is None or last_review is None:
+            continue
+        last_review = datetime.datetime.fromisoformat(last_review)
+        decay = -decays.get(state.card_type, DEFAULT_DECAY)
+        factor = 0.9 ** (1 / decay) - 1
+        for threshold, field in fields.items():
+            days = math.floor(stability / factor * (threshold ** (1 / decay) - 1)) + 1
+            setattr(state, field, last_review + datetime.timedelta(days=min(days, MAX_CROSSING_DAYS)))
+    CardState.objects.bulk_update(states, list(fields.values()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0011_schedulerparameters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardstate',
+            name='r60_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cardstate',
+            name='r80_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cardstate',
+            name='r90_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='cardstate',
+            index=models.Index(fields=['card_type', 'r90_until'], name='card_states_card_ty_d2b4ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardstate',
+            index=models.Index(fields=['card_type', 'r80_until'], name='card_states_card_ty_d899bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardstate',
+            index=models.Index(fields=['card_type', 'r60_until'], name='card_states_card_ty_6044de_idx'),
+        ),
+        migrations.RunPython(backfill_crossings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:20
+
+import datetime
+import math
+
+from django.db import migrations, models
+
+
+SECONDS_PER_DAY = 86400
+
+
+def backfill_memory_state(apps, schema_editor):
+    CardState = apps.get_model('studies', 'CardState')
+
+    # Read the serialized fsrs.Card directly, so the migration does not depend on the live code
+    states = list(CardState.objects.all())
+    for state in states:
+        state.due = datetime.datetime.fromisoformat(state.card['due'])
+        if state.card.get('last_review'):
+            last_review = datetime.datetime.fromisoformat(state.card['last_review'])
+            state.stability = state.card['stability']
+            state.last_review_day = math.floor(last_review.timestamp() / SECONDS_PER_DAY)
+    CardState.objects.bulk_update(states, ['stability', 'due', 'last_review_day'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0012_cardstate_threshold_crossings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardstate',
+            name='due',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cardstate',
+            name='last_review_day',
+            field=models.IntegerField(blank=True, help_text='Days since the epoch of the last review', null=True),
+        ),
+        migrations.AddField(
+            model_name='cardstate',
+            name='stability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='cardstate',
+            index=models.Index(fields=['card_type', 'due'], name='card_states_card_ty_bd14b6_idx'),
+        ),
+        migrations.RunPython(backfill_memory_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_lesson_characters(apps, schema_editor):
+    Lesson = apps.get_model('studies', 'Lesson')
+    LessonCharacter = apps.get_model('studies', 'LessonCharacter')
+    Word = apps.get_model('studies', 'Word')
+
+    new_rows = []
+    for lesson in Lesson.objects.all():
+        # Same cleaning as Lesson.save; older rows may still hold unclean strings
+        chars = [c for c in lesson.characters if c not in (',', ' ', '\t', '\n', '\r')]
+        for position, char in enumerate(dict.fromkeys(chars)):
+            word, _ = Word.objects.get_or_create(hanzi=char)
+            new_rows.append(LessonCharacter(lesson=lesson, word=word, position=position))
+    LessonCharacter.objects.bulk_create(new_rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0013_cardstate_memory_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonCharacter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_characters', to='studies.lesson')),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_characters', to='studies.word')),
+            ],
+            options={
+                'db_table': 'lesson_characters',
+                'ordering': ['lesson_id', 'position'],
+                'unique_together': {('lesson', 'word')},
+            },
+        ),
+        migrations.RunPython(backfill_lesson_characters, migrations.RunPython.noop),
+    ]
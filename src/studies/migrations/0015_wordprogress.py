@@ -0,0 +1,54 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_word_progress(apps, schema_editor):
+    StudyLog = apps.get_model('studies', 'StudyLog')
+    WordProgress = apps.get_model('studies', 'WordProgress')
+
+    rows = StudyLog.objects.order_by('word_id', 'type', '-study_date', '-id').values_list('word_id', 'type', 'score')
+    streaks = {}
+    broken = set()
+    for word_id, record_type, score in rows.iterator():
+        key = (word_id, record_type)
+        streaks.setdefault(key, 0)
+        if key in broken:
+            continue
+        if score > 1:
+            broken.add(key)
+        else:
+            streaks[key] += 1
+
+    WordProgress.objects.bulk_create([
+        WordProgress(word_id=word_id, record_type=record_type, failure_streak=streak, is_hard_mode=streak >= 2)
+        for (word_id, record_type), streak in streaks.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0014_lessoncharacter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_type', models.CharField(choices=[('read', 'Read Exam'), ('write', 'Write Exam'), ('readstudy', 'Read Study'), ('writestudy', 'Write Study')], max_length=20)),
+                ('failure_streak', models.IntegerField(default=0, help_text='Number of consecutive latest scores counting as failures')),
+                ('is_hard_mode', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='studies.word')),
+            ],
+            options={
+                'db_table': 'word_progress',
+                'indexes': [models.Index(fields=['record_type', 'is_hard_mode'], name='word_progre_record__d0e4b6_idx')],
+                'unique_together': {('word', 'record_type')},
+            },
+        ),
+        migrations.RunPython(backfill_word_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:27
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_latest(apps, schema_editor):
+    StudyLog = apps.get_model('studies', 'StudyLog')
+    WordProgress = apps.get_model('studies', 'WordProgress')
+
+    summaries = {
+        (row['word_id'], row['type']): row
+        for row in StudyLog.objects.values('word_id', 'type').annotate(
+            latest_log_id=Max('id'), latest_date=Max('study_date'), review_count=Count('id')
+        )
+    }
+    scores = dict(
+        StudyLog.objects.filter(id__in=[row['latest_log_id'] for row in summaries.values()]).values_list('id', 'score')
+    )
+
+    rows = list(WordProgress.objects.all())
+    for progress in rows:
+        summary = summaries[(progress.word_id, progress.record_type)]
+        progress.latest_log_id = summary['latest_log_id']
+        progress.latest_score = scores[summary['latest_log_id']]
+        progress.latest_date = summary['latest_date']
+        progress.review_count = summary['review_count']
+    WordProgress.objects.bulk_update(rows, ['latest_log_id', 'latest_score', 'latest_date', 'review_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0015_wordprogress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordprogress',
+            name='latest_date',
+            field=models.DateField(blank=True, help_text='Latest study date', null=True),
+        ),
+        migrations.AddField(
+            model_name='wordprogress',
+            name='latest_log_id',
+            field=models.IntegerField(default=0, help_text='ID of the most recently recorded log'),
+        ),
+        migrations.AddField(
+            model_name='wordprogress',
+            name='latest_score',
+            field=models.IntegerField(blank=True, help_text='Score of the most recently recorded log', null=True),
+        ),
+        migrations.AddField(
+            model_name='wordprogress',
+            name='review_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_latest, migrations.RunPython.noop),
+    ]
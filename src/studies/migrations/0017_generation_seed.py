@@ -0,0 +1,33 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0016_wordprogress_latest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, help_text='Hash of the seed, inputs and data version', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='seed',
+            field=models.BigIntegerField(blank=True, help_text='Seed of the random choices made while generating', null=True),
+        ),
+        migrations.AddField(
+            model_name='study',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, help_text='Hash of the seed, inputs and data version', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='study',
+            name='seed',
+            field=models.BigIntegerField(blank=True, help_text='Seed of the random choices made while generating', null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_word_entry_characters(apps, schema_editor):
+    WordEntry = apps.get_model('studies', 'WordEntry')
+    WordEntryCharacter = apps.get_model('studies', 'WordEntryCharacter')
+
+    WordEntryCharacter.objects.bulk_create([
+        WordEntryCharacter(word_entry_id=entry_id, char=char)
+        for entry_id, word in WordEntry.objects.values_list('id', 'word')
+        for char in dict.fromkeys(word)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0017_generation_seed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordEntryCharacter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('char', models.CharField(max_length=1)),
+                ('word_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='characters', to='studies.wordentry')),
+            ],
+            options={
+                'db_table': 'word_entry_characters',
+                'indexes': [models.Index(fields=['char', 'word_entry'], name='word_entry__char_529982_idx')],
+                'unique_together': {('word_entry', 'char')},
+            },
+        ),
+        migrations.RunPython(backfill_word_entry_characters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0018_wordentrycharacter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordentry',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Unset for entries loaded from fixtures', null=True),
+        ),
+    ]
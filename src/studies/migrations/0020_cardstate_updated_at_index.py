@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studies', '0019_wordentry_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cardstate',
+            index=models.Index(fields=['updated_at'], name='card_states_updated_c6caec_idx'),
+        ),
+    ]
@@ -1,4 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from django.dispatch import Signal
+
+# Sent after StudyLog.objects.filter(...).update(), which bypasses post_save.
+# Arguments: word_ids (set of affected word IDs), since (earliest affected study date).
+study_logs_updated = Signal()
 
 class Word(models.Model):
     """
@@ -30,6 +36,8 @@ class Study(models.Model):
     content = models.JSONField(help_text="Structured study content as JSON")
     created_at = models.DateTimeField(auto_now_add=True)
     done = models.BooleanField(default=False)
+    seed = models.BigIntegerField(null=True, blank=True, help_text="Seed of the random choices made while generating")
+    cache_key = models.CharField(max_length=64, null=True, blank=True, db_index=True, help_text="Hash of the seed, inputs and data version")
     
     class Meta:
         db_table = 'studies'
@@ -66,6 +74,8 @@ class Exam(models.Model):
     content = models.JSONField(help_text="Structured exam content as JSON")
     created_at = models.DateTimeField(auto_now_add=True)
     recorded = models.BooleanField(default=False)
+    seed = models.BigIntegerField(null=True, blank=True, help_text="Seed of the random choices made while generating")
+    cache_key = models.CharField(max_length=64, null=True, blank=True, db_index=True, help_text="Hash of the seed, inputs and data version")
     
     class Meta:
         db_table = 'exams'
@@ -75,10 +85,27 @@ class Exam(models.Model):
         return f"{self.type} exam"
 
 
+class StudyLogQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """Update the logs and send study_logs_updated for the rows that changed."""
+        rows = list(self.values_list('id', 'word_id', 'study_date'))
+        updated = super().update(**kwargs)
+        if rows:
+            ids = [row[0] for row in rows]
+            new_earliest = StudyLog.objects.filter(id__in=ids).aggregate(models.Min('study_date'))['study_date__min']
+            since = min(row[2] for row in rows)
+            if new_earliest is not None:
+                since = min(since, new_earliest)
+            study_logs_updated.send(sender=StudyLog, word_ids={row[1] for row in rows}, since=since)
+        return updated
+
+
 class StudyLog(models.Model):
     """
     Model to store study interactions (character, type, score, date)
     """
+    objects = StudyLogQuerySet.as_manager()
+
     word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='study_logs')
     
     # Type of study session (read, write, etc.)
@@ -100,6 +127,11 @@ class StudyLog(models.Model):
     def __str__(self):
         return f"{self.word.hanzi} ({self.type})"
 
+    def save(self, *args, **kwargs):
+        # The post_save receivers update CardState and WordProgress; commit them with the log
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class ExamSettings(models.Model):
     """
@@ -128,6 +160,50 @@ class ExamSettings(models.Model):
         return f"{self.get_exam_type_display()} Settings"
 
 
+class WordEntryQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Create the entries and index their characters."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        # Ids are not set on every backend or with ignore_conflicts, so look the entries up by word
+        words = [obj.word for obj in objs]
+        for start in range(0, len(words), 500):
+            WordEntry.objects.filter(word__in=words[start:start + 500]).sync_characters()
+        return objs
+
+    def update(self, **kwargs):
+        """Update the entries and re-index the characters of rewritten words."""
+        # QuerySet.update() does not apply auto_now
+        kwargs.setdefault('updated_at', timezone.now())
+        if 'word' not in kwargs:
+            return super().update(**kwargs)
+        ids = list(self.values_list('id', flat=True))
+        updated = super().update(**kwargs)
+        WordEntry.objects.filter(id__in=ids).sync_characters()
+        return updated
+
+    def sync_characters(self):
+        """Replace the WordEntryCharacter rows of the entries in this QuerySet."""
+        entries = list(self.values_list('id', 'word'))
+        WordEntryCharacter.objects.filter(word_entry_id__in=self.values('id')).delete()
+        WordEntryCharacter.objects.bulk_create([
+            WordEntryCharacter(word_entry_id=entry_id, char=char)
+            for entry_id, word in entries
+            for char in dict.fromkeys(word)
+        ], batch_size=1000)
+        return len(entries)
+
+    def by_character(self, characters):
+        """
+        Return a dict mapping each of `characters` to the entries of this QuerySet containing it,
+        in the QuerySet's order. Answered by one indexed IN query on WordEntryCharacter.
+        """
+        by_char = {char: [] for char in characters}
+        entries = self.filter(characters__char__in=list(by_char)).annotate(matched_char=models.F('characters__char'))
+        for entry in entries:
+            by_char[entry.matched_char].append(entry)
+        return by_char
+
+
 class WordEntry(models.Model):
     """
     Model to store multi-character words.
@@ -135,14 +211,38 @@ class WordEntry(models.Model):
     """
     word = models.CharField(max_length=50, unique=True, help_text="A multi-character Chinese word")
     score = models.FloatField(default=0.5, help_text="A score indicating how common the word is (0.0 to 1.0)")
+    updated_at = models.DateTimeField(auto_now=True, null=True, help_text="Unset for entries loaded from fixtures")
+
+    objects = WordEntryQuerySet.as_manager()
 
     class Meta:
         db_table = 'word_entries'
         ordering = ['-score', 'word']
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        WordEntry.objects.filter(pk=self.pk).sync_characters()
+
     def __str__(self):
         return self.word
 
+
+class WordEntryCharacter(models.Model):
+    """
+    A character of a WordEntry, indexing the words that contain each character.
+    Kept in sync with WordEntry.word by WordEntry.save and WordEntryQuerySet.
+    """
+    word_entry = models.ForeignKey(WordEntry, on_delete=models.CASCADE, related_name='characters')
+    char = models.CharField(max_length=1)
+
+    class Meta:
+        db_table = 'word_entry_characters'
+        unique_together = ['word_entry', 'char']
+        indexes = [models.Index(fields=['char', 'word_entry'])]
+
+    def __str__(self):
+        return f"{self.char} in {self.word_entry.word}"
+
 class Book(models.Model):
     """Represents a book containing multiple lessons."""
     title = models.CharField(max_length=200)
@@ -166,16 +266,35 @@ class Lesson(models.Model):
 
     def save(self, *args, **kwargs):
         """Clean characters by removing duplicates and whitespace before saving."""
-        # Split into individual characters, filter out commas and whitespace
-        chars = [c for c in self.characters if c not in (',', ' ', '\t', '\n', '\r')]
-        
-        # Remove duplicates while preserving order
-        unique_chars = list(dict.fromkeys(chars))
+        unique_chars = self.character_list()
         
         # Store as comma-separated string
         self.characters = ','.join(unique_chars)
         
         super().save(*args, **kwargs)
+        self.sync_characters(unique_chars)
+
+    def character_list(self):
+        """Return the unique characters of the lesson, in order."""
+        # Split into individual characters, filter out commas and whitespace
+        chars = [c for c in self.characters if c not in (',', ' ', '\t', '\n', '\r')]
+        
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(chars))
+
+    def sync_characters(self, chars):
+        """Replace the LessonCharacter rows of this lesson, creating missing words."""
+        words = {word.hanzi: word for word in Word.objects.filter(hanzi__in=chars)}
+        missing = [Word(hanzi=char) for char in chars if char not in words]
+        if missing:
+            Word.objects.bulk_create(missing, ignore_conflicts=True)
+            words = {word.hanzi: word for word in Word.objects.filter(hanzi__in=chars)}
+
+        self.lesson_characters.all().delete()
+        LessonCharacter.objects.bulk_create([
+            LessonCharacter(lesson=self, word=words[char], position=position)
+            for position, char in enumerate(chars)
+        ])
 
     def __str__(self):
         return f"Lesson {self.lesson_num}"
@@ -183,3 +302,124 @@ class Lesson(models.Model):
     class Meta:
         ordering = ['book__order', 'lesson_num']
         unique_together = ['book', 'lesson_num']
+
+
+class LessonCharacter(models.Model):
+    """
+    A character of a lesson, in lesson order. Kept in sync with Lesson.characters by Lesson.save.
+    """
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='lesson_characters')
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='lesson_characters')
+    position = models.IntegerField()
+
+    class Meta:
+        db_table = 'lesson_characters'
+        ordering = ['lesson_id', 'position']
+        unique_together = ['lesson', 'word']
+
+    def __str__(self):
+        return f"{self.word.hanzi} (lesson {self.lesson.lesson_num})"
+
+
+class CardState(models.Model):
+    """
+    Model to store the current FSRS card of a character, maintained from its StudyLog records.
+    """
+    CARD_TYPES = [
+        ('read', 'Read'),
+        ('write', 'Write'),
+    ]
+
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='card_states')
+    card_type = models.CharField(max_length=10, choices=CARD_TYPES)
+    card = models.JSONField(help_text="Serialized fsrs.Card")
+    last_log_id = models.IntegerField(default=0, help_text="ID of the latest StudyLog folded into the card")
+    last_log_date = models.DateField(null=True, blank=True)
+    review_count = models.IntegerField(default=0, help_text="Number of reviews folded into the card")
+    # Copied from the card so retrievability can be computed in SQL; null if never reviewed
+    stability = models.FloatField(null=True, blank=True)
+    due = models.DateTimeField(null=True, blank=True)
+    last_review_day = models.IntegerField(null=True, blank=True, help_text="Days since the epoch of the last review")
+    # When the retrievability first drops below each threshold; null if never reviewed
+    r90_until = models.DateTimeField(null=True, blank=True)
+    r80_until = models.DateTimeField(null=True, blank=True)
+    r60_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'card_states'
+        unique_together = ['word', 'card_type']
+        indexes = [
+            models.Index(fields=['card_type', 'due']),
+            models.Index(fields=['card_type', 'r90_until']),
+            models.Index(fields=['card_type', 'r80_until']),
+            models.Index(fields=['card_type', 'r60_until']),
+            # Latest write, for card_state.data_version
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.word.hanzi} ({self.card_type} card)"
+
+
+class CardCheckpoint(models.Model):
+    """
+    Model to store periodic snapshots of a card, so history rewrites only replay the logs after them.
+    """
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='card_checkpoints')
+    card_type = models.CharField(max_length=10, choices=CardState.CARD_TYPES)
+    card = models.JSONField(help_text="Serialized fsrs.Card")
+    last_log_id = models.IntegerField(help_text="ID of the latest StudyLog folded into the card")
+    last_log_date = models.DateField()
+    review_count = models.IntegerField(help_text="Number of reviews folded into the card")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'card_checkpoints'
+        indexes = [models.Index(fields=['word', 'card_type', 'last_log_date'])]
+
+    def __str__(self):
+        return f"{self.word.hanzi} ({self.card_type} card) @ {self.last_log_date}"
+
+
+class SchedulerParameters(models.Model):
+    """
+    Model to store the FSRS weights fitted from the StudyLog history for one card type.
+    The schedulers load them in place of the default weights.
+    """
+    card_type = models.CharField(max_length=10, choices=CardState.CARD_TYPES, unique=True)
+    parameters = models.JSONField(help_text="The 21 FSRS weights")
+    review_count = models.IntegerField(default=0, help_text="Number of reviews the weights were fitted on")
+    log_loss = models.FloatField(null=True, blank=True, help_text="Mean log loss of the fitted weights")
+    fitted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'scheduler_parameters'
+
+    def __str__(self):
+        return f"{self.card_type} scheduler parameters ({self.fitted_at:%Y-%m-%d})"
+
+
+class WordProgress(models.Model):
+    """
+    Summary of the StudyLog history of a word for one record type, maintained as logs are written.
+    """
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='progress')
+    record_type = models.CharField(max_length=20, choices=StudyLog.TYPE_CHOICES)
+    failure_streak = models.IntegerField(default=0, help_text="Number of consecutive latest scores counting as failures")
+    is_hard_mode = models.BooleanField(default=False)
+    latest_score = models.IntegerField(null=True, blank=True, help_text="Score of the most recently recorded log")
+    latest_log_id = models.IntegerField(default=0, help_text="ID of the most recently recorded log")
+    latest_date = models.DateField(null=True, blank=True, help_text="Latest study date")
+    review_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'word_progress'
+        unique_together = ['word', 'record_type']
+        indexes = [
+            models.Index(fields=['record_type', 'is_hard_mode']),
+        ]
+
+    def __str__(self):
+        return f"{self.word.hanzi} ({self.record_type} progress)"
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import StudyLog, study_logs_updated
+from .logic import card_state, fsrs, study_history, word_progress
+
+
+class DeletedLogRebuild:
+    """
+    On-commit callback rebuilding the card states and progress of the words whose logs were
+    deleted in a transaction. A bulk delete sends post_delete per log, but each word is
+    rebuilt once.
+    """
+
+    def __init__(self):
+        self.since = {}
+
+    def add(self, word_id, study_date):
+        study_date = study_history.as_date(study_date)
+        self.since[word_id] = min(study_date, self.since.get(word_id, study_date))
+
+    def __call__(self):
+        word_ids = list(self.since)
+        card_state.rebuild_card_states(word_ids=word_ids, since=min(self.since.values()))
+        word_progress.rebuild_word_progress(word_ids=word_ids)
+
+
+def schedule_rebuild(word_id, study_date):
+    """
+    Add a word to the DeletedLogRebuild of the current transaction, registering a new one if
+    none is pending. A callback dropped with a rolled-back savepoint is no longer listed, so a
+    new one is registered. Outside a transaction the word is rebuilt at once.
+    """
+    for _, callback, _ in transaction.get_connection().run_on_commit:
+        if isinstance(callback, DeletedLogRebuild):
+            callback.add(word_id, study_date)
+            return
+    rebuild = DeletedLogRebuild()
+    rebuild.add(word_id, study_date)
+    transaction.on_commit(rebuild)
+
+
+@receiver(post_save, sender=StudyLog)
+def update_card_state_on_save(sender, instance, created, raw=False, **kwargs):
+    fsrs.card_cache.invalidate()
+    # Fixtures are loaded out of order; run `manage.py rebuild_card_states` afterwards instead.
+    if raw:
+        return
+    if created:
+        card_state.apply_log(instance)
+    else:
+        # The previous date is unknown, so replay the whole history of the word
+        card_state.rebuild_card_states(word_ids=[instance.word_id])
+
+
+@receiver(post_delete, sender=StudyLog)
+def update_progress_on_delete(sender, instance, **kwargs):
+    fsrs.card_cache.invalidate()
+    # Rebuild the card states and progress on commit, so cascaded Word deletions have finished.
+    schedule_rebuild(instance.word_id, instance.study_date)
+
+
+@receiver(study_logs_updated, sender=StudyLog)
+def update_card_state_on_bulk_update(sender, word_ids, since, **kwargs):
+    fsrs.card_cache.invalidate()
+    # Re-dated or re-scored logs rewrite history, so replay the affected cards from before the change
+    card_state.rebuild_card_states(word_ids=word_ids, since=since)
+
+
+@receiver(post_save, sender=StudyLog)
+def update_word_progress_on_save(sender, instance, created, raw=False, **kwargs):
+    # Fixtures are loaded out of order; run `manage.py rebuild_word_progress` afterwards instead.
+    if raw:
+        return
+    if created:
+        word_progress.apply_log(instance)
+    else:
+        # The previous type is unknown, so recompute every record type of the word
+        word_progress.rebuild_word_progress(word_ids=[instance.word_id])
+
+
+@receiver(study_logs_updated, sender=StudyLog)
+def update_word_progress_on_bulk_update(sender, word_ids, since, **kwargs):
+    word_progress.rebuild_word_progress(word_ids=word_ids)
@@ -0,0 +1,246 @@
+"""Tests for the persisted FSRS card states kept in sync with StudyLog."""
+
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from studies.models import CardCheckpoint, CardState, StudyLog, Word
+from studies.logic import card_state, fsrs
+
+
+class CardStateTest(TestCase):
+    """Test that incremental card updates match a full replay of the history."""
+
+    def setUp(self):
+        self.word_a = Word.objects.create(hanzi="你")
+        self.word_b = Word.objects.create(hanzi="好")
+
+    def assertCardsMatchReplay(self):
+        """Stored cards must have the same memory state as replaying every log."""
+        logs = list(StudyLog.objects.filter(type__in=["read", "write"]).select_related("word").order_by("study_date", "id"))
+        replayed = fsrs.build_cards_from_logs(logs)
+        stored = card_state.load_cards(reviewed_only=True)
+
+        self.assertEqual(set(stored), set(replayed))
+        for key, card in replayed.items():
+            self.assertAlmostEqual(stored[key].stability or 0, card.stability or 0)
+            self.assertAlmostEqual(stored[key].difficulty or 0, card.difficulty or 0)
+            self.assertEqual(stored[key].last_review, card.last_review)
+            self.assertEqual(stored[key].state, card.state)
+
+    def test_incremental_updates_match_replay(self):
+        """Test that each new log is folded into the stored card, including implied reads."""
+        StudyLog.objects.create(word=self.word_a, type="read", score=8, study_date=date(2025, 1, 1))
+        StudyLog.objects.create(word=self.word_a, type="write", score=3, study_date=date(2025, 1, 5))
+        StudyLog.objects.create(word=self.word_b, type="write", score=10, study_date=date(2025, 1, 6))
+        StudyLog.objects.create(word=self.word_a, type="read", score=0, study_date=date(2025, 1, 20))
+
+        self.assertEqual(CardState.objects.count(), 4)
+        self.assertCardsMatchReplay()
+
+        read_state = CardState.objects.get(word=self.word_a, card_type="read")
+        self.assertEqual(read_state.last_log_date, date(2025, 1, 20))
+
+    def test_study_logs_create_blank_cards(self):
+        """Test that a study-only word gets unreviewed cards, hidden by reviewed_only."""
+        StudyLog.objects.create(word=self.word_a, type="readstudy", score=5, study_date="2025-01-01")
+
+        cards = card_state.load_cards()
+        self.assertIsNone(cards[("你", "read")].last_review)
+        self.assertIsNone(cards[("你", "write")].last_review)
+        self.assertEqual(len(card_state.load_cards(reviewed_only=True)), 0)
+
+    def test_out_of_order_log_replays_word(self):
+        """Test that a backdated log is replayed in date order rather than appended."""
+        StudyLog.objects.create(word=self.word_a, type="read", score=9, study_date=date(2025, 2, 1))
+        StudyLog.objects.create(word=self.word_a, type="read", score=1, study_date=date(2025, 1, 1))
+
+        self.assertCardsMatchReplay()
+        read_state = CardState.objects.get(word=self.word_a, card_type="read")
+        self.assertEqual(read_state.last_log_date, date(2025, 2, 1))
+
+    def test_rebuild_after_history_rewrite(self):
+        """Test that re-dated logs are replayed for the affected words only."""
+        StudyLog.objects.create(word=self.word_a, type="read", score=9, study_date=date(2025, 1, 1))
+        StudyLog.objects.create(word=self.word_a, type="read", score=2, study_date=date(2025, 1, 10))
+        StudyLog.objects.create(word=self.word_b, type="read", score=5, study_date=date(2025, 1, 10))
+
+        StudyLog.objects.filter(word=self.word_a, score=2).update(study_date=date(2024, 12, 1))
+        card_state.rebuild_card_states(word_ids=[self.word_a.id])
+
+        self.assertCardsMatchReplay()
+        self.assertEqual(CardState.objects.count(), 4)
+
+    def test_known_characters_match_retrievability(self):
+        """Test that the crossing columns answer the same as computing each card's retrievability."""
+        StudyLog.objects.create(word=self.word_a, type="read", score=10, study_date=date(2025, 1, 1))
+        StudyLog.objects.create(word=self.word_a, type="read", score=9, study_date=date(2025, 1, 4))
+        StudyLog.objects.create(word=self.word_b, type="write", score=4, study_date=date(2025, 1, 2))
+        Word.objects.create(hanzi="人")
+
+        cards = card_state.load_cards()
+        for days in range(0, 120, 3):
+            when = datetime(2025, 1, 4, tzinfo=timezone.utc) + timedelta(days=days)
+            for card_type in ["read", "write"]:
+                for threshold in [0.9, 0.8, 0.6]:
+                    expected = set(cards.retrievability_between(card_type, when, threshold, 1.0))
+                    self.assertEqual(card_state.known_characters(card_type, threshold, when), expected)
+
+        self.assertEqual(card_state.known_characters("read", 0.6, datetime(2025, 1, 5, tzinfo=timezone.utc), characters=["好"]), {"好"})
+        with self.assertRaises(ValueError):
+            card_state.known_characters("read", 0.7)
+
+    def test_retrievability_expression_matches_store(self):
+        """Test that retrievability computed by the database equals the batch computation."""
+        StudyLog.objects.create(word=self.word_a, type="read", score=7, study_date=date(2025, 1, 1))
+        StudyLog.objects.create(word=self.word_b, type="write", score=2, study_date=date(2025, 1, 3))
+        StudyLog.objects.create(word=Word.objects.create(hanzi="人"), type="readstudy", score=5, study_date=date(2025, 1, 3))
+
+        cards = card_state.load_cards()
+        for when in [datetime(2025, 1, 2, 12, tzinfo=timezone.utc), datetime(2025, 3, 1, tzinfo=timezone.utc)]:
+            for card_type in ["read", "write"]:
+                expected = cards.retrievability_by_character(card_type, when)
+                rows = CardState.objects.filter(card_type=card_type).annotate(
+                    retrievability=card_state.retrievability_expression(card_type, when)
+                ).values_list("word__hanzi", "retrievability")
+                for char, value in rows:
+                    self.assertAlmostEqual(value, expected[char])
+
+
+@patch('studies.logic.card_state.CHECKPOINT_INTERVAL', 2)
+class CardCheckpointTest(CardStateTest):
+    """Test that rebuilds resume from checkpoints and match a full replay."""
+
+    def create_history(self, count):
+        start = date(2025, 1, 1)
+        for i in range(count):
+            StudyLog.objects.create(word=self.word_a, type="write" if i % 3 else "read", score=i % 11, study_date=start + timedelta(days=3 * i))
+
+    def test_checkpoints_are_taken_periodically(self):
+        """Test that a checkpoint is stored every CHECKPOINT_INTERVAL reviews of a card."""
+        self.create_history(6)  # 6 read reviews (4 implied), 4 write reviews
+
+        self.assertEqual(CardCheckpoint.objects.filter(word=self.word_a, card_type="read").count(), 3)
+        self.assertEqual(CardCheckpoint.objects.filter(word=self.word_a, card_type="write").count(), 2)
+
+    def test_rebuild_resumes_from_checkpoint(self):
+        """Test that a partial rebuild only replays logs after the newest valid checkpoint."""
+        self.create_history(6)
+        since = date(2025, 1, 10)
+
+        with patch('studies.logic.card_state.fsrs.replay_card', wraps=fsrs.replay_card) as replay:
+            card_state.rebuild_card_states(word_ids=[self.word_a.id], since=since)
+        # Read checkpoint after 2 reviews (Jan 4), write checkpoint after 2 reviews (Jan 7)
+        self.assertEqual(replay.call_count, 4 + 2)
+        self.assertCardsMatchReplay()
+
+    def test_history_rewrite_invalidates_later_checkpoints(self):
+        """Test that checkpoints after a deleted log are rebuilt from the corrected history."""
+        self.create_history(6)
+        log = StudyLog.objects.get(word=self.word_a, study_date=date(2025, 1, 7))
+        log.delete()
+        card_state.rebuild_card_states(word_ids=[self.word_a.id], since=log.study_date)
+
+        self.assertCardsMatchReplay()
+        self.assertEqual(CardCheckpoint.objects.filter(word=self.word_a, card_type="read").count(), 2)
+        self.assertEqual(CardCheckpoint.objects.filter(word=self.word_a, card_type="write").count(), 1)
+        self.assertEqual(CardState.objects.get(word=self.word_a, card_type="read").review_count, 5)
+
+    def test_bulk_delete_rebuilds_each_word_once(self):
+        """Test that deleting many logs rebuilds each affected word once, on commit."""
+        self.create_history(6)
+        StudyLog.objects.create(word=self.word_b, type="read", score=5, study_date=date(2025, 1, 2))
+        deleted = StudyLog.objects.filter(study_date__in=[date(2025, 1, 2), date(2025, 1, 7), date(2025, 1, 10)])
+
+        with patch('studies.logic.card_state.rebuild_card_states', wraps=card_state.rebuild_card_states) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                deleted.delete()
+        self.assertEqual(len(callbacks), 1)
+        rebuild.assert_called_once()
+        self.assertEqual(sorted(rebuild.call_args.kwargs["word_ids"]), [self.word_a.id, self.word_b.id])
+        self.assertEqual(rebuild.call_args.kwargs["since"], date(2025, 1, 2))
+
+        incremental = set(CardState.objects.values_list("word_id", "card_type", "review_count", "last_log_date"))
+        card_state.rebuild_card_states()
+        self.assertEqual(set(CardState.objects.values_list("word_id", "card_type", "review_count", "last_log_date")), incremental)
+
+
+class CardCacheTest(TestCase):
+    """Test that loaded cards are cached until the StudyLog history changes."""
+
+    def setUp(self):
+        self.word = Word.objects.create(hanzi="你")
+        StudyLog.objects.create(word=self.word, type="read", score=8, study_date=date(2025, 1, 1))
+        fsrs.card_cache.invalidate()
+
+    def test_repeated_loads_hit_cache(self):
+        """Test that a second load with unchanged data reuses the built cards."""
+        before = fsrs.card_cache.stats()
+        first = card_state.load_cards()
+        second = card_state.load_cards(characters=["你"], reviewed_only=True)
+        after = fsrs.card_cache.stats()
+
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(first[("你", "read")].last_review, second[("你", "read")].last_review)
+
+    def test_cache_hit_checks_version_only(self):
+        """Test that a cache hit costs the two high-water-mark queries and no sync or build."""
+        card_state.load_cards()
+        with CaptureQueriesContext(connection) as queries:
+            card_state.load_cards()
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("COUNT", " ".join(query["sql"] for query in queries))
+
+        version = card_state.data_version()
+        StudyLog.objects.filter(word=self.word).update(study_date=date(2024, 12, 1))
+        self.assertNotEqual(card_state.data_version(), version)
+
+    def test_new_log_invalidates_cache(self):
+        """Test that the cards are rebuilt after a new log."""
+        first = card_state.load_cards()
+        StudyLog.objects.create(word=self.word, type="read", score=2, study_date=date(2025, 1, 10))
+        second = card_state.load_cards()
+
+        self.assertNotEqual(first[("你", "read")].last_review, second[("你", "read")].last_review)
+
+    def test_bulk_update_rebuilds_card_states(self):
+        """Test that QuerySet.update() on StudyLog replays the affected cards."""
+        StudyLog.objects.create(word=self.word, type="read", score=2, study_date=date(2025, 1, 10))
+        card_state.load_cards()
+
+        StudyLog.objects.filter(score=2).update(study_date=date(2024, 12, 1))
+
+        read_state = CardState.objects.get(word=self.word, card_type="read")
+        self.assertEqual(read_state.last_log_date, date(2025, 1, 1))
+        card = card_state.load_cards()[("你", "read")]
+        self.assertEqual(card.last_review.date(), date(2025, 1, 1))
+
+    def test_cards_as_of(self):
+        """Test that historical card states ignore later reviews."""
+        StudyLog.objects.create(word=self.word, type="read", score=2, study_date=date(2025, 1, 10))
+
+        cards = card_state.cards_as_of(datetime(2025, 1, 5, tzinfo=timezone.utc))
+        self.assertEqual(cards[("你", "read")].last_review.date(), date(2025, 1, 1))
+        self.assertIsNone(cards[("你", "write")].last_review)
+        earlier = card_state.cards_as_of(datetime(2024, 1, 1, tzinfo=timezone.utc), characters=["你"])
+        self.assertIsNone(earlier[("你", "read")].last_review)
+
+    def test_scoped_load_reads_only_requested_characters(self):
+        """Test that a scoped load without a cached store reads only the requested rows."""
+        other = Word.objects.create(hanzi="好")
+        StudyLog.objects.create(word=other, type="write", score=6, study_date=date(2025, 1, 2))
+        fsrs.card_cache.invalidate()
+
+        with patch('studies.logic.card_state._load_all_cards') as load_all:
+            cards = card_state.load_cards(characters=["好", "人"])
+        load_all.assert_not_called()
+        self.assertEqual(set(cards), {("好", "read"), ("好", "write")})
+
+        full = card_state.load_cards()
+        self.assertEqual(cards[("好", "write")].stability, full[("好", "write")].stability)
+        as_of = card_state.cards_as_of(datetime(2025, 1, 3, tzinfo=timezone.utc), characters=["好"])
+        self.assertEqual(as_of[("好", "write")].stability, full[("好", "write")].stability)
+
@@ -0,0 +1,59 @@
+"""Tests for the review workload forecast."""
+
+from datetime import date, datetime, timedelta, timezone
+
+from django.test import TestCase
+from django.urls import reverse
+from studies.models import StudyLog, Word
+from studies.logic import fsrs
+
+
+class ForecastTest(TestCase):
+    """Test the vectorized forecast against the individual cards."""
+
+    def setUp(self):
+        engine = fsrs.ReplayEngine([
+            ("你", "read", 9, date(2025, 1, 1)),
+            ("好", "write", 6, date(2025, 1, 3)),
+            ("人", "readstudy", 5, date(2025, 1, 4)),
+            ("你", "read", 7, date(2025, 1, 8)),
+        ])
+        self.cards = engine.cards()
+        self.store = fsrs.CardStore.from_cards(self.cards)
+        self.start = datetime(2025, 1, 10, tzinfo=timezone.utc)
+
+    def test_forecast_matches_cards(self):
+        days = 60
+        forecast = fsrs.forecast(self.store, self.start, days)
+
+        for card_type in ["read", "write"]:
+            reviewed = [card for (char, key_type), card in self.cards.items() if key_type == card_type and card.last_review]
+            self.assertEqual(forecast[card_type]["cards"], len(reviewed))
+
+            expected_due = [0] * days
+            for card in reviewed:
+                day = max(0, (card.due - self.start).days)
+                if day < days:
+                    expected_due[day] += 1
+            self.assertEqual(forecast[card_type]["due"], expected_due)
+
+            scheduler = fsrs.get_scheduler(card_type)
+            for day in [0, 5, 59]:
+                when = self.start + timedelta(days=day)
+                expected = sum(scheduler.get_card_retrievability(card, when) for card in reviewed) / len(reviewed)
+                self.assertAlmostEqual(forecast[card_type]["retrievability"][day], expected)
+
+    def test_forecast_view(self):
+        word = Word.objects.create(hanzi="你")
+        StudyLog.objects.create(word=word, type="write", score=8, study_date=date.today() - timedelta(days=3))
+
+        response = self.client.get(reverse("review_forecast"), {"days": 7})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["dates"]), 7)
+        self.assertEqual(data["read"]["cards"], 1)
+        self.assertEqual(data["write"]["cards"], 1)
+        self.assertEqual(len(data["read"]["retrievability"]), 7)
+
+        self.assertEqual(self.client.get(reverse("review_forecast"), {"days": 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("review_forecast"), {"days": "x"}).status_code, 400)
@@ -0,0 +1,208 @@
+"""Tests for the FSRS helpers in studies.logic.fsrs."""
+
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from studies.logic import fsrs
+
+
+class BatchRetrievabilityTest(SimpleTestCase):
+    """Test that the vectorized retrievability matches the scheduler."""
+
+    def setUp(self):
+        self.cards = [fsrs.new_card()]  # Never reviewed
+        for i, score in enumerate([0, 3, 6, 10]):
+            reviews = [(score, date(2025, 1, 1)), (10 - score, date(2025, 1, 3 + i * 5))]
+            self.cards.append(fsrs.replay_card(fsrs.new_card(), "read", reviews))
+
+    def test_matches_scheduler(self):
+        """Test batch_retrievability against Scheduler.get_card_retrievability."""
+        stabilities, last_reviews = fsrs.card_arrays(self.cards)
+        for card_type in ["read", "write"]:
+            scheduler = fsrs.get_scheduler(card_type)
+            for days in [0, 1, 7.5, 30, 400]:
+                now = datetime(2025, 2, 1, tzinfo=timezone.utc) + timedelta(days=days)
+                batch = fsrs.batch_retrievability(stabilities, last_reviews, now, card_type)
+                expected = [scheduler.get_card_retrievability(card, now) for card in self.cards]
+                for got, want in zip(batch, expected, strict=True):
+                    self.assertAlmostEqual(got, want)
+
+    def test_before_last_review(self):
+        """Test that a time before the last review counts as zero elapsed days."""
+        stabilities, last_reviews = fsrs.card_arrays(self.cards[1:])
+        batch = fsrs.batch_retrievability(stabilities, last_reviews, datetime(2024, 1, 1, tzinfo=timezone.utc), "read")
+        for value in batch:
+            self.assertAlmostEqual(value, 1.0)
+
+    def test_retrievability_by_character(self):
+        """Test that only cards of the requested type are returned."""
+        fsrs_cards = {("你", "read"): self.cards[1], ("你", "write"): self.cards[0], ("好", "read"): self.cards[0]}
+        result = fsrs.retrievability_by_character(fsrs_cards, "read", datetime(2025, 2, 1, tzinfo=timezone.utc))
+
+        self.assertEqual(set(result), {"你", "好"})
+        self.assertEqual(result["好"], 0.0)
+        self.assertGreater(result["你"], 0.0)
+
+    def test_threshold_crossings(self):
+        """Test that retrievability is at or above a threshold exactly until its crossing time."""
+        for card in self.cards[1:]:
+            for card_type in ["read", "write"]:
+                scheduler = fsrs.get_scheduler(card_type)
+                crossings = fsrs.threshold_crossings(card.stability, card.last_review, card_type)
+                for threshold, until in crossings.items():
+                    self.assertGreaterEqual(scheduler.get_card_retrievability(card, until - timedelta(seconds=1)), threshold)
+                    self.assertLess(scheduler.get_card_retrievability(card, until), threshold)
+
+        self.assertEqual(set(fsrs.threshold_crossings(None, None, "read").values()), {None})
+
+
+class ReplayEngineTest(SimpleTestCase):
+    """Test the replay engine and its as-of queries."""
+
+    def setUp(self):
+        self.rows = [
+            ("你", "read", 8, date(2025, 1, 1)),
+            ("你", "write", 3, date(2025, 1, 5)),
+            ("好", "readstudy", 5, date(2025, 1, 6)),
+            ("你", "read", 0, date(2025, 1, 20)),
+        ]
+        self.engine = fsrs.ReplayEngine(self.rows)
+
+    def test_matches_sequential_replay(self):
+        """Test that the latest cards equal replaying each card's reviews, with implied reads."""
+        cards = self.engine.cards()
+
+        read = fsrs.replay_card(fsrs.new_card(), "read", [(8, date(2025, 1, 1)), (6, date(2025, 1, 5)), (0, date(2025, 1, 20))])
+        write = fsrs.replay_card(fsrs.new_card(), "write", [(3, date(2025, 1, 5))])
+        for got, want in [(cards[("你", "read")], read), (cards[("你", "write")], write)]:
+            self.assertEqual(got.stability, want.stability)
+            self.assertEqual(got.difficulty, want.difficulty)
+            self.assertEqual(got.last_review, want.last_review)
+        self.assertIsNone(cards[("好", "read")].last_review)
+
+    def test_as_of(self):
+        """Test that as-of queries return the state after the last review at or before the time."""
+        before = datetime(2024, 12, 31, tzinfo=timezone.utc)
+        between = datetime(2025, 1, 10, tzinfo=timezone.utc)
+
+        self.assertIsNone(self.engine.card("你", "read", as_of=before).last_review)
+        self.assertEqual(self.engine.card("你", "read", as_of=between).last_review, fsrs.review_datetime(date(2025, 1, 5)))
+        self.assertEqual(self.engine.card("你", "write", as_of=between).last_review, fsrs.review_datetime(date(2025, 1, 5)))
+
+        replayed = fsrs.ReplayEngine(self.rows[:3]).cards()
+        for key, card in self.engine.cards(as_of=between).items():
+            self.assertEqual(card.stability, replayed[key].stability)
+
+    def test_rejects_out_of_order_rows(self):
+        """Test that a review older than the card's last review is rejected."""
+        with self.assertRaises(ValueError):
+            self.engine.add("你", "read", 5, date(2025, 1, 2))
+
+    def test_start_from_checkpoint(self):
+        """Test that a card resumed from a known state continues its timeline."""
+        engine = fsrs.ReplayEngine(self.rows[:2])
+        resumed = fsrs.ReplayEngine()
+        resumed.start("你", "read", engine.card("你", "read"))
+        resumed.add("你", "read", 0, date(2025, 1, 20))
+
+        self.assertEqual(resumed.card("你", "read").stability, self.engine.card("你", "read").stability)
+
+
+class ReplayHistoryTest(SimpleTestCase):
+    """Test that the process-pool replay matches the serial replay."""
+
+    def setUp(self):
+        start = date(2025, 1, 1)
+        self.rows = [
+            (char, "write" if i % 3 == 0 else "read", (i * 7) % 11, start + timedelta(days=i), i)
+            for i, char in enumerate("你好你们好人你大小你好" * 3, start=1)
+        ]
+
+    def test_parallel_matches_serial(self):
+        serial = fsrs.replay_history(self.rows, snapshot_interval=3, workers=1)
+        parallel = fsrs.replay_history(self.rows, snapshot_interval=3, workers=2, threshold=0)
+
+        self.assertEqual(set(parallel), set(serial))
+        for key, result in serial.items():
+            self.assertEqual(parallel[key]["review_count"], result["review_count"])
+            self.assertEqual(parallel[key]["last_log_id"], result["last_log_id"])
+            self.assertEqual(parallel[key]["card"]["stability"], result["card"]["stability"])
+            self.assertEqual(len(parallel[key]["snapshots"]), result["review_count"] // 3)
+
+    def test_parallel_with_spawned_workers(self):
+        """Test that workers started without the parent's imports set up Django before replaying."""
+        spawn_pool = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn"))
+        serial = fsrs.replay_history(self.rows, workers=1)
+        with patch("studies.logic.fsrs.ProcessPoolExecutor", spawn_pool):
+            parallel = fsrs.replay_history(self.rows, workers=2, threshold=0)
+
+        self.assertEqual(
+            {key: result["card"]["stability"] for key, result in parallel.items()},
+            {key: result["card"]["stability"] for key, result in serial.items()},
+        )
+
+    def test_resume_from_position(self):
+        """Test that reviews at or before a starting position are skipped."""
+        full = fsrs.replay_history(self.rows, workers=1)
+        head = fsrs.replay_history(self.rows[:10], workers=1)
+
+        resumed = fsrs.replay_history(self.rows, start={("你", "read"): head[("你", "read")]}, workers=1)
+        self.assertEqual(resumed[("你", "read")]["card"]["stability"], full[("你", "read")]["card"]["stability"])
+        self.assertEqual(resumed[("你", "read")]["review_count"], full[("你", "read")]["review_count"])
+
+
+class CardStoreTest(SimpleTestCase):
+    """Test the array-backed card store against the Card objects it was built from."""
+
+    def setUp(self):
+        engine = fsrs.ReplayEngine([
+            ("你", "read", 9, date(2025, 1, 1)),
+            ("好", "write", 2, date(2025, 1, 3)),
+            ("人", "readstudy", 5, date(2025, 1, 4)),
+            ("你", "read", 7, date(2025, 1, 8)),
+        ])
+        self.cards = engine.cards()
+        self.store = fsrs.CardStore.from_cards(self.cards)
+        self.now = datetime(2025, 2, 1, tzinfo=timezone.utc)
+
+    def test_views_match_cards(self):
+        self.assertEqual(list(self.store), list(self.cards))
+        for key, card in self.cards.items():
+            view = self.store[key]
+            self.assertEqual(view.stability, card.stability)
+            self.assertEqual(view.difficulty, card.difficulty)
+            self.assertEqual(view.state, card.state)
+            self.assertEqual(view.step, card.step)
+            self.assertEqual(view.last_review, card.last_review)
+            self.assertEqual(view.due, card.due)
+            self.assertEqual(view.to_card().to_dict() | {"card_id": None}, card.to_dict() | {"card_id": None})
+
+    def test_from_card_dicts(self):
+        store = fsrs.CardStore((char, card_type, card.to_dict()) for (char, card_type), card in self.cards.items())
+        for key, card in self.cards.items():
+            self.assertEqual(store[key].last_review, card.last_review)
+            self.assertEqual(store[key].due, card.due)
+
+    def test_retrievability(self):
+        expected = fsrs.retrievability_by_character(self.cards, "read", self.now)
+        self.assertEqual(self.store.retrievability_by_character("read", self.now), expected)
+        self.assertEqual(fsrs.retrievability_by_character(self.store, "read", self.now), expected)
+
+    def test_filters(self):
+        self.assertEqual(set(self.store.retrievability_between("read", self.now, 0.0, 0.0)), {"人"})
+        self.assertEqual(set(self.store.retrievability_between("read", self.now, 0.01, 1.0)), {"你", "好"})
+        due = {char for char in self.store.characters("write") if self.cards[(char, "write")].due <= self.now}
+        self.assertEqual(set(self.store.due_before("write", self.now)), due)
+
+    def test_subset(self):
+        reviewed = self.store.subset(reviewed_only=True)
+        self.assertEqual(set(reviewed.characters("read")), {"你", "好"})
+        self.assertNotIn(("人", "write"), reviewed)
+
+        subset = self.store.subset(characters=["好", "人"], reviewed_only=True)
+        self.assertEqual(subset.keys(), [("好", "read"), ("好", "write")])
+        self.assertEqual(subset[("好", "write")].stability, self.cards[("好", "write")].stability)
@@ -0,0 +1,87 @@
+"""Tests for seeded, reproducible study and exam generation."""
+
+import random
+from datetime import date
+from unittest.mock import Mock
+
+from django.test import TestCase
+from studies.models import Book, Exam, Lesson, StudyLog, Word, WordEntry
+from studies.logic import generation_cache, logic, selection, study_find_words
+
+
+class SeededGenerationTest(TestCase):
+    """Test that the same seed and data reproduce the same sheet."""
+
+    def setUp(self):
+        book = Book.objects.create(title="Test Book", order=1)
+        self.lesson = Lesson.objects.create(book=book, lesson_num=1, is_learned=True, characters="你好人大小山天中")
+        self.other_lesson = Lesson.objects.create(book=book, lesson_num=2, is_learned=False, characters="上下")
+        WordEntry.objects.create(word="你好", score=0.9)
+        WordEntry.objects.create(word="大人", score=0.9)
+        WordEntry.objects.create(word="小山", score=0.9)
+        for char in "你好人大":
+            StudyLog.objects.create(word=Word.objects.get(hanzi=char), type="read", score=8, study_date=date(2025, 1, 1))
+
+    def test_selection_samples_follow_seed(self):
+        """Test that a seeded Selection draws the same samples."""
+        def draw(seed):
+            rng = random.Random(seed)
+            chars = selection.Selection(rng=rng).from_learned_lessons().random(4)
+            pool = selection.Selection(rng=rng).from_fsrs("read").pool(3, sample=2)
+            return chars, pool
+
+        self.assertEqual(draw(7), draw(7))
+        self.assertNotEqual({tuple(draw(seed)[0]) for seed in range(10)}, {tuple(draw(7)[0])})
+
+    def test_exams_and_grid_follow_seed(self):
+        """Test that the exam creators and the find-words grid are reproducible."""
+        self.assertEqual(logic.create_read_exam(5, seed=3), logic.create_read_exam(5, seed=3))
+        self.assertEqual(logic.create_write_exam(8, seed=3), logic.create_write_exam(8, seed=3))
+
+        def grid(seed):
+            return study_find_words.generate_grid("你好大人小山", ["你好", "大人"], list("天中"), rng=random.Random(seed))
+
+        self.assertEqual(grid(5), grid(5))
+
+    def test_identical_requests_reuse_content(self):
+        """Test that a cached generation is reused until the data version changes."""
+        generate = Mock(side_effect=lambda: logic.create_read_exam(5, seed=11))
+        inputs = {"num_chars": 5}
+
+        first = generation_cache.create_generated(Exam, "read", 11, inputs, generate)
+        second = generation_cache.create_generated(Exam, "read", 11, inputs, generate)
+        self.assertEqual(generate.call_count, 1)
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual((second.content, second.seed), (first.content, 11))
+
+        generation_cache.create_generated(Exam, "read", 12, inputs, generate)
+        generation_cache.create_generated(Exam, "read", 11, {"num_chars": 6}, generate)
+        self.assertEqual(generate.call_count, 3)
+
+        StudyLog.objects.create(word=Word.objects.get(hanzi="山"), type="read", score=2, study_date=date(2025, 1, 2))
+        generation_cache.create_generated(Exam, "read", 11, inputs, generate)
+        self.assertEqual(generate.call_count, 4)
+
+    def test_data_version_follows_lessons_and_entries(self):
+        """Test that swapping learned lessons and editing word entries change the cache key."""
+        keys = [generation_cache.cache_key("read", 1, {})]
+
+        Lesson.objects.filter(id=self.lesson.id).update(is_learned=False)
+        Lesson.objects.filter(id=self.other_lesson.id).update(is_learned=True)
+        keys.append(generation_cache.cache_key("read", 1, {}))
+
+        entry = WordEntry.objects.get(word="大人")
+        entry.score = 0.2
+        entry.save()
+        keys.append(generation_cache.cache_key("read", 1, {}))
+
+        WordEntry.objects.filter(word="小山").update(score=0.3)
+        keys.append(generation_cache.cache_key("read", 1, {}))
+        self.assertEqual(len(set(keys)), 4)
+
+    def test_resolve_seed(self):
+        """Test that invalid seeds are replaced by a drawn one."""
+        self.assertEqual(generation_cache.resolve_seed("42"), 42)
+        for value in [None, "", "abc", "-1", str(2 ** 64)]:
+            seed = generation_cache.resolve_seed(value)
+            self.assertTrue(0 <= seed < generation_cache.SEED_RANGE)
@@ -1,7 +1,10 @@
 """Tests for Lesson model character cleaning on save."""
 
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
-from studies.models import Book, Lesson
+from studies.models import Book, Lesson, LessonCharacter, Word
 
 
 class LessonSavingTest(TestCase):
@@ -113,3 +116,29 @@ class LessonSavingTest(TestCase):
         )
         # Should split into individual chars, remove all commas/spaces, remove duplicates
         self.assertEqual(lesson.characters, "你,好,世,界")
+
+    def test_lesson_characters_follow_saved_characters(self):
+        """Test that LessonCharacter rows mirror the cleaned characters, in order."""
+        Word.objects.create(hanzi="好")
+        lesson = Lesson.objects.create(
+            book=self.book,
+            lesson_num=11,
+            characters="你 好,世"
+        )
+        self.assertEqual(
+            list(lesson.lesson_characters.values_list("word__hanzi", "position")),
+            [("你", 0), ("好", 1), ("世", 2)]
+        )
+        self.assertEqual(Word.objects.filter(hanzi="好").count(), 1)
+
+        lesson.characters = "世,界"
+        lesson.save()
+        self.assertEqual(list(lesson.lesson_characters.values_list("word__hanzi", flat=True)), ["世", "界"])
+
+    def test_rebuild_lesson_characters(self):
+        """Test that the command restores the rows of lessons loaded without Lesson.save."""
+        lesson = Lesson.objects.create(book=self.book, lesson_num=12, characters="你,好")
+        LessonCharacter.objects.all().delete()  # As after loaddata
+
+        call_command("rebuild_lesson_characters", stdout=StringIO())
+        self.assertEqual(list(lesson.lesson_characters.values_list("word__hanzi", flat=True)), ["你", "好"])
@@ -0,0 +1,92 @@
+"""Tests for fitting and loading the FSRS scheduler weights."""
+
+from datetime import date, timedelta
+
+import numpy as np
+from django.test import TestCase
+from fsrs.scheduler import DEFAULT_PARAMETERS
+from studies.models import CardState, SchedulerParameters, StudyLog, Word
+from studies.logic import card_state, fsrs, scheduler_parameters
+
+
+class SchedulerParametersTest(TestCase):
+
+    def setUp(self):
+        self.rows = []
+        start = date(2025, 1, 1)
+        for i in range(30):
+            for j in range(6):
+                score = 10 if (i + j) % 4 else 1
+                self.rows.append((i, "read" if j % 2 else "write", score, start + timedelta(days=j * (3 + i % 5) + (j > 2))))
+        self.rows.sort(key=lambda row: row[3])
+
+    def tearDown(self):
+        for card_type in fsrs.CARD_TYPES:
+            fsrs.set_parameters(card_type, None)
+        scheduler_parameters._loaded_version = None
+
+    def test_log_loss_matches_scheduler(self):
+        """Test the batched replay against reviewing fsrs.Card objects one by one."""
+        days, ratings = scheduler_parameters.review_sequences(self.rows)["read"]
+        scheduler = fsrs.get_scheduler("read")
+
+        total, count = 0.0, 0
+        for row in range(len(ratings)):
+            card, last_day = fsrs.new_card(), None
+            for day, rating in zip(days[row], ratings[row], strict=True):
+                if rating == 0:
+                    break
+                study_date = date.fromordinal(int(day))
+                if last_day is not None and day - last_day >= 1:
+                    r = scheduler.get_card_retrievability(card, fsrs.review_datetime(study_date))
+                    total -= np.log(r) if rating > 1 else np.log(1 - r)
+                    count += 1
+                card, _ = scheduler.review_card(card, fsrs.Rating(int(rating)), fsrs.review_datetime(study_date))
+                last_day = day
+
+        self.assertEqual(count, scheduler_parameters.scored_review_count(days, ratings))
+        losses = scheduler_parameters.log_loss([DEFAULT_PARAMETERS, DEFAULT_PARAMETERS], days, ratings)
+        self.assertAlmostEqual(losses[0], total / count)
+        self.assertAlmostEqual(losses[1], losses[0])
+
+    def test_fit_improves_loss(self):
+        days, ratings = scheduler_parameters.review_sequences(self.rows)["read"]
+        parameters, loss = scheduler_parameters.fit(days, ratings, DEFAULT_PARAMETERS, iterations=20)
+
+        self.assertLess(loss, scheduler_parameters.log_loss(DEFAULT_PARAMETERS, days, ratings)[0])
+        self.assertTrue(np.all(np.array(parameters) >= scheduler_parameters.LOWER_BOUNDS))
+        self.assertTrue(np.all(np.array(parameters) <= scheduler_parameters.UPPER_BOUNDS))
+
+    def test_stored_weights_are_loaded(self):
+        """Test that new weights are loaded on the next card load and invalidate cached cards."""
+        word = Word.objects.create(hanzi="你")
+        StudyLog.objects.create(word=word, type="read", score=8, study_date=date(2025, 1, 1))
+        before = card_state.load_cards()[("你", "read")].stability
+
+        weights = list(DEFAULT_PARAMETERS)
+        weights[2] = 10.0  # Initial stability after Good
+        SchedulerParameters.objects.create(card_type="read", parameters=weights)
+        card_state.rebuild_card_states()
+
+        self.assertEqual(list(fsrs.read_scheduler.parameters), weights)
+        self.assertEqual(tuple(fsrs.write_scheduler.parameters), DEFAULT_PARAMETERS)
+        self.assertNotEqual(card_state.load_cards()[("你", "read")].stability, before)
+        self.assertAlmostEqual(CardState.objects.get(card_type="read").card["stability"], 10.0)
+
+        SchedulerParameters.objects.all().delete()
+        scheduler_parameters.sync()
+        self.assertEqual(tuple(fsrs.read_scheduler.parameters), DEFAULT_PARAMETERS)
+
+    def test_fit_all(self):
+        words = {i: Word.objects.create(hanzi=chr(0x4E00 + i)) for i in range(30)}
+        StudyLog.objects.bulk_create([
+            StudyLog(word=words[word_id], type=record_type, score=score, study_date=study_date)
+            for word_id, record_type, score, study_date in self.rows
+        ])
+
+        results = scheduler_parameters.fit_all(iterations=5, min_reviews=10)
+
+        self.assertEqual(set(results), {"read", "write"})
+        stored = SchedulerParameters.objects.get(card_type="read")
+        self.assertEqual(len(stored.parameters), 21)
+        self.assertGreater(stored.review_count, 0)
@@ -0,0 +1,160 @@
+"""Tests for the Selection fluent API compiled to SQL."""
+
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from studies.models import Book, Lesson, StudyLog, Word
+from studies.logic import logic, selection
+
+
+class SelectionTest(TestCase):
+    """Test the selection sources and filters against known histories."""
+
+    def setUp(self):
+        book = Book.objects.create(title="Test Book", order=1)
+        Lesson.objects.create(book=book, lesson_num=1, is_learned=True, characters="你好人大小")
+        Lesson.objects.create(book=book, lesson_num=2, is_learned=False, characters="山")
+        # Saving a lesson creates the words of its characters
+        self.words = {word.hanzi: word for word in Word.objects.all()}
+
+        today = date.today()
+        self.log("你", "read", 9, today - timedelta(days=30))
+        self.log("好", "read", 2, today - timedelta(days=30))
+        self.log("好", "read", 8, today - timedelta(days=1))
+        self.log("人", "write", 0, today - timedelta(days=20))
+        self.log("人", "write", 1, today - timedelta(days=10))
+        self.log("山", "read", 0, today - timedelta(days=5))
+
+    def log(self, char, record_type, score, study_date):
+        StudyLog.objects.create(word=self.words[char], type=record_type, score=score, study_date=study_date)
+
+    def test_learned_lessons_with_filters(self):
+        s = selection.Selection().from_learned_lessons()
+        self.assertEqual(s.get_all(), sorted("你好人大小"))
+
+        s = selection.Selection().from_learned_lessons().remove_score_greater("read", 5)
+        self.assertEqual(s.get_all(), sorted("人大小"))
+
+        s = selection.Selection().from_learned_lessons().remove_any_recent_records(15)
+        self.assertEqual(s.get_all(), sorted("你大小"))
+
+        s = selection.Selection().from_learned_lessons().remove_recent_records_by_type(15, ["write"])
+        self.assertEqual(s.get_all(), sorted("你好大小"))
+
+    def test_failed_records_and_hard_mode(self):
+        cutoff = (date.today() - timedelta(days=60)).isoformat()
+        self.assertEqual(selection.Selection().from_failed_records("read", cutoff, 5).get_all(), ["山"])
+        self.assertEqual(selection.Selection().from_hard_mode("write").get_all(), ["人"])
+        s = selection.Selection().from_learned_lessons().remove_hard_mode_words("write")
+        self.assertEqual(s.get_all(), sorted("你好大小"))
+
+    def test_classify_failed_characters(self):
+        """Test that the latest read and write scores are classified in one query."""
+        today = date.today()
+        self.log("你", "write", 3, today - timedelta(days=2))
+        self.log("大", "write", 9, today - timedelta(days=40))
+        self.log("大", "write", 1, today - timedelta(days=3))
+        cutoff = (today - timedelta(days=60)).isoformat()
+
+        with CaptureQueriesContext(connection) as queries:
+            failed = selection.classify_failed_characters(cutoff, 5)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(failed, {"山": "read", "人": "write", "你": "write", "大": "write"})
+
+        self.log("你", "read", 2, today)
+        self.assertEqual(selection.classify_failed_characters(cutoff, 5)["你"], "both")
+
+    def test_fsrs_ordering_and_limit(self):
+        s = selection.Selection().from_fsrs("read").retrievability(min_val=0.000001).lowest_retrievability()
+        chars = s.get_all()
+        self.assertEqual(set(chars), set("你好人"))
+        self.assertEqual(s.take(2), chars[:2])
+
+        s = selection.Selection().from_fsrs("read").remove_any_recent_records(15).lowest_retrievability()
+        self.assertEqual(s.get_all(), ["你"])
+
+    def test_lowest_k_and_pool(self):
+        lowest = selection.Selection().from_fsrs("read").lowest_retrievability().get_all()
+        self.assertEqual(selection.Selection().from_fsrs("read").lowest_k(2), lowest[:2])
+
+        with CaptureQueriesContext(connection) as queries:
+            sample = selection.Selection().from_fsrs("read").pool(2, sample=1)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(sample), 1)
+        self.assertIn(sample[0], lowest[:2])
+        self.assertEqual(len(selection.Selection().from_fsrs("read").pool(2, sample=5)), 2)
+
+    def test_review_exam_takes_lowest_due(self):
+        """Test that a review exam only fetches the due cards it uses, lowest retrievability first."""
+        due = selection.Selection().from_fsrs("read", due_only=True).lowest_retrievability().get_all()
+        self.assertGreater(len(due), 1)
+        with CaptureQueriesContext(connection) as queries:
+            exam = logic.create_review_exam("read", 1, seed=1)
+        self.assertEqual(exam["items"], due[:1])
+        self.assertIn("LIMIT 1", queries[0]["sql"])
+
+    def test_chain_compiles_to_one_query(self):
+        """Test that the filters are pushed into the statement that fetches the characters."""
+        s = selection.Selection().from_fsrs("read").remove_score_greater("read", 5)
+        s = s.remove_any_recent_records(15).lowest_retrievability()
+        with CaptureQueriesContext(connection) as queries:
+            s.take(1)
+        self.assertEqual(len(queries), 1)
+
+        s = selection.Selection().from_learned_lessons().remove_any_recent_records(3)
+        with CaptureQueriesContext(connection) as queries:
+            sample = s.random(2)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(sample), 2)
+        self.assertLessEqual(set(sample), set("你人大小"))
+
+    def test_candidates(self):
+        """Test that FSRS fetches keep slim records of the returned characters."""
+        s = selection.Selection().from_fsrs("read").lowest_retrievability()
+        chars = s.take(3)
+        self.assertEqual([c.char for c in s.candidates], chars)
+        self.assertEqual([c.retrievability for c in s.candidates], sorted(c.retrievability for c in s.candidates))
+        self.assertEqual(s.candidates[0].word_id, self.words[chars[0]].id)
+        self.assertEqual({c.card_type for c in s.candidates}, {"read"})
+
+        s = selection.Selection().from_fsrs("read")
+        sample = s.pool(3, sample=2)
+        self.assertEqual([c.char for c in s.candidates], sample)
+
+        s = selection.Selection(profile=True).from_fsrs("read")
+        char = s.random(1)[0]
+        self.assertEqual(s.candidates[0].char, char)
+        self.assertIn(f"{char} read retrievability", s.explain())
+
+        s = selection.Selection().from_learned_lessons()
+        s.get_all()
+        self.assertEqual(s.candidates, [])
+
+    def test_profile_report(self):
+        """Test that a profiled selection records each step with its candidates and queries."""
+        s = selection.Selection(profile=True).from_learned_lessons().remove_score_greater("read", 5)
+        chars = s.remove_any_recent_records(15).random(10)
+
+        steps = [(p.step, p.candidates_in, p.candidates_out) for p in s.profile_steps]
+        self.assertEqual(steps, [
+            ("from_learned_lessons", None, 5),
+            ("remove_score_greater", 5, 3),
+            ("remove_any_recent_records", 3, 2),
+            ("random", 2, len(chars)),
+        ])
+        self.assertTrue(all(p.queries >= 1 for p in s.profile_steps))
+        self.assertIn("remove_score_greater", s.explain())
+
+        s = selection.Selection(profile=True).from_fsrs("read")
+        s.pool(2, sample=1)
+        self.assertEqual([(p.step, p.candidates_out) for p in s.profile_steps], [("from_fsrs", 3), ("pool", 1)])
+        with self.assertLogs("studies.logic.selection", level="DEBUG") as logs:
+            s.log_explain("review study")
+        self.assertIn("pool", logs.output[0])
+
+        s = selection.Selection(profile=False).from_learned_lessons()
+        self.assertEqual((s.profile_steps, s.explain()), ([], "Selection profiling is disabled"))
+        with self.assertNoLogs("studies.logic.selection", level="DEBUG"):
+            s.log_explain("review study")
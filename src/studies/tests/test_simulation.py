@@ -0,0 +1,61 @@
+"""Tests for the Monte Carlo review schedule simulator."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from django.test import SimpleTestCase
+from studies.logic import fsrs, simulation
+
+
+class SimulationTest(SimpleTestCase):
+
+    def setUp(self):
+        rows = []
+        for i in range(40):
+            char = chr(0x4E00 + i)
+            rows.append((char, "read", 8, date(2025, 1, 1)))
+            rows.append((char, "read", 6 + i % 5, date(2025, 1, 2 + i % 7)))
+        rows.sort(key=lambda row: row[3])
+        self.cards = fsrs.ReplayEngine(rows).cards()
+        self.store = fsrs.CardStore.from_cards(self.cards)
+        self.start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+    def test_memory_state_matches_scheduler(self):
+        """Test fsrs.next_memory_state against Scheduler.review_card for cards in the Review state."""
+        scheduler = fsrs.get_scheduler("read")
+        parameters = np.asarray(scheduler.parameters, dtype=float)
+        when = self.start + timedelta(days=3)
+        review_cards = [card for card in self.cards.values() if card.state == fsrs.State.Review][:10]
+        self.assertTrue(review_cards)
+
+        for rating in fsrs.Rating:
+            for card in review_cards:
+                retrievability = scheduler.get_card_retrievability(card, when)
+                stability, difficulty = fsrs.next_memory_state(
+                    parameters, np.array(card.stability), np.array(card.difficulty), np.array(retrievability),
+                    np.array(int(rating)), np.array(3),
+                )
+                expected, _ = scheduler.review_card(card, rating, when)
+                self.assertAlmostEqual(float(stability), expected.stability)
+                self.assertAlmostEqual(float(difficulty), expected.difficulty)
+
+    def test_daily_limit(self):
+        result = simulation.simulate(self.store, "read", self.start, days=20, daily_limit=3, runs=50, seed=1)
+
+        self.assertEqual(result["cards"], 40)
+        self.assertEqual(len(result["reviews"]), 20)
+        self.assertTrue(all(reviews <= 3 for reviews in result["reviews"]))
+        # Every card is overdue on day one, so the capped exams leave a backlog
+        self.assertAlmostEqual(result["reviews"][0], 3)
+        self.assertAlmostEqual(result["backlog"][0], 37)
+        self.assertTrue(all(0 <= retention <= 1 for retention in result["retention"]))
+
+    def test_no_limit_clears_backlog(self):
+        result = simulation.simulate(self.store, "read", self.start, days=5, runs=10, seed=1)
+        self.assertEqual(result["backlog"], [0.0] * 5)
+        self.assertAlmostEqual(result["reviews"][0], 40)
+
+    def test_seed_is_reproducible(self):
+        first = simulation.simulate(self.store, "read", self.start, days=10, daily_limit=5, runs=20, seed=7)
+        second = simulation.simulate(self.store, "read", self.start, days=10, daily_limit=5, runs=20, seed=7)
+        self.assertEqual(first, second)
@@ -73,3 +73,53 @@ class StatsLogicTest(TestCase):
         self.assertEqual(result["write"]["learning"], 1) # A
         self.assertEqual(result["write"]["lapsing"], 0)
         self.assertEqual(result["write"]["total"], 2)
+
+    def test_calculate_monthly_stats(self):
+        log_rows = [
+            ("你", "read", 10, datetime.date(2025, 1, 5)),
+            ("好", "readstudy", 5, datetime.date(2025, 1, 6)),
+            ("你", "write", 1, datetime.date(2025, 1, 20)),
+            ("你", "write", 0, datetime.date(2025, 3, 2)),
+        ]
+
+        result = stats.calculate_monthly_stats(log_rows)
+
+        # February has no logs but still gets a snapshot
+        self.assertEqual([m["month"] for m in result], ["2025-01", "2025-02", "2025-03"])
+        january, february, march = result
+        self.assertEqual(january["total_reviews"], 2)
+        self.assertEqual(january["total_studies"], 1)
+        self.assertEqual(february["total_reviews"], 0)
+        self.assertEqual(march["cumulative_unique_chars"], 2)
+
+        # 好 has only a study log, so both of its cards count as lapsing
+        for month in result:
+            self.assertEqual(month["read_mastered"] + month["read_learning"] + month["read_lapsing"], 2)
+            self.assertEqual(month["write_mastered"] + month["write_learning"] + month["write_lapsing"], 2)
+        self.assertEqual(january["read_mastered"], 1)
+
+        # Two consecutive write failures put 你 in hard mode for writing only
+        self.assertEqual(january["write_hard"], 0)
+        self.assertEqual(march["write_hard"], 1)
+        self.assertEqual(march["read_hard"], 0)
+
+    def test_calculate_monthly_stats_empty(self):
+        self.assertEqual(stats.calculate_monthly_stats([]), [])
+
+    def test_calculate_recent_history(self):
+        local_now = datetime.datetime(2025, 1, 10, 12, tzinfo=datetime.timezone.utc)
+        # Newest first, as streamed by study_history.iter_log_rows
+        log_rows = [
+            ("你", "read", 10, datetime.date(2025, 1, 9)),
+            ("你", "write", 0, datetime.date(2025, 1, 8)),
+            ("你", "read", 3, datetime.date(2025, 1, 7)),
+            ("你", "read", 0, datetime.date(2025, 1, 5)),
+            ("你", "read", 6, datetime.date(2025, 1, 1)),
+        ]
+
+        result = stats.calculate_recent_history(log_rows, local_now)
+
+        # Last 3 reviews, oldest first
+        self.assertEqual([r["days_ago"] for r in result["你"]["read"]], [5, 3, 1])
+        self.assertEqual(result["你"]["read"][0]["color"], "text-danger")
+        self.assertEqual([r["days_ago"] for r in result["你"]["write"]], [2])
@@ -0,0 +1,46 @@
+"""Tests for the character index of WordEntry."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from studies.models import WordEntry, WordEntryCharacter
+
+
+class WordEntryCharacterTest(TestCase):
+    """Test that the character index stays in sync and answers like a substring search."""
+
+    def setUp(self):
+        WordEntry.objects.create(word="你好", score=0.9)
+        WordEntry.objects.create(word="好好学习", score=0.6)
+        WordEntry.objects.create(word="大人", score=0.8)
+
+    def index(self):
+        return set(WordEntryCharacter.objects.values_list("word_entry__word", "char"))
+
+    def test_index_follows_writes(self):
+        """Test that save, bulk_create, update and delete keep the index in sync."""
+        self.assertIn(("好好学习", "学"), self.index())
+        self.assertEqual(WordEntryCharacter.objects.filter(word_entry__word="好好学习").count(), 3)
+
+        WordEntry.objects.bulk_create([WordEntry(word="小山", score=0.7), WordEntry(word="你好", score=0.1)], ignore_conflicts=True)
+        self.assertIn(("小山", "山"), self.index())
+
+        WordEntry.objects.filter(word="大人").update(word="大山")
+        entry = WordEntry.objects.get(word="小山")
+        entry.word = "小人"
+        entry.save()
+        WordEntry.objects.filter(word="你好").delete()
+
+        expected = {(entry.word, char) for entry in WordEntry.objects.all() for char in entry.word}
+        self.assertEqual(self.index(), expected)
+
+    def test_by_character_matches_contains(self):
+        """Test that one IN query returns the same entries, in order, as a substring search per character."""
+        characters = ["好", "人", "山", "好"]
+        with CaptureQueriesContext(connection) as queries:
+            by_char = WordEntry.objects.by_character(characters)
+        self.assertEqual(len(queries), 1)
+
+        for char in characters:
+            self.assertEqual(by_char[char], list(WordEntry.objects.filter(word__contains=char)))
+        self.assertEqual(WordEntry.objects.filter(score__gte=0.8).by_character(["好"])["好"], [WordEntry.objects.get(word="你好")])
@@ -0,0 +1,100 @@
+"""Tests for the per-word progress summaries kept in sync with StudyLog."""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from studies.models import Book, CardState, Lesson, StudyLog, Word, WordProgress
+from studies.logic import selection, word_progress
+
+
+class WordProgressTest(TestCase):
+    """Test that incremental progress updates match a rebuild from the history."""
+
+    def setUp(self):
+        self.word_a = Word.objects.create(hanzi="你")
+        self.word_b = Word.objects.create(hanzi="好")
+        self.start = date(2025, 1, 1)
+
+    def log(self, word, record_type, score, day):
+        return StudyLog.objects.create(word=word, type=record_type, score=score, study_date=self.start + timedelta(days=day))
+
+    def progress(self):
+        return {
+            (row.word_id, row.record_type): (row.failure_streak, row.is_hard_mode)
+            for row in WordProgress.objects.all()
+        }
+
+    def summaries(self):
+        return set(WordProgress.objects.values_list(
+            "word_id", "record_type", "failure_streak", "is_hard_mode",
+            "latest_score", "latest_log_id", "latest_date", "review_count",
+        ))
+
+    def assertProgressMatchesRebuild(self):
+        incremental = self.summaries()
+        word_progress.rebuild_word_progress()
+        self.assertEqual(incremental, self.summaries())
+
+    def test_hard_mode_after_two_failures(self):
+        """Test that two consecutive latest scores <= 1 put a word in Hard Mode until a pass."""
+        self.log(self.word_a, "write", 0, 0)
+        self.log(self.word_a, "write", 1, 1)
+        self.log(self.word_b, "write", 0, 1)
+        self.log(self.word_b, "read", 1, 2)
+
+        self.assertEqual(self.progress()[(self.word_a.id, "write")], (2, True))
+        self.assertEqual(self.progress()[(self.word_b.id, "write")], (1, False))
+        self.assertEqual(selection.Selection().get_hard_mode_words("write"), [self.word_a])
+        self.assertProgressMatchesRebuild()
+
+        self.log(self.word_a, "write", 6, 3)
+        self.assertEqual(self.progress()[(self.word_a.id, "write")], (0, False))
+        self.assertEqual(selection.Selection().from_hard_mode("write").get_all(), [])
+
+    def test_out_of_order_log(self):
+        """Test that a backdated failure does not extend the streak of newer logs."""
+        self.log(self.word_a, "read", 1, 5)
+        self.log(self.word_a, "read", 9, 4)
+        self.log(self.word_a, "read", 0, 1)
+
+        self.assertEqual(self.progress()[(self.word_a.id, "read")], (1, False))
+        self.assertProgressMatchesRebuild()
+
+    def test_history_rewrites(self):
+        """Test that deleted and re-scored logs are reflected in the progress."""
+        self.log(self.word_a, "read", 0, 0)
+        passed = self.log(self.word_a, "read", 8, 1)
+        self.log(self.word_a, "read", 1, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            passed.delete()
+        self.assertEqual(self.progress()[(self.word_a.id, "read")], (2, True))
+
+        StudyLog.objects.filter(word=self.word_a, score=0).update(score=7)
+        self.assertEqual(self.progress()[(self.word_a.id, "read")], (1, False))
+
+    def test_latest_score_and_date(self):
+        """Test the latest score, latest date and review count, and the filters reading them."""
+        self.log(self.word_a, "read", 9, 3)
+        self.log(self.word_a, "read", 4, 1)  # Recorded last, dated earlier
+        self.log(self.word_b, "write", 7, 0)
+
+        progress = WordProgress.objects.get(word=self.word_a, record_type="read")
+        self.assertEqual((progress.latest_score, progress.latest_date, progress.review_count), (4, self.start + timedelta(days=3), 2))
+        self.assertProgressMatchesRebuild()
+
+        Lesson.objects.create(book=Book.objects.create(title="Test Book"), lesson_num=1, is_learned=True, characters="你好")
+        s = selection.Selection().from_learned_lessons()
+        self.assertEqual(s.remove_score_greater("read", 5).get_all(), ["你", "好"])
+        self.assertEqual(s.remove_score_greater("write", 5).get_all(), ["你"])
+
+    def test_failed_update_rolls_back_log(self):
+        """Test that a log is not kept when its progress tracking fails."""
+        self.log(self.word_a, "read", 8, 0)
+        states = list(CardState.objects.values_list("card", flat=True))
+        with patch("studies.logic.word_progress.apply_log", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.log(self.word_a, "read", 1, 1)
+        self.assertEqual(StudyLog.objects.count(), 1)
+        self.assertEqual(list(CardState.objects.values_list("card", flat=True)), states)
@@ -12,6 +12,7 @@ urlpatterns = [
     
     # Stats URL
     path('stats/', views.stats_view, name='show_stats'),
+    path('stats/forecast/', views.forecast_view, name='review_forecast'),
     
     # Study generation URLs
     path('study/chars/', views.generate_study_chars, name='generate_study_chars'),
@@ -1,7 +1,9 @@
+import random
+
 from django.shortcuts import render, redirect
 from studies.models import Exam, ExamSettings, Book, Lesson
 from .. import logic as study_logic
-from ..logic import selection
+from ..logic import generation_cache, selection
 from .lessons import parse_lesson_range
 
 def generate_read_exam(request):
@@ -56,43 +58,62 @@ def generate_read_exam(request):
         settings_obj.include_hard_mode = include_hard_mode
         settings_obj.save()
 
-        # For read exam, we'll modify the selection process if filters are provided
-        if score_filter is not None or days_filter is not None:
-            # Custom selection with filters
-            s = selection.Selection()
-            s = s.from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
-            # Remove hard mode words from regular exam unless requested
-            if not include_hard_mode:
-                s = s.remove_hard_mode_words('read')
-            if score_filter is not None:
-                s = s.remove_score_greater("read", score_filter)
-            if days_filter is not None:
-                s = s.remove_any_recent_records(days_filter)
-            selected_chars = s.random(num_chars)
-            content_data = study_logic.create_read_exam(
-                num_chars=num_chars,
-                character_list=selected_chars,  # Pass pre-selected characters
-                title=title, 
-                header_text=header_text
-            )
-        else:
-            # Use default logic
-            # Explicitly select and filter to ensure hard mode exclusion
-            s = selection.Selection().from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
-            if not include_hard_mode:
-                s = s.remove_hard_mode_words('read')
-            selected_chars = s.random(num_chars)
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'score_filter': score_filter,
+            'days_filter': days_filter,
+            'title': title,
+            'header_text': header_text,
+            'include_hard_mode': include_hard_mode,
+            'book_id': book_id,
+            'lesson_ids': lesson_ids,
+        }
+
+        def generate():
+            rng = random.Random(seed)
+            # For read exam, we'll modify the selection process if filters are provided
+            if score_filter is not None or days_filter is not None:
+                # Custom selection with filters
+                s = selection.Selection(rng=rng)
+                s = s.from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
+                # Remove hard mode words from regular exam unless requested
+                if not include_hard_mode:
+                    s = s.remove_hard_mode_words('read')
+                if score_filter is not None:
+                    s = s.remove_score_greater("read", score_filter)
+                if days_filter is not None:
+                    s = s.remove_any_recent_records(days_filter)
+                selected_chars = s.random(num_chars)
+                s.log_explain('read exam')
+                content_data = study_logic.create_read_exam(
+                    num_chars=num_chars,
+                    character_list=selected_chars,  # Pass pre-selected characters
+                    title=title, 
+                    header_text=header_text,
+                    seed=seed,
+                )
+            else:
+                # Use default logic
+                # Explicitly select and filter to ensure hard mode exclusion
+                s = selection.Selection(rng=rng).from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
+                if not include_hard_mode:
+                    s = s.remove_hard_mode_words('read')
+                selected_chars = s.random(num_chars)
+                s.log_explain('read exam')
             
-            content_data = study_logic.create_read_exam(
-                num_chars=num_chars, 
-                character_list=selected_chars,
-                title=title, 
-                header_text=header_text,
-                book_id=book_id,
-                lesson_ids=lesson_ids
-            )
+                content_data = study_logic.create_read_exam(
+                    num_chars=num_chars, 
+                    character_list=selected_chars,
+                    title=title, 
+                    header_text=header_text,
+                    book_id=book_id,
+                    lesson_ids=lesson_ids,
+                    seed=seed,
+                )
+            return content_data
 
-        exam = Exam.objects.create(type='read', content=content_data)
+        exam = generation_cache.create_generated(Exam, 'read', seed, inputs, generate)
         return redirect('view_exam', exam_id=exam.id)
     
     # Use last used parameters or defaults
@@ -162,43 +183,62 @@ def generate_write_exam(request):
         settings_obj.include_hard_mode = include_hard_mode
         settings_obj.save()
 
-        # For write exam, we'll modify the selection process if filters are provided
-        if score_filter is not None or days_filter is not None:
-            # Custom selection with filters
-            s = selection.Selection()
-            s = s.from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
-            # Remove hard mode words from regular exam unless requested
-            if not include_hard_mode:
-                s = s.remove_hard_mode_words('write')
-            if score_filter is not None:
-                s = s.remove_score_greater("write", score_filter)
-            if days_filter is not None:
-                s = s.remove_any_recent_records(days_filter)
-            selected_chars = s.random(num_chars)
-            content_data = study_logic.create_write_exam(
-                num_chars=num_chars,
-                character_list=selected_chars,  # Pass pre-selected characters
-                title=title, 
-                header_text=header_text
-            )
-        else:
-            # Use default logic
-            # Explicitly select and filter to ensure hard mode exclusion
-            s = selection.Selection().from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
-            if not include_hard_mode:
-                s = s.remove_hard_mode_words('write')
-            selected_chars = s.random(num_chars)
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'score_filter': score_filter,
+            'days_filter': days_filter,
+            'title': title,
+            'header_text': header_text,
+            'include_hard_mode': include_hard_mode,
+            'book_id': book_id,
+            'lesson_ids': lesson_ids,
+        }
+
+        def generate():
+            rng = random.Random(seed)
+            # For write exam, we'll modify the selection process if filters are provided
+            if score_filter is not None or days_filter is not None:
+                # Custom selection with filters
+                s = selection.Selection(rng=rng)
+                s = s.from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
+                # Remove hard mode words from regular exam unless requested
+                if not include_hard_mode:
+                    s = s.remove_hard_mode_words('write')
+                if score_filter is not None:
+                    s = s.remove_score_greater("write", score_filter)
+                if days_filter is not None:
+                    s = s.remove_any_recent_records(days_filter)
+                selected_chars = s.random(num_chars)
+                s.log_explain('write exam')
+                content_data = study_logic.create_write_exam(
+                    num_chars=num_chars,
+                    character_list=selected_chars,  # Pass pre-selected characters
+                    title=title, 
+                    header_text=header_text,
+                    seed=seed,
+                )
+            else:
+                # Use default logic
+                # Explicitly select and filter to ensure hard mode exclusion
+                s = selection.Selection(rng=rng).from_learned_lessons(book_id=book_id, lesson_ids=lesson_ids)
+                if not include_hard_mode:
+                    s = s.remove_hard_mode_words('write')
+                selected_chars = s.random(num_chars)
+                s.log_explain('write exam')
             
-            content_data = study_logic.create_write_exam(
-                num_chars=num_chars,
-                character_list=selected_chars,
-                title=title, 
-                header_text=header_text,
-                book_id=book_id,
-                lesson_ids=lesson_ids
-            )
+                content_data = study_logic.create_write_exam(
+                    num_chars=num_chars,
+                    character_list=selected_chars,
+                    title=title, 
+                    header_text=header_text,
+                    book_id=book_id,
+                    lesson_ids=lesson_ids,
+                    seed=seed,
+                )
+            return content_data
 
-        exam = Exam.objects.create(type='write', content=content_data)
+        exam = generation_cache.create_generated(Exam, 'write', seed, inputs, generate)
         return redirect('view_exam', exam_id=exam.id)
     
     # Use last used parameters or defaults
@@ -260,24 +300,36 @@ def _generate_review_exam(request, exam_type):
         # We need to modify create_review_exam or pre-select here.
         # study_logic.create_review_exam likely uses Selection().from_fsrs(...)
         
-        # Let's do it manually here to be safe and explicit
-        s = selection.Selection().from_fsrs(exam_type, due_only=True)
-        if not include_hard_mode:
-            s = s.remove_hard_mode_words(exam_type)
-        
-        s = s.lowest_retrievability()
-        selected_chars = s.take(num_chars)
-        
-        # We need a way to pass these characters to create_review_exam
-        # Checking logic/exam_generation.py (which we haven't seen but inferred)
-        # Assuming it accepts character_list like others.
-        
-        content_data = study_logic.create_review_exam(
-            exam_type=exam_type, 
-            num_chars=num_chars,
-            character_list=selected_chars
-        )
-        exam = Exam.objects.create(type=f'{exam_type}_review', content=content_data)
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'title': title,
+            'header_text': header_text,
+            'include_hard_mode': include_hard_mode,
+        }
+
+        def generate():
+            # Let's do it manually here to be safe and explicit
+            s = selection.Selection().from_fsrs(exam_type, due_only=True)
+            if not include_hard_mode:
+                s = s.remove_hard_mode_words(exam_type)
+            
+            s = s.lowest_retrievability()
+            selected_chars = s.take(num_chars)
+            s.log_explain(f'{exam_type} review exam')
+            
+            # We need a way to pass these characters to create_review_exam
+            # Checking logic/exam_generation.py (which we haven't seen but inferred)
+            # Assuming it accepts character_list like others.
+            
+            return study_logic.create_review_exam(
+                exam_type=exam_type, 
+                num_chars=num_chars,
+                character_list=selected_chars,
+                seed=seed,
+            )
+
+        exam = generation_cache.create_generated(Exam, f'{exam_type}_review', seed, inputs, generate)
         return redirect('view_exam', exam_id=exam.id)
     
     # Use last used parameters or defaults
@@ -304,30 +356,41 @@ def _generate_recovery_exam(request, exam_type):
         title = request.POST.get('title', f'{exam_type.capitalize()} Recovery Exam')
         header_text = request.POST.get('header_text', 'Recovering failed characters. Score > 1 to recover.')
         
-        # Select hard mode words
-        s = selection.Selection().from_hard_mode(exam_type)
-        selected_chars = s.get_all() # Take all hard mode words? Or limit?
-        # Let's take all for now, or maybe random 50 if too many.
-        # Given user said "recovery exam", let's include all.
-        
-        num_chars = len(selected_chars)
-        
-        if exam_type == 'read':
-            content_data = study_logic.create_read_exam(
-                num_chars=num_chars,
-                character_list=selected_chars,
-                title=title,
-                header_text=header_text
-            )
-        else:
-            content_data = study_logic.create_write_exam(
-                num_chars=num_chars,
-                character_list=selected_chars,
-                title=title,
-                header_text=header_text
-            )
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'recovery': True,
+            'title': title,
+            'header_text': header_text,
+        }
+
+        def generate():
+            # Select hard mode words
+            s = selection.Selection().from_hard_mode(exam_type)
+            selected_chars = s.get_all() # Take all hard mode words? Or limit?
+            s.log_explain(f'{exam_type} recovery exam')
+            # Let's take all for now, or maybe random 50 if too many.
+            # Given user said "recovery exam", let's include all.
             
-        exam = Exam.objects.create(type=f'{exam_type}', content=content_data)
+            num_chars = len(selected_chars)
+            
+            if exam_type == 'read':
+                return study_logic.create_read_exam(
+                    num_chars=num_chars,
+                    character_list=selected_chars,
+                    title=title,
+                    header_text=header_text,
+                    seed=seed,
+                )
+            else:
+                return study_logic.create_write_exam(
+                    num_chars=num_chars,
+                    character_list=selected_chars,
+                    title=title,
+                    header_text=header_text,
+                    seed=seed,
+                )
+
+        exam = generation_cache.create_generated(Exam, f'{exam_type}', seed, inputs, generate)
         return redirect('view_exam', exam_id=exam.id)
     
     # Just render a confirmation page or similar?
@@ -1,39 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from studies.models import Book, Lesson, StudyLog
+from studies.models import Book, Lesson
 import threading
 from django.utils import timezone
 import pytz
-import re
-from ..logic import word_population, fsrs, stats
+from ..logic import word_population, card_state, stats, study_history
 
 def lesson_list(request):
     """Displays a list of all lessons grouped by book with progress stats."""
-    books = Book.objects.prefetch_related('lessons').all()
+    books = Book.objects.prefetch_related('lessons__lesson_characters__word').all()
     
-    # Fetch all study logs for stats calculation
-    study_logs = StudyLog.objects.filter(
-        type__in=['read', 'write']
-    ).select_related('word')
+    # Stream the review history, newest first, for the recent history column
+    recent_log_rows = study_history.iter_log_rows(types=['read', 'write'], order_by=('-study_date', 'id'))
     
     local_tz = pytz.timezone('America/Los_Angeles')
     local_now = timezone.now().astimezone(local_tz)
     
-    # Build FSRS cards and stats
-    fsrs_cards = fsrs.build_cards_from_logs(list(study_logs))
+    # Load FSRS cards and stats
+    fsrs_cards = card_state.load_cards(reviewed_only=True)
     character_stats = stats.calculate_character_stats(fsrs_cards, local_now)
-    recent_history = stats.calculate_recent_history(study_logs, local_now)
+    recent_history = stats.calculate_recent_history(recent_log_rows, local_now)
     
     # Attach stats to lessons
     for book in books:
         for lesson in book.lessons.all():
-            # Parse characters - existing records may be in various formats
-            raw_chars = lesson.characters.strip()
-            if ',' in raw_chars:
-                chars = [c.strip() for c in raw_chars.split(',') if c.strip()]
-            elif re.search(r'\s', raw_chars):
-                chars = raw_chars.split()
-            else:
-                chars = list(raw_chars)
+            chars = [lesson_char.word.hanzi for lesson_char in lesson.lesson_characters.all()]
             lesson.stats = stats.aggregate_lesson_stats(character_stats, chars)
             
             # Attach detailed stats for the accordion view
@@ -70,14 +60,7 @@ def toggle_lesson_learned(request, lesson_id):
         
         if not was_learned and lesson.is_learned:
             # Trigger background population
-            # Parse characters - existing records may be in various formats
-            raw_chars = lesson.characters.strip()
-            if ',' in raw_chars:
-                chars = [c.strip() for c in raw_chars.split(',') if c.strip()]
-            elif re.search(r'\s', raw_chars):
-                chars = raw_chars.split()
-            else:
-                chars = list(raw_chars)
+            chars = list(lesson.lesson_characters.values_list('word__hanzi', flat=True))
             threading.Thread(target=word_population.seed_words_for_lesson, args=(chars,)).start()
             
     return redirect('lesson_list')
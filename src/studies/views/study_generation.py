@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect
 from studies.models import Study, Book, Lesson
 from .. import logic as study_logic
+from ..logic import generation_cache
 from .lessons import parse_lesson_range
 
 def generate_study_chars(request):
@@ -31,16 +32,19 @@ def generate_study_chars(request):
                 # Find lesson IDs for these numbers in the selected book
                 lesson_ids = list(Lesson.objects.filter(book_id=book_id, lesson_num__in=lesson_nums).values_list('id', flat=True))
 
-        content_data = study_logic.create_study_chars_sheet(
-            num_chars=num_chars, 
-            score_filter=score_filter, 
-            days_filter=days_filter, 
-            header_text=header_text, 
-            study_source=study_source,
-            book_id=book_id,
-            lesson_ids=lesson_ids
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'score_filter': score_filter,
+            'days_filter': days_filter,
+            'header_text': header_text,
+            'study_source': study_source,
+            'book_id': book_id,
+            'lesson_ids': lesson_ids,
+        }
+        study = generation_cache.create_generated(
+            Study, 'chars', seed, inputs, lambda: study_logic.create_study_chars_sheet(**inputs, seed=seed)
         )
-        study = Study.objects.create(type='chars', content=content_data)
         return redirect('view_study', study_id=study.id)
     
     books = Book.objects.prefetch_related('lessons').all()
@@ -62,8 +66,16 @@ def generate_failed_study(request):
         else:
             recency_days = 8
 
-        content_data = study_logic.create_failed_study_sheet(num_chars=num_chars, header_text=header_text, threshold=threshold, recency_days=recency_days)
-        study = Study.objects.create(type='failed', content=content_data)
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'header_text': header_text,
+            'threshold': threshold,
+            'recency_days': recency_days,
+        }
+        study = generation_cache.create_generated(
+            Study, 'failed', seed, inputs, lambda: study_logic.create_failed_study_sheet(**inputs, seed=seed)
+        )
         return redirect('view_study', study_id=study.id)
     return render(request, 'studies/generate_study.html', {'study_type': 'failed'})
 
@@ -78,8 +90,15 @@ def generate_review_study(request):
             days_filter = None
         header_text = request.POST.get('header_text', 'Review Session')
 
-        content_data = study_logic.create_study_review_sheet(num_chars=num_chars, days_filter=days_filter, header_text=header_text)
-        study = Study.objects.create(type='review', content=content_data)
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'days_filter': days_filter,
+            'header_text': header_text,
+        }
+        study = generation_cache.create_generated(
+            Study, 'review', seed, inputs, lambda: study_logic.create_study_review_sheet(**inputs, seed=seed)
+        )
         return redirect('view_study', study_id=study.id)
     return render(request, 'studies/generate_study.html', {'study_type': 'review'})
 
@@ -113,16 +132,19 @@ def generate_cloze_test(request):
             if lesson_nums:
                 lesson_ids = list(Lesson.objects.filter(book_id=book_id, lesson_num__in=lesson_nums).values_list('id', flat=True))
 
-        content_data = study_logic.create_cloze_test(
-            num_chars=num_chars, 
-            score_filter=score_filter, 
-            days_filter=days_filter, 
-            study_source=study_source, 
-            header_text=header_text,
-            book_id=book_id,
-            lesson_ids=lesson_ids
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'score_filter': score_filter,
+            'days_filter': days_filter,
+            'study_source': study_source,
+            'header_text': header_text,
+            'book_id': book_id,
+            'lesson_ids': lesson_ids,
+        }
+        study = generation_cache.create_generated(
+            Study, 'cloze', seed, inputs, lambda: study_logic.create_cloze_test(**inputs, seed=seed)
         )
-        study = Study.objects.create(type='cloze', content=content_data)
         return redirect('view_study', study_id=study.id)
     
     books = Book.objects.prefetch_related('lessons').all()
@@ -158,16 +180,19 @@ def generate_find_words_puzzle(request):
             if lesson_nums:
                 lesson_ids = list(Lesson.objects.filter(book_id=book_id, lesson_num__in=lesson_nums).values_list('id', flat=True))
 
-        content_data = study_logic.create_find_words_puzzle(
-            num_chars=num_chars, 
-            score_filter=score_filter, 
-            days_filter=days_filter, 
-            study_source=study_source, 
-            header_text=header_text,
-            book_id=book_id,
-            lesson_ids=lesson_ids
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'score_filter': score_filter,
+            'days_filter': days_filter,
+            'study_source': study_source,
+            'header_text': header_text,
+            'book_id': book_id,
+            'lesson_ids': lesson_ids,
+        }
+        study = generation_cache.create_generated(
+            Study, 'words', seed, inputs, lambda: study_logic.create_find_words_puzzle(**inputs, seed=seed)
         )
-        study = Study.objects.create(type='words', content=content_data)
         return redirect('view_study', study_id=study.id)
     
     books = Book.objects.prefetch_related('lessons').all()
@@ -195,16 +220,19 @@ def generate_ch_en_matching_study(request):
             if lesson_nums:
                 lesson_ids = list(Lesson.objects.filter(book_id=book_id, lesson_num__in=lesson_nums).values_list('id', flat=True))
 
-        content_data = study_logic.create_ch_en_matching_study(
-            num_chars=num_chars,
-            score_filter=score_filter,
-            days_filter=days_filter,
-            study_source=study_source,
-            header_text=header_text,
-            book_id=book_id,
-            lesson_ids=lesson_ids
+        seed = generation_cache.resolve_seed(request.POST.get('seed'))
+        inputs = {
+            'num_chars': num_chars,
+            'score_filter': score_filter,
+            'days_filter': days_filter,
+            'study_source': study_source,
+            'header_text': header_text,
+            'book_id': book_id,
+            'lesson_ids': lesson_ids,
+        }
+        study = generation_cache.create_generated(
+            Study, 'ch_en_matching', seed, inputs, lambda: study_logic.create_ch_en_matching_study(**inputs, seed=seed)
         )
-        study = Study.objects.create(type='ch_en_matching', content=content_data)
         return redirect('view_study', study_id=study.id)
     
     books = Book.objects.prefetch_related('lessons').all()
@@ -1,3 +1,6 @@
+import random
+
+from django.db import transaction
 from django.shortcuts import render, redirect, get_object_or_404
 from studies.models import Study, Exam, Word, StudyLog
 from django.utils import timezone
@@ -27,7 +30,9 @@ def view_study(request, study_id):
         grid, start_row = study_find_words.generate_grid(
             content['content']['sentence'],
             content['content']['words'],
-            list(set("".join(content['content']['words'])))
+            sorted(set("".join(content['content']['words']))),
+            # Same layout every time the study is opened
+            rng=random.Random(study.seed),
         )
         context['grid'] = grid
         context['start_row'] = start_row
@@ -69,15 +74,17 @@ def record_exam(request, exam_id):
         if record_type.endswith('_review'):
             record_type = record_type.replace('_review', '')
 
-        for char in characters:
-            score_str = request.POST.get(f"score_{char}")
-            if score_str:
-                score = int(score_str)
-                word, created = Word.objects.get_or_create(hanzi=char)
-                StudyLog.objects.create(word=word, type=record_type, score=score, study_date=today)
-        
-        exam.recorded = True
-        exam.save()
+        # Record the whole exam or none of it
+        with transaction.atomic():
+            for char in characters:
+                score_str = request.POST.get(f"score_{char}")
+                if score_str:
+                    score = int(score_str)
+                    word, created = Word.objects.get_or_create(hanzi=char)
+                    StudyLog.objects.create(word=word, type=record_type, score=score, study_date=today)
+
+            exam.recorded = True
+            exam.save()
         
         return redirect('exam_history')
     
@@ -91,10 +98,11 @@ def mark_study_done(request, study_id):
     
     characters = study.content.get('selected_chars', [])
     
-    for char in characters:
-        word, created = Word.objects.get_or_create(hanzi=char)
-        StudyLog.objects.create(word=word, type=study.log_type, score=5, study_date=today)
+    with transaction.atomic():
+        for char in characters:
+            word, created = Word.objects.get_or_create(hanzi=char)
+            StudyLog.objects.create(word=word, type=study.log_type, score=5, study_date=today)
 
-    study.done = True
-    study.save()
+        study.done = True
+        study.save()
     return redirect('study_history')